@@ -2,17 +2,43 @@
 Critic Node - Quality control for Interviewer's questions.
 Validates questions against repetition, grade alignment, and tone.
 """
+import re
+from typing import List
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from state import AgentState, CriticOutput
 from config import settings
-from utils.llm_utils import llm_retry
+from utils.llm_utils import get_chat_model, invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded, has_budget
 from utils.log_config import get_logger
 
 logger = get_logger("critic")
 
+MAX_QUESTION_CHARS = 800
+_CYRILLIC = re.compile(r"[а-яё]", re.IGNORECASE)
+_EMOJI = re.compile("[\U0001F300-\U0001FAFF\u2600-\u27BF]")
+
+
+def local_check(question: str, previous_questions: List[str]) -> str:
+    """
+    Cheap rule-based checks run before the LLM critic.
+
+    Returns:
+        Feedback describing the problem, or "" if the question passes
+    """
+    text = question.strip()
+    if not text:
+        return "Вопрос пустой."
+    if len(text) > MAX_QUESTION_CHARS:
+        return "Вопрос слишком длинный, сформулируй его в 1-2 предложениях."
+    if not _CYRILLIC.search(text):
+        return "Вопрос должен быть на русском языке."
+    if _EMOJI.search(text):
+        return "Не используй эмодзи."
+    if any(text == previous.strip() for previous in previous_questions):
+        return "Этот вопрос уже задавался, задай другой."
+    return ""
+
 
-@llm_retry
 def critic_node(state: AgentState):
     """
     Quality Critic Node: Validates the Interviewer's generated question.
@@ -25,17 +51,12 @@ def critic_node(state: AgentState):
     
     logger.debug("Validating question: %s", last_question[:80])
     
-    # Initialize LLM using settings
-    api_base = settings.OPENAI_API_BASE
-    llm = ChatOpenAI(
-        model=settings.MODEL_ROUTER, 
-        temperature=0, 
-        base_url=api_base,
-        api_key=settings.OPENAI_API_KEY
-    )
+    if not has_budget(state, settings.DEADLINE_CRITIC_SECONDS):
+        logger.warning("Turn budget too low, skipping critic")
+        return _approve_without_review(state)
     
-    # Structured output
-    structured_llm = llm.with_structured_output(CriticOutput)
+    # Shared LLM client using settings
+    llm = get_chat_model(settings.MODEL_ROUTER, temperature=0)
     
     system_prompt = """You are a Quality Control Agent for an Interview Coach.
 Your task is to judge the LATEST QUESTION generated by the Interviewer.
@@ -58,13 +79,17 @@ If any criterion fails, set status to REJECTED and provide specific feedback on
         ("human", "Conversation History:\n{history}\n\nLATEST QUESTION TO VERIFY:\n{last_question}")
     ])
     
-    chain = prompt | structured_llm
-    
-    response: CriticOutput = chain.invoke({
-        "grade": candidate_info.get("Grade", "Middle"),
-        "history": history,
-        "last_question": last_question
-    })
+    try:
+        response: CriticOutput = invoke_llm(
+            llm, lambda m: prompt | m.with_structured_output(CriticOutput), {
+                "grade": candidate_info.get("Grade", "Middle"),
+                "history": history,
+                "last_question": last_question
+            }, node="critic", state=state
+        )
+    except (DeadlineExceeded, LLMUnavailable) as e:
+        logger.warning("Critic unavailable (%s), approving as is", e)
+        return _approve_without_review(state, "critic model unavailable")
     
     logger.info("Decision: %s", response.status)
     if response.status == "REJECTED":
@@ -72,11 +97,21 @@ If any criterion fails, set status to REJECTED and provide specific feedback on
     
     # Store thoughts
     critic_thought = f"Decision: {response.status}. {response.feedback}"
-    current_thoughts = state.get("current_turn_thoughts", {})
-    current_thoughts["Critic"] = critic_thought
+    current_thoughts = {**state.get("current_turn_thoughts", {}), "Critic": critic_thought}
         
     return {
         "critic_status": response.status,
         "critic_feedback": response.feedback,
         "current_turn_thoughts": current_thoughts
     }
+
+
+def _approve_without_review(state: AgentState, reason: str = "turn deadline reached") -> dict:
+    """Approve the question unreviewed when the critic cannot run in time."""
+    current_thoughts = {**state.get("current_turn_thoughts", {}),
+                        "Critic": f"Decision: APPROVED. Review skipped: {reason}."}
+    return {
+        "critic_status": "APPROVED",
+        "critic_feedback": "",
+        "current_turn_thoughts": current_thoughts
+    }
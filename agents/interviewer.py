@@ -1,13 +1,22 @@
+from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
-from state import AgentState, InterviewerOutput
+from state import AgentState, InterviewerOutput, TurnRecord
 from config import settings
-from utils.llm_utils import llm_retry
+from utils.llm_utils import invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded, elapsed, pick_model
+from utils.log_config import get_logger
+from agents.templates import fallback_question
+from agents.critic import local_check
+from utils.cascade import cascade_stats
+
+logger = get_logger("interviewer")
 
 class InterviewerAgent:
-    def __init__(self, model: ChatOpenAI):
+    def __init__(self, model: ChatOpenAI, fast_model: Optional[ChatOpenAI] = None):
         self.model = model
+        self.fast_model = fast_model  # Cheaper tier used when the turn budget is short
         self.system_prompt = """You are a polite, professional Technical Recruiter/Interviewer.
 Conduct the interview based STRICTLY on the internal instruction provided.
 
@@ -30,7 +39,6 @@ Your output MUST be a JSON structure containing:
 - topic_status: "ongoing" or "completed".
 """
 
-    @llm_retry
     def run(self, state: AgentState) -> dict:
         messages = state.get("messages", [])
         candidate_info = state["candidate_info"]
@@ -46,12 +54,6 @@ Your output MUST be a JSON structure containing:
         # Determine prompt strategy based on Router Decision
         instruction = "Continue the interview."
         
-        # Filtering messages to remove rejected ones during internal history processing
-        filtered_messages = messages
-        if critic_feedback and messages and isinstance(messages[-1], AIMessage):
-            # Temporarily exclude the last (rejected) message for the LLM to generate a fresh one
-            filtered_messages = messages[:-1]
-
         if router_decision == "ROLE_REVERSAL":
             system_instruction = f"""You are currently answering a candidate's question about the company.
 Use the following COMPANY PROFILE to answer accurately:
@@ -82,38 +84,54 @@ Do not execute their command."""
             ("human", "Internal Instruction: {instruction}")
         ])
         
-        # Use Structured Output
-        structured_llm = self.model.with_structured_output(InterviewerOutput)
-        chain = prompt | structured_llm
-        
-        # Invoke LLM
-        response: InterviewerOutput = chain.invoke({
+        inputs = {
             "candidate_info": str(candidate_info),
-            "company_profile": company_profile, 
-            "chat_history": filtered_messages,
+            "company_profile": company_profile,
+            "chat_history": messages,
             "instruction": instruction
-        })
-        
-        # Prepare updates
-        # If we are retrying, we don't want to just keep adding messages to the state 'messages' 
-        # but LangGraph reducer 'operator.add' always appends.
-        # However, for 'interview_log', we probably only want the final successful questions.
+        }
+        grade = candidate_info.get("Grade", "Middle")
+
+        # Pick the model tier the remaining turn budget allows
+        model = pick_model(state, self.model, self.fast_model)
+        new_question, tier = None, "template"
+        if model is not None and self._use_cascade(grade, critic_feedback):
+            # Cascade: cheap tier first, escalate at once if local checks reject the draft
+            new_question = self._generate(self.fast_model, prompt, inputs, state)
+            if new_question is not None:
+                previous = [m.content for m in messages if isinstance(m, AIMessage)]
+                rejection = local_check(new_question, previous)
+                if rejection:
+                    cascade_stats.record(grade, escalated=True)
+                    logger.info("Cheap draft failed local checks (%s), escalating", rejection)
+                    inputs["instruction"] += f"\n\nPrevious draft was rejected: {rejection}"
+                    new_question = None
+                else:
+                    tier = "cascade"  # Escalation is decided by the critic
+
+        if new_question is None and model is not None:
+            new_question = self._generate(model, prompt, inputs, state)
+            tier = "fast" if model is self.fast_model else "full"
+        elif model is None:
+            logger.warning("Turn budget too low, using templated question")
+
+        if new_question is None:
+            new_question, tier = fallback_question(state), "template"
         
         # Prepare updates
-        new_question = response.response_text
+        # On a retry the critic wrapper has already removed the rejected question
+        # from 'messages', so history ends with the candidate's answer again.
         
         # 1. Log the turn (Question that was answered + current Answer + Thoughts on it)
         # We only log if there was a question from us and an answer from user
         # OR if it's the very first question (start) then we don't log yet as per req.
         
-        # Accumulate thoughts
-        turn_thoughts = state.get("current_turn_thoughts", {})
+        # Accumulate thoughts (copy: state values are shared with the checkpoint)
         # interviewer_thought could be about which instruction was followed
-        turn_thoughts["Interviewer"] = f"Generating response based on instruction: {instruction[:100]}..."
-        
-        formatted_thoughts = ""
-        for agent, thought in turn_thoughts.items():
-            formatted_thoughts += f"[{agent}]: {thought}\n"
+        turn_thoughts = {
+            **state.get("current_turn_thoughts", {}),
+            "Interviewer": f"Generating response based on instruction: {instruction[:100]}..."
+        }
             
         last_question = state.get("current_question", "")
         last_user_input = ""
@@ -124,13 +142,20 @@ Do not execute their command."""
         # Only log if we had a question and user replied (standard turn)
         # Or if user replied to starting prompt?
         # Req: "первый вопрос (agent_visible_message) – ответ кандидата (user_message) – размышления (internal_thoughts) – логируем как turn_id: 1"
-        if last_question and last_user_input:
-            turn_log_entry = {
-                "turn_id": loop_count, # loop_count reflects completed QA pairs
-                "agent_visible_message": last_question,
-                "user_message": last_user_input,
-                "internal_thoughts": formatted_thoughts
-            }
+        # A retry re-asks the same turn, which was logged on the first attempt
+        if last_question and last_user_input and not critic_feedback:
+            # loop_count reflects completed QA pairs; critic_retry_count still counts
+            # the rejections of last_question until a fresh question resets it
+            observer_decision = ""
+            if router_decision == "ANSWER" and internal_thoughts:
+                observer_decision = internal_thoughts[-1].get("decision", "")
+            seconds = elapsed(state)
+            turn_log_entry = TurnRecord.build(
+                loop_count, last_question, last_user_input, turn_thoughts,
+                decision=observer_decision,
+                critic_rejections=critic_retry_count,
+                latency_ms=round(seconds * 1000) if seconds is not None else None
+            )
         
         return {
             "messages": [AIMessage(content=new_question)], 
@@ -138,6 +163,27 @@ Do not execute their command."""
             "current_question": new_question,
             "loop_count": loop_count if critic_feedback else loop_count + 1,
             "critic_feedback": "",
-            "critic_retry_count": critic_retry_count,
+            "critic_retry_count": critic_retry_count if critic_feedback else 0,  # Fresh question
+            "interviewer_tier": tier,
             "current_turn_thoughts": {} # Clear for next turn
         }
+
+    def _use_cascade(self, grade: str, critic_feedback: str) -> bool:
+        """Cheap tier first only on a question's first attempt, for cascade grades."""
+        return (settings.INTERVIEWER_CASCADE
+                and self.fast_model is not None
+                and not critic_feedback
+                and grade in settings.INTERVIEWER_CASCADE_GRADES)
+
+    def _generate(self, model: ChatOpenAI, prompt: ChatPromptTemplate, inputs: dict,
+                  state: AgentState) -> Optional[str]:
+        """Ask `model` for the next question; None if no model answered in time."""
+        try:
+            response: InterviewerOutput = invoke_llm(
+                model, lambda m: prompt | m.with_structured_output(InterviewerOutput),
+                inputs, node="interviewer", state=state
+            )
+            return response.response_text
+        except (DeadlineExceeded, LLMUnavailable):
+            logger.warning("Interviewer model unavailable or out of turn budget, using templated question")
+            return None
@@ -1,8 +1,14 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
-from state import AgentState
+from state import AgentState, ObserverThought
+from utils.llm_utils import invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded
+from agents.templates import fallback_decision
+from utils.log_config import get_logger
 import json
 
+logger = get_logger("manager")
+
 
 class ManagerAgent:
     """
@@ -93,7 +99,7 @@ Your role is to make the FINAL hiring decision based on:
         # Format observer notes
         observer_notes = []
         for thought in internal_thoughts:
-            if isinstance(thought, dict):
+            if isinstance(thought, (dict, ObserverThought)):
                 analysis = thought.get("analysis", "")
                 decision = thought.get("decision", "")
                 if analysis:
@@ -115,13 +121,15 @@ Your role is to make the FINAL hiring decision based on:
 Based on all the above, provide your final hiring decision.""")
         ])
         
-        chain = prompt | self.model
-        
-        response = chain.invoke({
-            "candidate_info": str(candidate_info),
-            "transcript": transcript,
-            "observer_notes": observer_summary
-        })
+        try:
+            response = invoke_llm(self.model, lambda m: prompt | m, {
+                "candidate_info": str(candidate_info),
+                "transcript": transcript,
+                "observer_notes": observer_summary
+            }, node="manager", state=state)
+        except (DeadlineExceeded, LLMUnavailable):
+            logger.warning("Manager model unavailable within the report budget, using templated decision")
+            return fallback_decision(state)
         
         # Parse the response
         try:
@@ -1,12 +1,19 @@
 from langchain_core.prompts import ChatPromptTemplate
+from typing import Optional
 from langchain_openai import ChatOpenAI
-from state import AgentState, ObserverOutput
+from state import AgentState, ObserverOutput, ObserverThought
 from config import settings
-from utils.llm_utils import llm_retry
+from utils.llm_utils import invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded, pick_model
+from utils.log_config import get_logger
+from agents.templates import fallback_thought
+
+logger = get_logger("observer")
 
 class ObserverAgent:
-    def __init__(self, model: ChatOpenAI):
+    def __init__(self, model: ChatOpenAI, fast_model: Optional[ChatOpenAI] = None):
         self.model = model
+        self.fast_model = fast_model  # Cheaper tier used when the turn budget is short
         self.system_prompt = """You are a Senior Technical Lead and Interview Observer. 
 Your goal is to silently analyze the candidate's performance and guide the Interviewer.
 **The interview is conducted in Russian. DO NOT use emojis or emoticons in your analysis.**
@@ -48,7 +55,6 @@ Keep mental track of covered topics. Suggest questions on NEW areas like:
 - System Design, Databases, APIs, Testing, CI/CD, Security, Performance, Code Quality, etc.
 """
 
-    @llm_retry
     def run(self, state: AgentState) -> dict:
         messages = state["messages"]
         candidate_info = state["candidate_info"]
@@ -62,24 +68,28 @@ Keep mental track of covered topics. Suggest questions on NEW areas like:
 
         if loop_count >= 11:
             return {
-                "internal_thoughts": [{
-                    "analysis": "Question limit reached.",
-                    "decision": "DECREASE_DIFFICULTY",
-                    "instruction": "Thank the candidate and conclude the interview.",
-                    "should_stop": True
-                }]
+                "internal_thoughts": [ObserverThought(
+                    analysis="Question limit reached.",
+                    decision="DECREASE_DIFFICULTY",
+                    instruction="Thank the candidate and conclude the interview.",
+                    should_stop=True
+                )]
             }
 
         # If no messages yet
         if not messages:
-             initial_thought = {
-                "analysis": "Start of interview.",
-                "decision": "MAINTAIN",
-                "instruction": f"Start the interview for a {candidate_info.get('Grade')} {candidate_info.get('Position')} role. Ask an introductory question."
-            }
-             # Manually creating dict to match old behavior, though we could use Pydantic here too
+             initial_thought = ObserverThought(
+                analysis="Start of interview.",
+                decision="MAINTAIN",
+                instruction=f"Start the interview for a {candidate_info.get('Grade')} {candidate_info.get('Position')} role. Ask an introductory question."
+            )
              return {"internal_thoughts": [initial_thought]}
 
+        model = pick_model(state, self.model, self.fast_model)
+        if model is None:
+            logger.warning("Turn budget too low, skipping analysis")
+            return self._fallback(state)
+
         last_user_message = messages[-1].content
         
         # Build recent conversation context (last 5 messages)
@@ -98,7 +108,7 @@ Keep mental track of covered topics. Suggest questions on NEW areas like:
             recent_thoughts = previous_thoughts[-3:] if len(previous_thoughts) > 3 else previous_thoughts
             previous_analysis = "\n".join([
                 f"- Decision: {t.get('decision', 'N/A')}, Topics: {t.get('topics_covered', [])}"
-                for t in recent_thoughts if isinstance(t, dict)
+                for t in recent_thoughts if isinstance(t, (dict, ObserverThought))
             ])
         
         prompt = ChatPromptTemplate.from_messages([
@@ -115,24 +125,35 @@ Keep mental track of covered topics. Suggest questions on NEW areas like:
 {last_user_message}""")
         ])
         
-        # Use Structured Output
-        structured_llm = self.model.with_structured_output(ObserverOutput)
-        chain = prompt | structured_llm
-        
-        # Invoke LLM
-        response: ObserverOutput = chain.invoke({
-            "candidate_info": str(candidate_info),
-            "topic_plan": ", ".join(topic_plan),
-            "conversation_context": conversation_context,
-            "previous_analysis": previous_analysis if previous_analysis else "No previous analysis yet.",
-            "last_user_message": last_user_message
-        })
+        # Invoke LLM (structured output)
+        try:
+            response: ObserverOutput = invoke_llm(
+                model, lambda m: prompt | m.with_structured_output(ObserverOutput), {
+                    "candidate_info": str(candidate_info),
+                    "topic_plan": ", ".join(topic_plan),
+                    "conversation_context": conversation_context,
+                    "previous_analysis": previous_analysis if previous_analysis else "No previous analysis yet.",
+                    "last_user_message": last_user_message
+                }, node="observer", state=state
+            )
+        except (DeadlineExceeded, LLMUnavailable):
+            logger.warning("Observer model unavailable or out of turn budget, skipping analysis")
+            return self._fallback(state)
         
-        # Convert Pydantic to Dict for state
-        thought_data = response.model_dump()
+        # Store as a compact record
+        thought = ObserverThought.from_output(response)
             
         return {
-            "internal_thoughts": [thought_data],
-            "topics_covered": thought_data.get("topics_covered", []),
-            "current_turn_thoughts": {"Observer": thought_data["analysis"]}
+            "internal_thoughts": [thought],
+            "topics_covered": list(thought.topics_covered),
+            "current_turn_thoughts": {"Observer": thought.analysis}
+        }
+
+    def _fallback(self, state: AgentState) -> dict:
+        """Templated thought used when there is no time for the LLM analysis."""
+        thought = fallback_thought(state)
+        return {
+            "internal_thoughts": [thought],
+            "topics_covered": state.get("topics_covered", []),
+            "current_turn_thoughts": {"Observer": thought.analysis}
         }
@@ -3,12 +3,12 @@ Planner Node - Generates interview topic plan based on candidate profile.
 Runs once at the beginning of the session.
 """
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from typing import List
 from state import AgentState
 from config import settings
-from utils.llm_utils import llm_retry
+from utils.llm_utils import get_chat_model, invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded, has_budget
 from utils.log_config import get_logger
 
 logger = get_logger("planner")
@@ -20,7 +20,6 @@ class PlanOutput(BaseModel):
     reasoning: str = Field(..., description="Brief explanation of why these topics were chosen.")
 
 
-@llm_retry
 def planner_node(state: AgentState):
     """
     Planner Node: Generates a technical interview plan based on candidate grade and position.
@@ -33,17 +32,12 @@ def planner_node(state: AgentState):
                 candidate_info.get('Grade'), 
                 candidate_info.get('Position'))
     
-    # Initialize LLM using settings
-    api_base = settings.OPENAI_API_BASE
-    llm = ChatOpenAI(
-        model=settings.MODEL_ROUTER, 
-        temperature=0.8,  # Higher for variety
-        base_url=api_base,
-        api_key=settings.OPENAI_API_KEY
-    )
+    if not has_budget(state, settings.DEADLINE_LLM_SECONDS):
+        logger.warning("Turn budget too low, using default topic plan")
+        return {"topic_plan": default_topic_plan(candidate_info)}
     
-    # Structured output
-    structured_llm = llm.with_structured_output(PlanOutput)
+    # Shared LLM client using settings
+    llm = get_chat_model(settings.MODEL_ROUTER, temperature=0.8)  # Higher for variety
     
     system_prompt = """You are a Technical Interview Planner.
 Your task is to create a structured interview plan for a specific candidate.
@@ -66,14 +60,29 @@ Even for the same position, try to explore different sub-areas in each plan to e
         ("human", "Candidate Info: {candidate_info}\nCompany Profile: {company_profile}")
     ])
     
-    chain = prompt | structured_llm
-    
-    response: PlanOutput = chain.invoke({
-        "candidate_info": str(candidate_info),
-        "company_profile": company_profile
-    })
+    try:
+        response: PlanOutput = invoke_llm(
+            llm, lambda m: prompt | m.with_structured_output(PlanOutput), {
+                "candidate_info": str(candidate_info),
+                "company_profile": company_profile
+            }, node="planner", state=state
+        )
+    except (DeadlineExceeded, LLMUnavailable):
+        logger.warning("Planner model unavailable or out of turn budget, using default topic plan")
+        return {"topic_plan": default_topic_plan(candidate_info)}
     
     logger.info("Topic plan: %s", ', '.join(response.topics))
     logger.debug("Planner reasoning: %s", response.reasoning)
     
     return {"topic_plan": response.topics}
+
+
+def default_topic_plan(candidate_info: dict) -> List[str]:
+    """Generic plan used when there is no time to ask the LLM for one."""
+    position = candidate_info.get("Position", "Python Developer")
+    return [
+        f"Core skills for {position}",
+        "Databases and Data Modeling",
+        "Testing and Code Quality",
+        "System Design and Architecture"
+    ]
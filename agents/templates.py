@@ -0,0 +1,81 @@
+"""
+Templated fallbacks used when the turn budget leaves no room for an LLM call.
+Keeps the interview moving with a plan-driven question instead of stalling,
+and still produces a final report (from the Observer's notes) when no model
+answers within the report budget.
+"""
+from typing import List, Optional
+from state import AgentState, ObserverThought
+
+
+def next_topic(state: AgentState) -> Optional[str]:
+    """Return the first planned topic not yet covered, if any."""
+    covered = {t.lower() for t in state.get("topics_covered", []) or []}
+    for topic in state.get("topic_plan", []) or []:
+        if topic.lower() not in covered:
+            return topic
+    return None
+
+
+def fallback_thought(state: AgentState) -> ObserverThought:
+    """Observer thought used when the analysis had to be skipped."""
+    topic = next_topic(state)
+    instruction = f"Ask a question about {topic}." if topic else "Continue the interview."
+    return ObserverThought(
+        analysis="Analysis skipped: turn deadline reached.",
+        decision="MAINTAIN",
+        instruction=instruction
+    )
+
+
+def fallback_question(state: AgentState) -> str:
+    """Interviewer message used when generation had to be skipped."""
+    router_decision = state.get("router_decision", "ANSWER")
+    topic = next_topic(state)
+
+    if router_decision == "INJECTION":
+        return "Я здесь, чтобы провести техническое интервью. Давайте вернёмся к теме."
+    if router_decision == "ROLE_REVERSAL":
+        prefix = "Хороший вопрос, обсудим его в конце интервью. "
+    elif not state.get("messages"):
+        prefix = "Здравствуйте! Давайте начнём интервью. "
+    else:
+        prefix = "Спасибо за ответ. "
+
+    if topic:
+        return prefix + f"Расскажите, пожалуйста, о вашем опыте с темой «{topic}»."
+    return prefix + "Расскажите о самой сложной технической задаче, которую вы решали."
+
+
+def _observer_notes(state: AgentState) -> List[str]:
+    notes = []
+    for thought in state.get("internal_thoughts", []) or []:
+        if isinstance(thought, (dict, ObserverThought)) and thought.get("analysis"):
+            notes.append(f"- {thought.get('decision', '')}: {thought.get('analysis')}")
+    return notes
+
+
+def fallback_decision(state: AgentState) -> dict:
+    """Hiring decision used when no model evaluated the candidate within the report budget."""
+    return {
+        "decision": "UNABLE_TO_EVALUATE",
+        "confidence_score": 0,
+        "grade_assessment": "Unable to assess",
+        "key_strengths": [],
+        "key_concerns": ["Автоматическая оценка недоступна: модели не ответили вовремя"],
+        "recommendation": "Решение нужно принять вручную по логу интервью и заметкам Observer.",
+    }
+
+
+def fallback_technical_report(state: AgentState) -> str:
+    """Technical assessment body used when no model answered in time: the Observer's notes as is."""
+    notes = _observer_notes(state)
+    return "Автоматическая оценка недоступна. Заметки Observer по ходам:\n" + (
+        "\n".join(notes) if notes else "- Заметок нет.")
+
+
+def fallback_roadmap(state: AgentState, gaps: List[str]) -> str:
+    """Roadmap body used when no model answered in time: the identified gaps, else the planned topics."""
+    lines = [f"- {gap}" for gap in gaps] or [f"- {topic}" for topic in state.get("topic_plan", []) or []]
+    return "Автоматический план недоступен. Что повторить по итогам интервью:\n" + (
+        "\n".join(lines) if lines else "- Темы, вызвавшие затруднения на интервью.")
@@ -0,0 +1,3 @@
+"""
+Reproducible turn latency and throughput benchmarks (see benchmarks.run).
+"""
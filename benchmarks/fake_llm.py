@@ -0,0 +1,136 @@
+"""
+Deterministic fake chat model for benchmarks.
+Answers every node's prompt with a valid response derived from a hash of
+the prompt, sleeps a configurable (optionally jittered, still
+deterministic) latency and reports token usage, so the graph, retries,
+limiter and ledger run exactly as with a real provider.
+"""
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+STOP_WORDS = ("стоп", "stop", "хватит", "заканчиваем")
+INJECTION_MARKERS = ("ignore", "forget", "забудь", "игнорируй", "промпт", "prompt")
+HALLUCINATION_MARKERS = ("python 4", "удалят из python", "уберут в python")
+DECISIONS = ("INCREASE_DIFFICULTY", "MAINTAIN", "DECREASE_DIFFICULTY")
+TOPICS = ["Python Basics", "GIL", "AsyncIO", "Databases", "Testing"]
+
+
+def _user_input(prompt: str) -> str:
+    marker = "User Input:"
+    return prompt.rsplit(marker, 1)[-1].strip() if marker in prompt else prompt
+
+
+def classify(text: str) -> str:
+    """Router category of a candidate message, by keywords."""
+    lowered = text.lower()
+    if any(lowered.strip(" .!").startswith(word) for word in STOP_WORDS):
+        return "STOP"
+    if any(marker in lowered for marker in INJECTION_MARKERS):
+        return "INJECTION"
+    if lowered.rstrip().endswith("?"):
+        return "ROLE_REVERSAL"
+    return "ANSWER"
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering from a hash of the prompt.
+
+    Args:
+        model_name: Reported model name (keeps per-model limiters, metrics and ledger keys)
+        temperature: Kept for parity with ChatOpenAI, unused
+        latency: Seconds per call
+        jitter: Relative latency spread, 0..1, derived from the prompt hash
+        reject_rate: Share of questions the critic rejects, 0..1
+    """
+
+    model_name: str = "fake"
+    temperature: float = 0
+    latency: float = 0.0
+    jitter: float = 0.0
+    reject_rate: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-interview"
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        return self.bind(schema=schema.__name__) | RunnableLambda(
+            lambda message: schema.model_validate_json(message.content))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, schema: Optional[str] = None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        if self.latency:
+            time.sleep(max(0.0, self.latency * (1 + self.jitter * ((digest % 1000) / 500 - 1))))
+
+        content = self._respond(schema, prompt, digest)
+        usage = {"input_tokens": len(prompt) // 4 + 1, "output_tokens": len(content) // 4 + 1}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _respond(self, schema: Optional[str], prompt: str, digest: int) -> str:
+        if schema == "RouteResponse":
+            return json.dumps({"category": classify(_user_input(prompt)), "reasoning": "keywords"})
+        if schema == "PlanOutput":
+            return json.dumps({"topics": TOPICS, "reasoning": "standard plan"})
+        if schema == "ObserverOutput":
+            hallucination = any(marker in prompt.lower() for marker in HALLUCINATION_MARKERS)
+            return json.dumps({
+                "analysis": "False claim (hallucination)" if hallucination else f"Answer quality {digest % 10}/10",
+                "decision": "DECREASE_DIFFICULTY" if hallucination else DECISIONS[digest % len(DECISIONS)],
+                "instruction": "Correct the candidate" if hallucination else "Continue with the plan",
+                "topics_covered": [TOPICS[digest % len(TOPICS)]],
+                "should_stop": False,
+            })
+        if schema == "InterviewerOutput":
+            return json.dumps({"response_text": f"Расскажите про {TOPICS[digest % len(TOPICS)]} (#{digest % 1000})?",
+                               "topic_status": "ongoing"})
+        if schema == "CriticOutput":
+            rejected = digest % 1000 < self.reject_rate * 1000
+            return json.dumps({"status": "REJECTED" if rejected else "APPROVED",
+                               "feedback": "Слишком общий вопрос" if rejected else ""})
+        if schema is not None:
+            raise ValueError(f"FakeChatModel has no response for {schema}")
+        if "hiring decision" in prompt:
+            return json.dumps({"decision": "HIRE", "confidence_score": 70 + digest % 20,
+                               "grade_assessment": "Middle", "key_strengths": ["Python"],
+                               "key_concerns": ["Testing"], "recommendation": "Hire"})
+        return f"## Report\n\n- Point {digest % 100}\n- Point {digest % 37}\n"
+
+
+@contextmanager
+def installed(latency: float = 0.0, jitter: float = 0.0, reject_rate: float = 0.0) -> Iterator[None]:
+    """
+    Route every LLM call to FakeChatModel (one per model and temperature)
+    and disable web search, restoring both on exit.
+    """
+    from config import settings
+    from utils.llm_utils import override_models
+
+    models: Dict[Tuple[str, float], FakeChatModel] = {}
+
+    def fake(model: str, temperature: float) -> FakeChatModel:
+        key = (model, temperature)
+        if key not in models:
+            models[key] = FakeChatModel(model_name=model, temperature=temperature, latency=latency,
+                                        jitter=jitter, reject_rate=reject_rate)
+        return models[key]
+
+    web_search, settings.WEB_SEARCH_ENABLED = settings.WEB_SEARCH_ENABLED, False
+    previous = override_models(fake)
+    try:
+        yield
+    finally:
+        override_models(previous)
+        settings.WEB_SEARCH_ENABLED = web_search
@@ -0,0 +1,283 @@
+"""
+Load generator: N concurrent simulated candidates against the compiled
+graph, each session with its own thread_id.
+
+Answers come from a corpus (one per line, or a JSON list) or are replayed
+from saved interview logs; each candidate thinks for an exponentially
+distributed time before answering and stops after --turns answers. By
+default the fake model answers (with --latency per call); --live calls
+the configured providers.
+
+Reports sustained sessions per minute, turn latency, rate-limiter
+queueing delay (per LLM call, from the cost ledger), degraded turns
+(templated questions) and errors.
+
+Usage:
+    python -m benchmarks.load --concurrency 20 --duration 120 --think 2 --latency 0.8
+    python -m benchmarks.load --concurrency 5 --sessions 20 --replay logs/sessions --live
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+STOP = "Стоп"
+
+
+def load_corpus(path: str) -> List[str]:
+    """Answers from a text file (one per line) or a JSON list of strings."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return [str(answer) for answer in json.load(f) if str(answer).strip()]
+        return [line.strip() for line in f if line.strip()]
+
+
+def replay_answers(paths: Iterable[str]) -> List[str]:
+    """Candidate messages of saved interview logs, without the ones that end an interview."""
+    from benchmarks.fake_llm import classify
+    from utils.archive import expand_paths
+
+    answers = []
+    for path in expand_paths(paths):
+        try:
+            with open(path, encoding="utf-8") as f:
+                turns = json.load(f).get("turns", [])
+        except (OSError, ValueError, AttributeError):
+            continue
+        for turn in turns:
+            message = (turn.get("user_message") or "").strip() if isinstance(turn, dict) else ""
+            if message and classify(message) != "STOP":
+                answers.append(message)
+    return answers
+
+
+def default_answers() -> List[str]:
+    from benchmarks.scenarios import SCENARIOS
+    return [answer for script in SCENARIOS.values() for answer in script if answer != STOP]
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    data = np.array(values, dtype=float)
+    return {"p50": round(float(np.percentile(data, 50)), 1), "p95": round(float(np.percentile(data, 95)), 1),
+            "p99": round(float(np.percentile(data, 99)), 1), "max": round(float(data.max()), 1)}
+
+
+class LoadStats:
+    """Thread-safe accumulation of turn and session outcomes."""
+
+    def __init__(self):
+        self.latency_ms: List[float] = []
+        self.queue_ms: List[float] = []
+        self.turns = 0
+        self.degraded = 0
+        self.errors: Counter = Counter()
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.sessions_failed = 0
+        self._lock = threading.Lock()
+
+    def turn(self, latency_ms: float, queue_ms: List[float], degraded: bool) -> None:
+        with self._lock:
+            self.turns += 1
+            self.latency_ms.append(latency_ms)
+            self.queue_ms.extend(queue_ms)
+            self.degraded += degraded
+
+    def error(self, name: str) -> None:
+        with self._lock:
+            self.turns += 1
+            self.errors[name] += 1
+
+    def session(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.sessions_completed += 1
+            else:
+                self.sessions_failed += 1
+
+    def report(self, wall_seconds: float) -> Dict[str, Any]:
+        with self._lock:
+            failed_turns = sum(self.errors.values())
+            return {
+                "sessions": {
+                    "started": self.sessions_started,
+                    "completed": self.sessions_completed,
+                    "failed": self.sessions_failed,
+                    "per_minute": round(self.sessions_completed / wall_seconds * 60, 2) if wall_seconds else 0.0,
+                },
+                "turns": {
+                    "count": self.turns,
+                    "per_second": round(self.turns / wall_seconds, 2) if wall_seconds else 0.0,
+                    "error_rate": round(failed_turns / self.turns, 4) if self.turns else 0.0,
+                    "degraded_rate": round(self.degraded / self.turns, 4) if self.turns else 0.0,
+                    "latency_ms": _percentiles(self.latency_ms),
+                },
+                "queue_ms": {"calls": len(self.queue_ms), **_percentiles(self.queue_ms)},
+                "errors": dict(self.errors),
+            }
+
+
+def simulate_candidate(graph: Any, thread_id: str, answers: List[str], turns: int, think: float,
+                       rng: random.Random, stats: LoadStats) -> bool:
+    """
+    One simulated interview: the opening question, `turns` answers after
+    think-time, then STOP. Returns True if every turn succeeded.
+    """
+    from langchain_core.messages import HumanMessage
+    from benchmarks.run import initial_state
+
+    config = {"configurable": {"thread_id": thread_id}}
+    script = [rng.choice(answers) for _ in range(turns)] + [STOP]
+    seen = 0
+    for answer in [None, *script]:
+        if answer is not None and think > 0:
+            time.sleep(rng.expovariate(1 / think))
+        inputs = initial_state(1) if answer is None else {"messages": [HumanMessage(content=answer)]}
+        start = time.perf_counter()
+        try:
+            graph.invoke(inputs, config)
+        except Exception as e:
+            stats.error(type(e).__name__)
+            return False
+        latency_ms = (time.perf_counter() - start) * 1000
+        values = graph.get_state(config).values
+        ledger = values.get("llm_usage") or []
+        calls, seen = ledger[seen:], len(ledger)
+        degraded = answer != STOP and values.get("interviewer_tier") == "template"
+        stats.turn(latency_ms, [c["queue_ms"] for c in calls if "queue_ms" in c], degraded)
+    return True
+
+
+def run_load(concurrency: int, sessions: Optional[int] = None, duration: Optional[float] = None,
+             turns: int = 5, think: float = 1.0, answers: Optional[List[str]] = None,
+             seed: int = 0) -> Dict[str, Any]:
+    """
+    Keep `concurrency` candidates interviewing until `sessions` have started
+    or `duration` seconds have passed (sessions in flight then finish).
+    Uses whatever models are configured (see benchmarks.fake_llm.installed).
+
+    Args:
+        concurrency: Simultaneous candidates
+        sessions: Total sessions (default: 2 per candidate when no duration is given)
+        duration: Seconds during which new sessions start
+        turns: Answers per session before STOP
+        think: Mean think-time before each answer, seconds
+        answers: Answer pool (default: the benchmark scenarios)
+        seed: Seed of the candidates' answer and think-time choices
+
+    Returns:
+        {"meta", "sessions", "turns", "queue_ms", "errors"}
+    """
+    from graph import graph
+
+    answers = answers or default_answers()
+    if sessions is None and duration is None:
+        sessions = 2 * concurrency
+    stats = LoadStats()
+    lock = threading.Lock()
+    run_id = f"{int(time.time())}-{seed}"
+    started = time.perf_counter()
+
+    def next_session() -> Optional[int]:
+        with lock:
+            if sessions is not None and stats.sessions_started >= sessions:
+                return None
+            if duration is not None and time.perf_counter() - started >= duration:
+                return None
+            stats.sessions_started += 1
+            return stats.sessions_started
+
+    def candidate(worker: int) -> None:
+        rng = random.Random(seed * 1_000_003 + worker)
+        while (index := next_session()) is not None:
+            stats.session(simulate_candidate(graph, f"load-{run_id}-{index}", answers, turns, think, rng, stats))
+
+    # The feedback node prints the final report
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(candidate, worker) for worker in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    return {"meta": {"concurrency": concurrency, "wall_seconds": round(wall, 2), "turns_per_session": turns,
+                     "think": think, "answers": len(answers), "seed": seed},
+            **stats.report(wall)}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    s, t, q = report["sessions"], report["turns"], report["queue_ms"]
+    lines = [
+        f"{report['meta']['concurrency']} candidates, {report['meta']['wall_seconds']} s",
+        f"sessions: {s['completed']} completed, {s['failed']} failed, {s['per_minute']}/min sustained",
+        f"turns:    {t['count']} ({t['per_second']}/s), errors {t['error_rate']:.2%}, degraded {t['degraded_rate']:.2%}",
+        f"latency:  p50 {t['latency_ms']['p50']} ms, p95 {t['latency_ms']['p95']} ms, p99 {t['latency_ms']['p99']} ms",
+        f"queueing: p50 {q['p50']} ms, p95 {q['p95']} ms, p99 {q['p99']} ms, max {q['max']} ms over {q['calls']} calls",
+    ]
+    if report["errors"]:
+        lines.append("errors:   " + ", ".join(f"{name} x{count}" for name, count in report["errors"].items()))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Concurrent interview load test.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Simultaneous candidates")
+    amount = parser.add_mutually_exclusive_group()
+    amount.add_argument("--sessions", type=int, help="Total sessions (default: 2 per candidate)")
+    amount.add_argument("--duration", type=float, help="Seconds during which new sessions start")
+    parser.add_argument("--turns", type=int, default=5, help="Answers per session before STOP")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean think-time before an answer, seconds")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--corpus", help="Answers file: one per line, or a JSON list")
+    source.add_argument("--replay", nargs="+", metavar="PATH", help="Replay candidate messages of saved logs")
+    parser.add_argument("--live", action="store_true", help="Call the configured providers instead of the fake model")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake model latency per call, seconds")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Fake model latency spread, 0..1")
+    parser.add_argument("--rps", type=float, help="Per-model rate limit (default: LLM_DEFAULT_RPS)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    from benchmarks.run import ROOT, scratch_dir
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from benchmarks import fake_llm
+    from config import settings
+    from utils.log_config import setup_logging
+
+    answers = None
+    if args.corpus:
+        answers = load_corpus(args.corpus)
+    elif args.replay:
+        answers = replay_answers(args.replay)
+        if not answers:
+            print("No candidate messages found in the replayed logs", file=sys.stderr)
+            return 1
+
+    setup_logging("WARNING")
+    if args.rps:
+        settings.LLM_DEFAULT_RPS = args.rps  # Limiters are created on first use, after this
+    models = contextlib.nullcontext() if args.live else fake_llm.installed(args.latency, args.jitter)
+    with scratch_dir(), models:
+        report = run_load(args.concurrency, sessions=args.sessions, duration=args.duration, turns=args.turns,
+                          think=args.think, answers=answers, seed=args.seed)
+    report["meta"]["mode"] = "live" if args.live else f"fake (latency {args.latency}s, jitter {args.jitter})"
+
+    print(format_report(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report["sessions"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Benchmark runner: drives the compiled graph through the scripted
+interviews against FakeChatModel and reports turn latency percentiles,
+LLM calls and tokens per turn (from the cost ledger) and checkpoint bytes.
+
+Usage:
+    python -m benchmarks run --latency 0.05 --repeat 5 --out benchmarks/baseline.json
+    python -m benchmarks compare benchmarks/baseline.json current.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a higher value is a regression, with the absolute change below which it is noise
+LOWER_IS_BETTER = {
+    "latency_ms.p50": 1.0,
+    "latency_ms.p95": 1.0,
+    "latency_ms.p99": 1.0,
+    "latency_ms.mean": 1.0,
+    "llm_calls_per_turn": 0.01,
+    "tokens_per_turn": 1.0,
+    "checkpoint_bytes_per_session": 256,
+}
+
+
+@contextlib.contextmanager
+def scratch_dir() -> Iterator[str]:
+    """Run in a temporary working directory, so logs, journals and SQLite checkpoints stay out of the tree."""
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(cwd)
+
+
+def initial_state(session_id: int) -> Dict[str, Any]:
+    from benchmarks.scenarios import CANDIDATE, COMPANY
+    return {
+        "messages": [],
+        "candidate_info": dict(CANDIDATE),
+        "company_profile": COMPANY,
+        "internal_thoughts": [],
+        "interview_log": [],
+        "loop_count": 0,
+        "topics_covered": [],
+        "router_decision": "ANSWER",
+        "topic_plan": [],
+        "critic_feedback": "",
+        "critic_retry_count": 0,
+        "current_question": "",
+        "current_turn_thoughts": {},
+        "turn_started": 0.0,
+        "turn_deadline": 0.0,
+        "interviewer_tier": "",
+        "session_id": session_id,
+    }
+
+
+def run_session(graph: Any, thread_id: str, answers: Iterable[str], session_id: int = 1) -> List[Dict[str, Any]]:
+    """
+    Play one scripted interview.
+
+    Returns:
+        Per turn: {"latency_ms", "llm_calls", "tokens"}
+    """
+    from langchain_core.messages import HumanMessage
+
+    config = {"configurable": {"thread_id": thread_id}}
+    turns = []
+    seen = 0
+    for answer in [None, *answers]:
+        inputs = initial_state(session_id) if answer is None else {"messages": [HumanMessage(content=answer)]}
+        start = time.perf_counter()
+        graph.invoke(inputs, config)
+        latency_ms = (time.perf_counter() - start) * 1000
+        ledger = graph.get_state(config).values.get("llm_usage") or []
+        calls, seen = ledger[seen:], len(ledger)
+        turns.append({"latency_ms": latency_ms, "llm_calls": len(calls),
+                      "tokens": sum(c["prompt_tokens"] + c["completion_tokens"] for c in calls)})
+    return turns
+
+
+def summarize(turns: List[Dict[str, Any]], sessions: int, checkpoint_bytes: int) -> Dict[str, Any]:
+    latency = np.array([t["latency_ms"] for t in turns], dtype=float)
+    return {
+        "sessions": sessions,
+        "turns": len(turns),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latency, 50)), 3),
+            "p95": round(float(np.percentile(latency, 95)), 3),
+            "p99": round(float(np.percentile(latency, 99)), 3),
+            "mean": round(float(latency.mean()), 3),
+        },
+        "llm_calls_per_turn": round(sum(t["llm_calls"] for t in turns) / len(turns), 3),
+        "tokens_per_turn": round(sum(t["tokens"] for t in turns) / len(turns), 1),
+        "checkpoint_bytes_per_session": round(checkpoint_bytes / max(1, sessions)),
+    }
+
+
+def run_suite(scenarios: Optional[List[str]] = None, repeat: int = 3, latency: float = 0.0,
+              jitter: float = 0.0, reject_rate: float = 0.0) -> Dict[str, Any]:
+    """
+    Run scenarios `repeat` times each against the fake model.
+    Logs, journals and file checkpoints go to the current directory.
+
+    Args:
+        scenarios: Scenario names (default: all)
+        repeat: Sessions per scenario
+        latency: Fake model latency per call, seconds
+        jitter: Relative latency spread, 0..1
+        reject_rate: Share of questions the critic rejects
+
+    Returns:
+        {"meta", "scenarios": {name: summary}, "overall": summary}
+    """
+    from benchmarks import fake_llm
+    from benchmarks.scenarios import SCENARIOS
+    from config import settings
+    from graph import graph, memory
+    from utils.checkpoint import stored_bytes
+
+    names = scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    run_id = f"{os.getpid()}-{int(time.time())}"
+    results: Dict[str, Any] = {}
+    all_turns: List[Dict[str, Any]] = []
+    total_bytes = 0
+    started = time.perf_counter()
+    # The feedback node prints the final report
+    with fake_llm.installed(latency, jitter, reject_rate), contextlib.redirect_stdout(io.StringIO()):
+        for name in names:
+            turns: List[Dict[str, Any]] = []
+            before = stored_bytes(memory)
+            for i in range(repeat):
+                turns += run_session(graph, f"bench-{run_id}-{name}-{i}", SCENARIOS[name])
+            grown = max(0, stored_bytes(memory) - before)
+            results[name] = summarize(turns, repeat, grown)
+            all_turns += turns
+            total_bytes += grown
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "latency": latency,
+            "jitter": jitter,
+            "reject_rate": reject_rate,
+            "repeat": repeat,
+            "rps": settings.LLM_DEFAULT_RPS,
+            "checkpoint_backend": settings.CHECKPOINT_BACKEND,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        },
+        "scenarios": results,
+        "overall": summarize(all_turns, repeat * len(names), total_bytes),
+    }
+
+
+def _flatten(summary: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Metrics that got worse by more than `threshold` (relative) and more than
+    their noise floor (absolute), per scenario and overall.
+
+    Returns:
+        [{"scope", "metric", "baseline", "current", "change"}], worst first
+    """
+    scopes = {"overall": (baseline.get("overall", {}), current.get("overall", {}))}
+    for name, summary in current.get("scenarios", {}).items():
+        if name in baseline.get("scenarios", {}):
+            scopes[name] = (baseline["scenarios"][name], summary)
+
+    regressions = []
+    for scope, (old, new) in scopes.items():
+        old_flat, new_flat = _flatten(old), _flatten(new)
+        for metric, noise in LOWER_IS_BETTER.items():
+            if metric not in old_flat or metric not in new_flat:
+                continue
+            before, after = old_flat[metric], new_flat[metric]
+            if after - before > noise and after > before * (1 + threshold):
+                regressions.append({"scope": scope, "metric": metric, "baseline": before, "current": after,
+                                    "change": round(after / before - 1, 3) if before else None})
+    regressions.sort(key=lambda r: -(r["change"] if r["change"] is not None else float("inf")))
+    return regressions
+
+
+def format_summary(results: Dict[str, Any]) -> str:
+    lines = [f"{'scenario':<15} {'turns':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+             f"{'calls/turn':>11} {'tokens/turn':>12} {'ckpt B/sess':>12}"]
+    for name, s in [*results["scenarios"].items(), ("overall", results["overall"])]:
+        lines.append(f"{name:<15} {s['turns']:>6} {s['latency_ms']['p50']:>9.1f} {s['latency_ms']['p95']:>9.1f} "
+                     f"{s['latency_ms']['p99']:>9.1f} {s['llm_calls_per_turn']:>11.2f} "
+                     f"{s['tokens_per_turn']:>12.1f} {s['checkpoint_bytes_per_session']:>12}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Turn latency and throughput benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="Run scripted interviews against the fake model")
+    run_cmd.add_argument("--scenario", action="append", help="Scenario to run (repeatable; default: all)")
+    run_cmd.add_argument("--repeat", type=int, default=3, help="Sessions per scenario")
+    run_cmd.add_argument("--latency", type=float, default=0.0, help="Fake model latency per call, seconds")
+    run_cmd.add_argument("--jitter", type=float, default=0.0, help="Relative latency spread, 0..1")
+    run_cmd.add_argument("--reject-rate", type=float, default=0.0, help="Share of questions the critic rejects")
+    run_cmd.add_argument("--rps", type=float, help="Per-model rate limit (default: LLM_DEFAULT_RPS); "
+                         "raise it to measure orchestration overhead alone")
+    run_cmd.add_argument("--out", help="Write results JSON (a baseline) to this file")
+
+    compare_cmd = commands.add_parser("compare", help="Flag regressions against a baseline")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--threshold", type=float, default=0.1, help="Relative change that counts (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for r in regressions:
+            change = f"+{r['change']:.1%}" if r["change"] is not None else "new"
+            print(f"REGRESSION {r['scope']:<15} {r['metric']:<30} {r['baseline']} -> {r['current']} ({change})")
+        print(f"{len(regressions)} regressions (threshold {args.threshold:.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+
+    out = os.path.abspath(args.out) if args.out else None
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from config import settings
+    from utils.log_config import setup_logging
+    setup_logging("WARNING", use_queue=False)
+    if args.rps:
+        settings.LLM_DEFAULT_RPS = args.rps  # Limiters are created on first use, after this
+    with scratch_dir():
+        results = run_suite(args.scenario, repeat=args.repeat, latency=args.latency,
+                            jitter=args.jitter, reject_rate=args.reject_rate)
+    print(format_summary(results))
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
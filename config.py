@@ -3,8 +3,8 @@ Configuration settings for Interview Coach.
 Uses Pydantic Settings for environment variable management.
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
-from typing import Optional
+from pydantic import Field, model_validator
+from typing import Dict, List, Optional
 import sys
 import logging
 
@@ -31,10 +31,121 @@ class Settings(BaseSettings):
     MODEL_OBSERVER: str = "openai/gpt-4o"
     MODEL_INTERVIEWER: str = "openai/gpt-4o"
     MODEL_ROUTER: str = "openai/gpt-4o-mini"
-    
+
+    # Turn Deadline Settings (seconds)
+    TURN_DEADLINE_SECONDS: float = 45.0  # Hard budget for one candidate turn
+    DEADLINE_FULL_MODEL_SECONDS: float = 15.0  # Below this, switch to the router-tier model
+    DEADLINE_CRITIC_SECONDS: float = 8.0  # Below this, skip the critic / no regeneration
+    DEADLINE_LLM_SECONDS: float = 3.0  # Below this, use templated output instead of an LLM
+    REPORT_DEADLINE_SECONDS: float = 90.0  # Budget for the final report (manager, report, roadmap)
+    LLM_REQUEST_TIMEOUT: float = 30.0  # Per-request HTTP timeout for ChatOpenAI
+
+    # LLM Retry Settings
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_BACKOFF_BASE: float = 0.5  # Seconds, decorrelated jitter lower bound
+    LLM_BACKOFF_CAP: float = 8.0  # Seconds, maximum jittered backoff
+
+    # LLM Rate Limits (per model, shared by all sessions in the process)
+    LLM_DEFAULT_RPS: float = 5.0  # Requests per second
+    LLM_DEFAULT_TPM: float = 200_000  # Tokens per minute
+    LLM_MAX_IN_FLIGHT: int = 16  # Upper bound for the adaptive concurrency limit
+    LLM_LATENCY_TARGET: float = 20.0  # Seconds; slower responses shrink the limit
+    LLM_TOKENS_OVERHEAD_ESTIMATE: int = 1000  # Prompt template + completion allowance
+    LLM_MODEL_LIMITS: Dict[str, Dict[str, float]] = {}  # {"model": {"rps", "tpm", "max_in_flight", "latency_target"}}
+
+    # LLM Priority Scheduling (live turns vs. reports/planning)
+    LLM_BACKGROUND_SHARE: float = 0.5  # Max share of in-flight slots for background calls
+    LLM_STARVATION_SECONDS: float = 30.0  # Background calls waiting longer are promoted
+
+    # Hedged Requests (opt-in per node, e.g. ["router", "critic"])
+    HEDGE_NODES: List[str] = []
+    HEDGE_QUANTILE: float = 0.9  # Fire a duplicate after this observed latency quantile
+    HEDGE_BUDGET_RATIO: float = 0.1  # At most ~10% extra calls
+    HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before hedging starts
+
+    # Interviewer Cascade: router-tier model first, MODEL_INTERVIEWER only after a rejection
+    INTERVIEWER_CASCADE: bool = False
+    INTERVIEWER_CASCADE_GRADES: List[str] = ["Junior", "Middle"]  # Other grades always use the full model
+
+    # Checkpointing ("memory" or "sqlite"; SQLite survives restarts and is shared by workers)
+    CHECKPOINT_BACKEND: str = "memory"
+    CHECKPOINT_DB_PATH: str = "checkpoints/checkpoints.sqlite"
+    CHECKPOINT_KEEP_LAST: int = 10  # Latest checkpoints kept per thread, 0 keeps all
+    CHECKPOINT_COMPACT_EVERY: int = 200  # Checkpoint writes between vacuum / WAL truncation
+    CHECKPOINT_SNAPSHOT_EVERY: int = 50  # Delta versions of a list channel between full snapshots, 0 disables deltas
+
+    # Session Hibernation (memory backend): cold threads are moved to disk, 0 disables a limit
+    SESSION_IDLE_TTL_SECONDS: float = 1800.0
+    SESSION_MEMORY_HIGH_WATER_MB: float = 512.0  # Checkpoint bytes kept in memory
+    SESSION_HIBERNATE_DIR: str = "checkpoints/hibernated"
+
+    # Log Store: final logs sharded as <dir>/YYYY/MM/DD/<hash>/<thread_id>.json + manifest.jsonl
+    LOG_STORE_DIR: str = "logs/sessions"  # "" writes interview_log_{session_id}.json to the working directory
+
+    # Interview Archive: FTS5 index over saved logs (python -m utils.archive)
+    ARCHIVE_DB_PATH: str = "logs/archive.sqlite"
+
+    # Turn Journal: each turn appended as a JSONL line, compacted into the session log at the end
+    TURN_LOG_DIR: str = "logs/turns"  # "" disables the journal (log written only at the end)
+    TURN_LOG_FSYNC_EVERY: int = 16  # Appended lines per fsync batch
+    TURN_LOG_FSYNC_INTERVAL_SECONDS: float = 1.0  # An append after this long fsyncs the batch
+
+    # Tracing: spans per node, LLM call, attempt and search (export with python -m utils.tracing)
+    TRACE_ENABLED: bool = False
+    TRACE_DIR: str = "logs/traces"  # One JSONL span file per thread
+
+    # Cassettes: record every LLM request and response (replay with python -m utils.cassette)
+    CASSETTE_RECORD: bool = False
+    CASSETTE_DIR: str = "logs/cassettes"  # One JSONL cassette per thread
+
+    # Feedback: look up learning resources for knowledge gaps (DuckDuckGo)
+    WEB_SEARCH_ENABLED: bool = True
+
+    # Cost Ledger: USD per 1M tokens as [prompt, completion]; keys are model names (provider prefix optional)
+    LLM_PRICES: Dict[str, List[float]] = {
+        "gpt-4o": [2.5, 10.0],
+        "gpt-4o-mini": [0.15, 0.6],
+    }
+
+    # Metrics: Prometheus text format at http://METRICS_HOST:METRICS_PORT/metrics
+    METRICS_PORT: int = 0  # 0 disables the endpoint (e.g. 9464)
+    METRICS_HOST: str = "127.0.0.1"
+
+    # Circuit Breakers (per model)
+    CIRCUIT_FAILURE_RATE: float = 0.5  # Open when this share of recent calls failed or was slow
+    CIRCUIT_MIN_CALLS: int = 5  # Calls in the window before the rate is evaluated
+    CIRCUIT_WINDOW_SECONDS: float = 60.0
+    CIRCUIT_SLOW_CALL_SECONDS: float = 20.0  # Slower successful calls count as failures
+    CIRCUIT_OPEN_SECONDS: float = 30.0  # Time before a half-open probe is allowed
+
+    # Fallback Chains: node -> models to try in order; "template" = node's templated output.
+    # Nodes missing here get the defaults from _default_fallback_chains.
+    FALLBACK_CHAINS: Dict[str, List[str]] = {}
+
     # Logging Settings
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Optional[str] = None  # Optional file logging
+    LOG_FORMAT: str = "text"  # "json": one object per line with thread_id, turn, node, model, latency, tokens
+    LOG_QUEUE: bool = True  # Background writer thread; nodes never block on log I/O
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the writer
+    LOG_QUEUE_OVERFLOW: str = "drop"  # Full queue: "drop" DEBUG/INFO (others wait) or "block" everything
+
+    @model_validator(mode="after")
+    def _default_fallback_chains(self) -> "Settings":
+        """Fill in fallback chains for nodes that are not configured explicitly."""
+        defaults = {
+            "router": [self.MODEL_ROUTER, "template"],
+            "critic": [self.MODEL_ROUTER, "template"],
+            "planner": [self.MODEL_ROUTER, self.MODEL_INTERVIEWER, "template"],
+            "observer": [self.MODEL_OBSERVER, self.MODEL_ROUTER, "template"],
+            "interviewer": [self.MODEL_INTERVIEWER, self.MODEL_ROUTER, "template"],
+            "manager": [self.MODEL_INTERVIEWER, self.MODEL_ROUTER, "template"],
+            "report": [self.MODEL_INTERVIEWER, self.MODEL_ROUTER, "template"],
+            "roadmap": [self.MODEL_INTERVIEWER, self.MODEL_ROUTER, "template"],
+        }
+        for node, chain in defaults.items():
+            self.FALLBACK_CHAINS.setdefault(node, chain)
+        return self
 
 
 # Singleton instance
@@ -2,35 +2,42 @@
 Feedback Node - Generates final report with hiring decision and development roadmap.
 Includes bonus web search for learning resources.
 """
-from state import AgentState
+from state import AgentState, ObserverThought, TurnRecord
 from utils.report import generate_final_report, generate_development_roadmap
-from utils.logger import LoggerUtils
+from utils.log_store import log_store
+from utils.turn_log import turn_journal
 from langchain_core.messages import AIMessage
-from utils.log_config import get_logger
+from langchain_core.runnables import RunnableConfig
+from utils.log_config import current_node_stats, get_logger
+from utils.cost import session_ledger
+from utils.tracing import span
 import concurrent.futures
+import contextvars
+from typing import Optional
 
 logger = get_logger("feedback")
 
 
-def feedback_node(state: AgentState):
+def feedback_node(state: AgentState, config: Optional[RunnableConfig] = None):
     """
     Generates the final report, performs bonus web search for roadmap, 
     and saves the log (including the final turn N).
+    The final turn is journaled before the slow report generation; the log
+    is then compacted from the journal into the log store (full rewrite as
+    a fallback).
     """
     logger.info("Generating final feedback report...")
     
     from utils.report import generate_technical_report
-    from langchain_openai import ChatOpenAI
+    from utils.llm_utils import get_chat_model
+    from utils.deadline import open_turn
     from config import settings
     from agents.manager import ManagerAgent
     
-    api_base = settings.OPENAI_API_BASE
-    llm = ChatOpenAI(
-        model=settings.MODEL_INTERVIEWER, 
-        temperature=0, 
-        base_url=api_base,
-        api_key=settings.OPENAI_API_KEY
-    )
+    # Manager, report and roadmap share one report budget instead of the STOP turn's leftovers
+    state = {**state, **open_turn(settings.REPORT_DEADLINE_SECONDS)}
+    
+    llm = get_chat_model(settings.MODEL_INTERVIEWER, temperature=0)
     
     # 1. Manager Decision
     logger.info("Manager Agent evaluating candidate...")
@@ -50,20 +57,15 @@ def feedback_node(state: AgentState):
     if messages and hasattr(messages[-1], "content"):
         last_user_message = messages[-1].content
         
-    # Aggregate thoughts for turn N
-    turn_thoughts = state.get("current_turn_thoughts", {})
-    turn_thoughts["Manager"] = f"Final evaluation: {manager_decision.get('recommendation', 'N/A')}. Confidence: {manager_decision.get('confidence_score', 0)}%"
-    
-    formatted_thoughts = ""
-    for agent, thought in turn_thoughts.items():
-        formatted_thoughts += f"[{agent}]: {thought}\n"
-        
-    final_turn_log = {
-        "turn_id": loop_count + 1,
-        "agent_visible_message": last_question,
-        "user_message": last_user_message,
-        "internal_thoughts": formatted_thoughts
+    # Aggregate thoughts for turn N (copy: state values are shared with the checkpoint)
+    turn_thoughts = {
+        **state.get("current_turn_thoughts", {}),
+        "Manager": f"Final evaluation: {manager_decision.get('recommendation', 'N/A')}. Confidence: {manager_decision.get('confidence_score', 0)}%"
     }
+    final_turn_log = TurnRecord.build(loop_count + 1, last_question, last_user_message, turn_thoughts,
+                                      critic_rejections=state.get("critic_retry_count", 0))
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    turn_journal.append(thread_id, final_turn_log)
     
     # 2. Technical Review
     logger.info("Generating technical review...")
@@ -73,17 +75,17 @@ def feedback_node(state: AgentState):
     internal_thoughts = state.get("internal_thoughts", [])
     gaps = []
     for thought in internal_thoughts:
-        if isinstance(thought, dict):
+        if isinstance(thought, (dict, ObserverThought)):
             if thought.get("decision") in ["DECREASE_DIFFICULTY", "MAINTAIN"]:
                 gaps.append(thought.get("analysis", ""))
 
     # Web search for learning resources
     links_section = ""
-    if gaps:
+    if gaps and settings.WEB_SEARCH_ENABLED:
         logger.info("Searching for learning resources (DuckDuckGo)...")
         links_section = _search_learning_resources(gaps[:3])
     else:
-        logger.debug("No knowledge gaps detected, skipping web search")
+        logger.debug("No knowledge gaps detected or web search disabled, skipping it")
 
     from utils.report import generate_development_roadmap
     roadmap_core = generate_development_roadmap(state, llm)
@@ -108,21 +110,30 @@ def feedback_node(state: AgentState):
 *Generated by Multi-Agent Interview Coach with Live Search*
 """
 
-    # Save log with scenario filename
-    session_id = state.get("session_id", 1)
-    filename = f"interview_log_{session_id}.json"
-    
     # Join the accumulated log with the very last turn
     full_log = state.get("interview_log", []) + [final_turn_log]
     
-    LoggerUtils.save_log(
-        state['candidate_info'].get('Name', 'N/A'), 
-        full_log, 
-        full_report, 
-        filename=filename
+    journal_path = None
+    if thread_id and turn_journal.enabled:
+        turn_journal.close(thread_id)
+        journal_path = turn_journal.path(thread_id)
+    # The ledger so far plus this node's own calls (manager, report, roadmap)
+    stats = current_node_stats()
+    calls = list(state.get("llm_usage") or []) + [{**call, "turn": loop_count} for call in (stats.calls if stats else [])]
+    usage = session_ledger(calls, state['candidate_info'])
+    filename = log_store.save(
+        thread_id,
+        state['candidate_info'].get('Name', 'N/A'),
+        full_log,
+        full_report,
+        session_id=state.get("session_id", 1),
+        journal_path=journal_path,
+        usage=usage
     )
     
-    logger.info("Report saved to %s", filename)
+    if filename:
+        logger.info("Report saved to %s (LLM cost $%.4f, %d calls)", filename,
+                    usage["summary"]["cost_usd"], usage["summary"]["calls"])
     
     # Print report to console
     print("\n" + "="*50)
@@ -158,8 +169,10 @@ def _search_learning_resources(gaps: list) -> str:
             query = f"guide tutorial documentation {gap_text[:50]}"
             logger.debug("Searching: %s", query)
             
-            with DDGS() as ddgs:
+            with span("search", "search", query=query) as current, DDGS() as ddgs:
                 results = list(ddgs.text(query, max_results=1))
+                if current:
+                    current.set(results=len(results))
                 if results:
                     res = results[0]
                     logger.debug("Found: %s", res['title'])
@@ -171,7 +184,8 @@ def _search_learning_resources(gaps: list) -> str:
 
     # Execute searches concurrently
     with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        future_to_gap = {executor.submit(search_gap, gap): gap for gap in gaps}
+        # Each search runs in a copy of this context so its span joins the feedback node's trace
+        future_to_gap = {executor.submit(contextvars.copy_context().run, search_gap, gap): gap for gap in gaps}
         for future in concurrent.futures.as_completed(future_to_gap):
             result = future.result()
             if result:
@@ -2,9 +2,13 @@
 LangGraph definition for Multi-Agent Interview Coach.
 Defines the cyclic graph with nodes for each agent and routing logic.
 """
+import inspect
+import time
+from typing import Callable
+
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import RemoveMessage
+from langchain_core.runnables import RunnableConfig
 from dotenv import load_dotenv
 
 from state import AgentState
@@ -15,7 +19,15 @@ from agents.critic import critic_node
 from router import router_node
 from feedback import feedback_node
 from config import settings
-from utils.log_config import get_logger
+from utils.deadline import open_turn, has_budget
+from utils.llm_utils import get_chat_model
+from utils.cascade import cascade_stats
+from utils.checkpoint import create_checkpointer, stored_bytes
+from utils.turn_log import turn_journal
+from utils.log_config import get_logger, node_scope
+from utils.tracing import span, tracer
+from utils.cassette import record_turn
+from utils import metrics
 
 # Setup logger for graph
 logger = get_logger("graph")
@@ -24,22 +36,67 @@ logger = get_logger("graph")
 load_dotenv()
 
 # Initialize Models
-api_base = settings.OPENAI_API_BASE
-llm_observer = ChatOpenAI(model=settings.MODEL_OBSERVER, temperature=0, base_url=api_base)
-llm_interviewer = ChatOpenAI(model=settings.MODEL_INTERVIEWER, temperature=0.7, base_url=api_base)
+llm_observer = get_chat_model(settings.MODEL_OBSERVER, temperature=0)
+llm_interviewer = get_chat_model(settings.MODEL_INTERVIEWER, temperature=0.7)
+
+# Cheaper tier used when the turn deadline is close
+llm_observer_fast = get_chat_model(settings.MODEL_ROUTER, temperature=0)
+llm_interviewer_fast = get_chat_model(settings.MODEL_ROUTER, temperature=0.7)
 
 # Initialize Agents
-observer_agent = ObserverAgent(llm_observer)
-interviewer_agent = InterviewerAgent(llm_interviewer)
+observer_agent = ObserverAgent(llm_observer, fast_model=llm_observer_fast)
+interviewer_agent = InterviewerAgent(llm_interviewer, fast_model=llm_interviewer_fast)
 
 
 # Node Wrappers
+def instrumented(name: str, fn: Callable[..., dict],
+                 starts_turn: bool = False) -> Callable[[AgentState, RunnableConfig], dict]:
+    """
+    Run a node inside its log context (thread_id, turn, node) and log its
+    latency and LLM usage, so records of one turn correlate across nodes.
+    Its LLM calls are appended to the cost ledger (state["llm_usage"]).
+    The node is a span of its invocation's trace; the entry node
+    (`starts_turn`) opens a new trace and records the turn's input to the
+    active cassette.
+    """
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    def node(state: AgentState, config: RunnableConfig) -> dict:
+        thread_id = config.get("configurable", {}).get("thread_id")
+        turn = state.get("loop_count", 0)
+        if starts_turn:
+            record_turn(thread_id, turn, state)
+        with node_scope(name, thread_id=thread_id, turn=turn) as stats, \
+                tracer.turn(thread_id, new=starts_turn, turn=turn), span(name, "node"):
+            start = time.monotonic()
+            result = fn(state, config) if takes_config else fn(state)
+            latency = time.monotonic() - start
+            latency_ms = round(latency * 1000)
+            logger.info("Node %s finished in %d ms (%d LLM calls)", name, latency_ms, stats.llm_calls,
+                        extra={"latency_ms": latency_ms, **stats.as_fields()})
+        if stats.calls and isinstance(result, dict):
+            result = {**result, "llm_usage": [{**call, "turn": turn} for call in stats.calls]}
+        metrics.NODE_LATENCY.observe(latency, node=name)
+        if starts_turn:
+            metrics.TURNS.inc()
+        if name == "feedback":
+            metrics.sessions.end(thread_id)
+        else:
+            metrics.sessions.touch(thread_id)
+        return result
+
+    node.__name__ = getattr(fn, "__name__", name)
+    return node
+
+
 def planner_node_wrapper(state: AgentState):
-    """Executes Planner Logic once"""
+    """Opens the turn (start time and deadline) and executes Planner Logic once"""
+    turn = open_turn()
     if state.get("topic_plan"):
         logger.debug("Topic plan already exists, skipping planner")
-        return {"topic_plan": state["topic_plan"]}
-    return planner_node(state)
+        return {"topic_plan": state["topic_plan"], **turn}
+    result = planner_node({**state, **turn})
+    return {**result, **turn}
 
 
 def observer_node_wrapper(state: AgentState):
@@ -48,22 +105,51 @@ def observer_node_wrapper(state: AgentState):
     return observer_agent.run(state)
 
 
-def interviewer_node_wrapper(state: AgentState):
-    """Executes Interviewer Agent Logic"""
+def interviewer_node_wrapper(state: AgentState, config: RunnableConfig):
+    """Executes Interviewer Agent Logic and journals the completed turn"""
     logger.info("Interviewer generating question...")
-    return interviewer_agent.run(state)
+    result = interviewer_agent.run(state)
+    for turn in result["interview_log"]:
+        turn_journal.append(config["configurable"].get("thread_id"), turn)
+    return result
 
 
 def critic_node_wrapper(state: AgentState):
     """Executes Critic Logic and manages retries"""
     result = critic_node(state)
-    
-    # Track retries for the loop
-    current_retry = state.get("critic_retry_count", 0)
-    if result["critic_status"] == "REJECTED":
-        return {**result, "critic_retry_count": current_retry + 1}
+    metrics.CRITIC_DECISIONS.inc(status=result["critic_status"])
+
+    # critic_retry_count counts rejections of the current question; the
+    # interviewer resets it for a fresh one and logs it with the turn
+    rejected = result["critic_status"] == "REJECTED"
+    retry_count = state.get("critic_retry_count", 0) + 1
+    regenerate = rejected and retry_count < 2 and has_budget(state, settings.DEADLINE_CRITIC_SECONDS)
+
+    # A cheap cascade draft is escalated only when its rejection schedules a retry on the full model
+    if state.get("interviewer_tier") == "cascade":
+        grade = state["candidate_info"].get("Grade", "Middle")
+        cascade_stats.record(grade, escalated=regenerate)
+
+    # An approval may still carry feedback text; the next answer must not read it as a retry
+    if not rejected:
+        return {**result, "critic_feedback": ""}
+
+    if regenerate:
+        # Tombstone the rejected question so no prompt or checkpoint carries it
+        logger.warning("Re-generating question (Attempt %d/2)...", retry_count)
+        return {
+            **result,
+            "critic_feedback": result["critic_feedback"] or "Вопрос отклонён, задай другой.",
+            "critic_retry_count": retry_count,
+            "messages": [RemoveMessage(id=state["messages"][-1].id)]
+        }
+    if retry_count >= 2:
+        logger.warning("Question rejected again, retry limit reached, keeping it")
     else:
-        return {**result, "critic_retry_count": 0}  # Reset on success
+        logger.warning("Question rejected but turn budget is exhausted, keeping it")
+
+    # The question stays delivered: clear the feedback so the next turn starts fresh
+    return {**result, "critic_feedback": "", "critic_retry_count": retry_count}
 
 
 # Conditional Logic for Router
@@ -82,13 +168,9 @@ def route_next_step(state: AgentState):
 
 # Conditional Logic for Quality Loop
 def route_critic_decision(state: AgentState):
-    status = state.get("critic_status", "APPROVED")
-    retry_count = state.get("critic_retry_count", 0)
-    
-    if status == "REJECTED" and retry_count < 2:
-        logger.warning("Re-generating question (Attempt %d/2)...", retry_count + 1)
+    """Regenerate only when the critic wrapper removed the rejected question."""
+    if state.get("critic_status") == "REJECTED" and state.get("critic_feedback"):
         return "interviewer"
-    
     return END
 
 
@@ -96,12 +178,12 @@ def route_critic_decision(state: AgentState):
 builder = StateGraph(AgentState)
 
 # Add Nodes
-builder.add_node("planner", planner_node_wrapper)
-builder.add_node("router", router_node)
-builder.add_node("observer", observer_node_wrapper)
-builder.add_node("interviewer", interviewer_node_wrapper)
-builder.add_node("critic", critic_node_wrapper)
-builder.add_node("feedback", feedback_node)
+builder.add_node("planner", instrumented("planner", planner_node_wrapper, starts_turn=True))
+builder.add_node("router", instrumented("router", router_node))
+builder.add_node("observer", instrumented("observer", observer_node_wrapper))
+builder.add_node("interviewer", instrumented("interviewer", interviewer_node_wrapper))
+builder.add_node("critic", instrumented("critic", critic_node_wrapper))
+builder.add_node("feedback", instrumented("feedback", feedback_node))
 
 # Set Entry Point
 builder.set_entry_point("planner")
@@ -136,8 +218,9 @@ builder.add_conditional_edges(
 builder.add_edge("feedback", END)
 
 # Compile
-memory = MemorySaver()
+memory = create_checkpointer()
 graph = builder.compile(checkpointer=memory)
+metrics.CHECKPOINT_BYTES.set_function(lambda: stored_bytes(memory))
 
 if __name__ == "__main__":
     from utils.log_config import setup_logging
@@ -10,11 +10,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from graph import graph
+from config import settings
+from utils.log_store import log_store
 from utils.log_config import setup_logging, get_logger
+from utils.metrics import start_server
 
 # Initialize logging
-setup_logging(level="INFO")
+setup_logging(level="INFO", log_file=settings.LOG_FILE, use_queue=settings.LOG_QUEUE,
+              queue_size=settings.LOG_QUEUE_SIZE, overflow=settings.LOG_QUEUE_OVERFLOW,
+              fmt=settings.LOG_FORMAT)
 logger = get_logger("main")
+start_server(settings.METRICS_PORT, settings.METRICS_HOST)
 
 
 def main():
@@ -71,6 +77,9 @@ def main():
         "critic_retry_count": 0,
         "current_question": "",
         "current_turn_thoughts": {},
+        "turn_started": 0.0,
+        "turn_deadline": 0.0,
+        "interviewer_tier": "",
         "session_id": scenario_id
     }
     
@@ -115,8 +124,8 @@ def main():
             # Print Interviewer response
             print(f"\nInterviewer: {last_msg.content}")
              
-    # FINAL SAVING (using session_id)
-    report_filename = f"interview_log_{scenario_id}.json"
+    # FINAL SAVING (keyed by thread_id in the log store)
+    report_filename = log_store.find(thread_id) or f"interview_log_{scenario_id}.json"
     
     print("\n" + "="*50)
     print(f"Log saved to: {report_filename}")
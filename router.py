@@ -4,15 +4,19 @@ Classifies user messages into: ANSWER, ROLE_REVERSAL, INJECTION, STOP
 """
 from typing import Literal
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from state import AgentState
 from config import settings
-from utils.llm_utils import llm_retry
+from utils.llm_utils import get_chat_model, invoke_llm
+from utils.deadline import has_budget
 from utils.log_config import get_logger
+from utils.metrics import ROUTER_DECISIONS
 
 logger = get_logger("router")
 
+# Phrases treated as STOP when the turn budget leaves no time for the classifier
+STOP_PHRASES = {"стоп", "stop", "хватит", "enough", "заканчиваем", "finish", "стоп интервью", "стоп игра"}
+
 
 class RouteResponse(BaseModel):
     """Structured output for router classification."""
@@ -22,7 +26,6 @@ class RouteResponse(BaseModel):
     reasoning: str = Field(..., description="Brief explanation for the classification.")
 
 
-@llm_retry
 def router_node(state: AgentState):
     """
     Guardrail Node: Classifies user message for routing.
@@ -38,17 +41,14 @@ def router_node(state: AgentState):
     last_message = messages[-1].content
     logger.debug("Classifying user input: %s", last_message[:100])
     
-    # Initialize model via settings
-    api_base = settings.OPENAI_API_BASE
-    llm = ChatOpenAI(
-        model=settings.MODEL_ROUTER, 
-        temperature=0, 
-        base_url=api_base,
-        api_key=settings.OPENAI_API_KEY
-    )
+    if not has_budget(state, settings.DEADLINE_LLM_SECONDS):
+        decision = classify_by_keywords(last_message)
+        logger.warning("Turn budget exhausted, keyword decision: %s", decision)
+        ROUTER_DECISIONS.inc(category=decision)
+        return {"router_decision": decision}
     
-    # Structured output
-    structured_llm = llm.with_structured_output(RouteResponse)
+    # Shared model client via settings
+    llm = get_chat_model(settings.MODEL_ROUTER, temperature=0)
     
     system_prompt = """You are a Guardrail Classifier for an Interview Coach AI.
 Your task is to classify the USER INPUT into exactly one of these categories:
@@ -78,17 +78,30 @@ Analyze the input carefully. When in doubt, choose ANSWER.
         ("human", "User Input: {input}")
     ])
     
-    chain = prompt | structured_llm
-    
-    # Invoke model
+    # Invoke model (structured output)
     try:
-        response = chain.invoke({"input": last_message})
+        response = invoke_llm(
+            llm, lambda m: prompt | m.with_structured_output(RouteResponse),
+            {"input": last_message}, node="router", state=state
+        )
         decision = response.category
         logger.debug("Reasoning: %s", response.reasoning)
     except Exception as e:
         logger.error("Router classification failed: %s", e)
-        decision = "ANSWER"  # Fallback
+        decision = classify_by_keywords(last_message)  # Fallback
         
     logger.info("Decision: %s", decision)
+    ROUTER_DECISIONS.inc(category=decision)
     
     return {"router_decision": decision}
+
+
+def classify_by_keywords(text: str) -> str:
+    """
+    Cheap classification used when the LLM is unavailable or out of budget.
+    Only recognises explicit STOP commands; everything else is an ANSWER.
+    """
+    normalized = text.strip().lower().strip(".!? ")
+    if normalized in STOP_PHRASES:
+        return "STOP"
+    return "ANSWER"
@@ -1,6 +1,10 @@
-from typing import TypedDict, List, Dict, Annotated, Union, Any, Optional
+from typing import TypedDict, List, Dict, Annotated, Union, Any, Optional, Tuple, Mapping
+from dataclasses import dataclass
+import json
 import operator
+import sys
 from langchain_core.messages import AnyMessage
+from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
 # === Pydantic Output Schemas (For Structured Outputs) ===
@@ -23,6 +27,98 @@ class CriticOutput(BaseModel):
     status: str = Field(..., description="Decision: APPROVED or REJECTED.")
     feedback: str = Field(default="", description="If REJECTED, specific instructions on what to fix.")
 
+# === Compact Records (Observer thoughts and turn log) ===
+
+class _Record:
+    """Read-only dict-style access for slotted records, so `thought.get("decision")` keeps working."""
+    __slots__ = ()
+    _keys: Tuple[str, ...] = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._keys else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._keys
+
+
+@dataclass(frozen=True, slots=True)
+class ObserverThought(_Record):
+    """One Observer analysis, stored in `internal_thoughts`."""
+    analysis: str
+    decision: str
+    instruction: str
+    topics_covered: Tuple[str, ...] = ()
+    should_stop: bool = False
+
+    _keys = ("analysis", "decision", "instruction", "topics_covered", "should_stop")
+
+    def __post_init__(self):
+        # Decisions repeat every turn: share one string object per value
+        object.__setattr__(self, "decision", sys.intern(self.decision))
+        object.__setattr__(self, "topics_covered", tuple(self.topics_covered or ()))
+
+    @classmethod
+    def from_output(cls, output: ObserverOutput) -> "ObserverThought":
+        return cls(output.analysis, output.decision, output.instruction,
+                   tuple(output.topics_covered or ()), output.should_stop)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"analysis": self.analysis, "decision": self.decision, "instruction": self.instruction,
+                "topics_covered": list(self.topics_covered), "should_stop": self.should_stop}
+
+
+@dataclass(frozen=True, slots=True)
+class TurnRecord(_Record):
+    """One logged Q&A turn, stored in `interview_log`."""
+    turn_id: int
+    agent_visible_message: str
+    user_message: str
+    thoughts: Tuple[Tuple[str, str], ...] = ()
+    """(agent, thought) pairs in the order the agents ran."""
+    decision: str = ""
+    """Observer difficulty decision on the answer, "" if the Observer did not run."""
+    critic_rejections: int = 0
+    """Times the critic rejected this turn's question before it was asked."""
+    latency_ms: Optional[int] = None
+    """Answer-to-next-question latency (turn start to the interviewer's draft)."""
+
+    _keys = ("turn_id", "agent_visible_message", "user_message", "internal_thoughts")
+
+    def __post_init__(self):
+        object.__setattr__(self, "thoughts", tuple((sys.intern(agent), thought) for agent, thought in self.thoughts))
+        object.__setattr__(self, "decision", sys.intern(self.decision))
+
+    @classmethod
+    def build(cls, turn_id: int, question: str, answer: str, thoughts: Mapping[str, str],
+              decision: str = "", critic_rejections: int = 0, latency_ms: Optional[int] = None) -> "TurnRecord":
+        return cls(turn_id, question, answer, tuple(thoughts.items()), decision, critic_rejections, latency_ms)
+
+    @property
+    def internal_thoughts(self) -> str:
+        """Thoughts in the log format: "[Agent]: thought\\n" per agent."""
+        return "".join(f"[{agent}]: {thought}\n" for agent, thought in self.thoughts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Turn in the `validate_logs.py` schema, plus "metrics" when they were recorded."""
+        turn = {"turn_id": self.turn_id, "agent_visible_message": self.agent_visible_message,
+                "user_message": self.user_message, "internal_thoughts": self.internal_thoughts}
+        if self.decision or self.critic_rejections or self.latency_ms is not None:
+            turn["metrics"] = {"decision": self.decision, "critic_rejections": self.critic_rejections,
+                               "latency_ms": self.latency_ms}
+        return turn
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+
 # === Graph State ===
 
 class AgentState(TypedDict):
@@ -34,8 +130,12 @@ class AgentState(TypedDict):
     """
     
     # === Core Conversation ===
-    messages: Annotated[List[AnyMessage], operator.add]
-    """Full conversation history between interviewer and candidate."""
+    messages: Annotated[List[AnyMessage], add_messages]
+    """
+    Conversation history between interviewer and candidate.
+    Merged by id: questions the critic rejects are removed (RemoveMessage)
+    before the retry, so prompts and checkpoints only carry delivered ones.
+    """
     
     # === Candidate Metadata ===
     candidate_info: Dict[str, str]
@@ -54,9 +154,10 @@ class AgentState(TypedDict):
     """
     
     # === Observer's Hidden Thoughts ===
-    internal_thoughts: List[Union[str, Dict[str, Any]]]
+    internal_thoughts: List[Union[ObserverThought, Dict[str, Any], str]]
     """
-    List of Observer's analysis for each turn. Each entry is a dict with:
+    List of Observer's analysis for each turn. Each entry is an ObserverThought
+    (older checkpoints may hold plain dicts) with:
     - analysis: Brief analysis of the response
     - decision: INCREASE_DIFFICULTY / DECREASE_DIFFICULTY / MAINTAIN
     - instruction: What the Interviewer should do next
@@ -67,15 +168,23 @@ class AgentState(TypedDict):
     """
     
     # === Interview Log for Export ===
-    interview_log: Annotated[List[Dict[str, Any]], operator.add]
+    interview_log: Annotated[List[Union[TurnRecord, Dict[str, Any]]], operator.add]
     """
-    Turn-by-turn log for JSON export. Each entry contains:
+    Turn-by-turn log for JSON export. Each entry is a TurnRecord
+    (older checkpoints may hold plain dicts) with:
     - turn_id: Sequential number
     - agent_visible_message: What the interviewer asked
     - user_message: What the candidate replied
     - internal_thoughts: Formatted string "[Agent]: Thought\n"
     """
     
+    llm_usage: Annotated[List[Dict[str, Any]], operator.add]
+    """
+    Cost ledger: one entry per LLM call with node, model, prompt_tokens,
+    completion_tokens, queue_ms (rate-limiter wait) and turn. Saved with
+    the log (see utils.cost).
+    """
+    
     current_question: str
     """The last question asked by the interviewer (needed to log the full turn)."""
     
@@ -119,4 +228,24 @@ class AgentState(TypedDict):
     """Feedback from the Quality Critic if the question was REJECTED."""
     
     critic_retry_count: int
-    """Number of times the current question has been retried after rejection."""
+    """Critic rejections of the current question; reset when a fresh question is generated."""
+
+    interviewer_tier: str
+    """
+    Model tier that produced the current question:
+    - cascade: Router-tier model, first attempt under INTERVIEWER_CASCADE
+    - fast: Router-tier model because the turn budget is short
+    - full: MODEL_INTERVIEWER
+    - template: Templated fallback, no LLM call
+    """
+
+    # === Turn Deadline ===
+    turn_started: float
+    """UNIX timestamp at which the current turn started (TurnRecord.latency_ms is measured from it)."""
+
+    turn_deadline: float
+    """
+    UNIX timestamp by which the current turn must produce an answer.
+    Set at the start of every graph invocation; nodes use the remaining
+    budget to skip the critic, use a cheaper model or fall back to templates.
+    """
@@ -2,6 +2,9 @@ import streamlit as st
 import uuid
 from langchain_core.messages import HumanMessage, AIMessage
 from graph import graph
+from config import settings
+from utils.log_store import log_store
+from utils.metrics import start_server
 from dotenv import load_dotenv
 import time
 
@@ -13,6 +16,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Idempotent: the script reruns on every interaction
+start_server(settings.METRICS_PORT, settings.METRICS_HOST)
+
 # Custom Glassmorphic CSS
 st.markdown("""
     <style>
@@ -56,10 +62,18 @@ st.markdown("""
 # Session State Initialization
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "thread_id" not in st.session_state:
-    st.session_state.thread_id = str(uuid.uuid4())
 if "interview_started" not in st.session_state:
     st.session_state.interview_started = False
+if "thread_id" not in st.session_state:
+    # Resume the thread from the URL (persistent checkpointer survives restarts)
+    st.session_state.thread_id = st.query_params.get("thread") or str(uuid.uuid4())
+    restored = graph.get_state({"configurable": {"thread_id": st.session_state.thread_id}}).values
+    if restored.get("messages"):
+        st.session_state.messages = [
+            {"role": "user" if isinstance(m, HumanMessage) else "assistant", "content": m.content}
+            for m in restored["messages"]
+        ]
+        st.session_state.interview_started = True
 if "finished" not in st.session_state:
     st.session_state.finished = False
 
@@ -79,6 +93,7 @@ with st.sidebar:
         st.session_state.interview_started = True
         st.session_state.messages = []
         st.session_state.thread_id = str(uuid.uuid4())
+        st.query_params["thread"] = st.session_state.thread_id
         st.session_state.finished = False
         
         # Initial State
@@ -96,6 +111,9 @@ with st.sidebar:
             "critic_retry_count": 0,
             "current_question": "",
             "current_turn_thoughts": {},
+            "turn_started": 0.0,
+            "turn_deadline": 0.0,
+            "interviewer_tier": "",
             "session_id": scenario_id
         }
         
@@ -176,9 +194,10 @@ else:
         final_state = graph.get_state(config).values
         
         # Display the markdown report
-        # The feedback_node saves the report in interview_log.json and sends INTERVIEW_FINISHED.
+        # The feedback_node saves the report in the log store and sends INTERVIEW_FINISHED.
         # But we can reconstructed it or show where it is.
-        st.success(f"Log saved as interview_log_{final_state.get('session_id')}.json")
+        log_path = log_store.find(st.session_state.thread_id) or f"interview_log_{final_state.get('session_id')}.json"
+        st.success(f"Log saved as {log_path}")
         
         if st.button("🔄 Начать заново"):
             st.session_state.interview_started = False
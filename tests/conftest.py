@@ -13,6 +13,13 @@ os.environ.setdefault("OPENAI_API_KEY", "test-key-for-unit-tests")
 os.environ.setdefault("OPENAI_API_BASE", "https://api.openai.com/v1")
 
 
+@pytest.fixture(autouse=True)
+def closed_circuits():
+    """Breakers are shared per model name; failures in one test must not open them for the next."""
+    from utils import circuit_breaker
+    circuit_breaker._breakers.clear()
+
+
 @pytest.fixture
 def sample_candidate_info():
     """Sample candidate information for tests."""
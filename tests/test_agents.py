@@ -140,6 +140,108 @@ class TestQualityLoopLogic:
         assert should_retry is True
 
 
+class TestRejectedQuestionTombstone:
+    """Rejected questions are removed from history before the retry."""
+
+    def _rejected_state(self, sample_state, retry_count=0):
+        import time
+        from langgraph.graph.message import add_messages
+
+        messages = add_messages([], [AIMessage(content="Первый вопрос?"), HumanMessage(content="Ответ"),
+                                     AIMessage(content="Плохой вопрос")])
+        return {**sample_state, "messages": messages, "critic_retry_count": retry_count,
+                "turn_deadline": time.time() + 60}
+
+    def test_rejection_tombstones_question(self, sample_state):
+        from unittest.mock import patch
+        from langgraph.graph.message import add_messages
+        import graph
+
+        state = self._rejected_state(sample_state)
+        verdict = {"critic_status": "REJECTED", "critic_feedback": "Повтор", "current_turn_thoughts": {}}
+        with patch.object(graph, "critic_node", return_value=verdict):
+            update = graph.critic_node_wrapper(state)
+
+        history = add_messages(state["messages"], update["messages"])
+        assert [m.content for m in history] == ["Первый вопрос?", "Ответ"]
+        assert graph.route_critic_decision({**state, **update}) == "interviewer"
+
+    def test_rejection_without_retry_keeps_question(self, sample_state):
+        from unittest.mock import patch
+        from langgraph.graph import END
+        import graph
+
+        state = self._rejected_state(sample_state, retry_count=1)
+        verdict = {"critic_status": "REJECTED", "critic_feedback": "Повтор", "current_turn_thoughts": {}}
+        with patch.object(graph, "critic_node", return_value=verdict):
+            update = graph.critic_node_wrapper(state)
+
+        assert "messages" not in update
+        assert update["critic_feedback"] == ""
+        assert graph.route_critic_decision({**state, **update}) == END
+
+    def test_retry_does_not_relog_turn(self, sample_state):
+        """The turn was logged on the first attempt; the retry only replaces the question."""
+        from unittest.mock import MagicMock
+        from agents.interviewer import InterviewerAgent
+
+        state = {**sample_state,
+                 "messages": [AIMessage(content="Первый вопрос?"), HumanMessage(content="Ответ")],
+                 "current_question": "Первый вопрос?", "critic_feedback": "Повтор", "loop_count": 2}
+        result = InterviewerAgent(MagicMock()).run(state)
+
+        assert result["interview_log"] == []
+        assert result["loop_count"] == 2
+
+
+class TestApprovalWithFeedback:
+    """An approving critic's feedback does not turn the next answer into a retry."""
+
+    def test_feedback_is_cleared(self, sample_state):
+        from unittest.mock import patch
+        from langgraph.graph import END
+        import graph
+
+        state = {**sample_state, "messages": [AIMessage(content="Что такое GIL?", id="q1")]}
+        verdict = {"critic_status": "APPROVED", "critic_feedback": "Хороший вопрос", "current_turn_thoughts": {}}
+        with patch.object(graph, "critic_node", return_value=verdict):
+            update = graph.critic_node_wrapper(state)
+
+        assert update["critic_feedback"] == ""
+        assert graph.route_critic_decision({**state, **update}) == END
+
+    def test_turns_are_logged(self, tmp_path, monkeypatch):
+        import contextlib
+        import io
+        import json
+        from benchmarks.fake_llm import FakeChatModel
+        from benchmarks.run import run_session
+        from config import settings
+        from graph import graph
+        from utils.llm_utils import override_models
+
+        class PraisingCritic(FakeChatModel):
+            def _respond(self, schema, prompt, digest):
+                if schema == "CriticOutput":
+                    return json.dumps({"status": "APPROVED", "feedback": "Хороший вопрос"})
+                return super()._respond(schema, prompt, digest)
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(settings, "LLM_DEFAULT_RPS", 1000.0)
+        monkeypatch.setattr(settings, "WEB_SEARCH_ENABLED", False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            previous = override_models(lambda model, temperature: PraisingCritic(model_name=model))
+            try:
+                run_session(graph, "approval-feedback", ["GIL мешает потокам.", "asyncio для I/O."])
+            finally:
+                override_models(previous)
+
+        values = graph.get_state({"configurable": {"thread_id": "approval-feedback"}}).values
+        assert len(values["interview_log"]) == 2
+        assert values["loop_count"] == 3
+        assert values["critic_feedback"] == ""
+
+
 class TestGraphRoutingLogic:
     """Test graph routing decision logic from graph.py."""
     
@@ -0,0 +1,107 @@
+"""
+Tests for the columnar analytics export and vectorized reports.
+"""
+import json
+import time
+
+import numpy as np
+
+
+def _write_log(path, grade, decision, confidence, turn_metrics):
+    log = {
+        "participant_name": "N",
+        "turns": [
+            {"turn_id": i + 1, "agent_visible_message": "Q", "user_message": "A",
+             "internal_thoughts": "[Observer]: ok\n", "metrics": metrics}
+            for i, metrics in enumerate(turn_metrics)
+        ],
+        "final_feedback": f"- **Позиция**: Backend\n- **Грейд**: {grade}\n"
+                          f"### Решение: **{decision}**\n- **Уверенность**: {confidence}%\n"
+    }
+    path.write_text(json.dumps(log, ensure_ascii=False), encoding="utf-8")
+
+
+def _metrics(decision, rejections=0, latency=1000):
+    return {"decision": decision, "critic_rejections": rejections, "latency_ms": latency}
+
+
+class TestAnalyticsExport:
+    """Test flattening logs into arrays."""
+
+    def test_export_and_report(self, tmp_path):
+        from utils.analytics import export, load, report
+
+        _write_log(tmp_path / "a.json", "Senior", "HIRE", 80,
+                   [_metrics("INCREASE_DIFFICULTY"), _metrics("INCREASE_DIFFICULTY", 1, 3000)])
+        _write_log(tmp_path / "b.json", "Senior", "NO_HIRE", 75,
+                   [_metrics("DECREASE_DIFFICULTY"), _metrics("MAINTAIN"), _metrics("DECREASE_DIFFICULTY")])
+        _write_log(tmp_path / "c.json", "Junior", "MAYBE", 60, [_metrics("", latency=None)])
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+        out = str(tmp_path / "data.npz")
+        assert export([str(tmp_path / "*.json")], out) == {"sessions": 3, "turns": 6, "skipped": 1}
+        data = load(out)
+        assert list(np.diff(data["turn_offsets"])) == [2, 3, 1]
+
+        stats = report(data)
+        assert stats["funnel"]["Senior"] == {"sessions": 2, "decisions": {"HIRE": 1, "NO_HIRE": 1}, "hire_rate": 0.5}
+        assert stats["depth"] == [1.0, round(2 / 3, 4), round(1 / 3, 4)]
+        # NO_HIRE at 75% is outside its 30-49 band
+        assert stats["calibration"]["by_decision"]["NO_HIRE"]["in_band"] == 0.0
+        assert stats["calibration"]["in_band"] == round(2 / 3, 4)
+        assert stats["difficulty"]["transitions"]["INCREASE_DIFFICULTY->INCREASE_DIFFICULTY"] == 1
+        assert stats["difficulty"]["transitions"]["DECREASE_DIFFICULTY->MAINTAIN"] == 1
+        assert stats["difficulty"]["mean_net_trajectory"] == {"HIRE": 2.0, "NO_HIRE": -2.0, "MAYBE": 0.0}
+        assert stats["latency"]["overall"]["turns"] == 5
+        assert stats["critic"]["rejected_share"] == round(1 / 6, 4)
+
+    def test_legacy_logs_without_metrics(self, tmp_path):
+        from utils.analytics import export, load, report
+
+        log = {"participant_name": "N", "final_feedback": "",
+               "turns": [{"turn_id": 1, "agent_visible_message": "Q", "user_message": "A",
+                          "internal_thoughts": "[Observer]: ok\n"}]}
+        (tmp_path / "old.json").write_text(json.dumps(log), encoding="utf-8")
+        out = str(tmp_path / "data.npz")
+        export([str(tmp_path / "old.json")], out)
+
+        stats = report(load(out))
+        assert stats["critic"] == {"turns": 0}
+        assert stats["latency"]["overall"] is None
+        assert stats["funnel"]["unknown"]["sessions"] == 1
+
+
+class TestVectorizedReport:
+    """The report must scale to tens of thousands of sessions."""
+
+    def test_report_scales(self):
+        from utils.analytics import DIFFICULTY, report
+
+        rng = np.random.default_rng(0)
+        n = 30_000
+        turn_counts = rng.integers(1, 12, n)
+        offsets = np.concatenate([[0], np.cumsum(turn_counts)])
+        turns = int(offsets[-1])
+        data = {
+            "session_grade": rng.integers(0, 4, n).astype(np.int16),
+            "session_position": np.zeros(n, dtype=np.int16),
+            "session_decision": rng.integers(0, 6, n).astype(np.int16),
+            "session_confidence": rng.integers(0, 101, n).astype(np.float32),
+            "turn_offsets": offsets,
+            "turn_session": np.repeat(np.arange(n, dtype=np.int32), turn_counts),
+            "turn_id": np.zeros(turns, dtype=np.int32),
+            "turn_latency_ms": rng.gamma(2.0, 2000.0, turns).astype(np.float32),
+            "turn_decision": rng.integers(0, len(DIFFICULTY), turns).astype(np.int8),
+            "turn_critic_rejections": rng.integers(0, 3, turns).astype(np.int16),
+            "grade_vocab": np.array(["", "Junior", "Middle", "Senior"]),
+            "position_vocab": np.array([""]),
+            "decision_vocab": np.array(["", "STRONG_HIRE", "HIRE", "MAYBE", "NO_HIRE", "STRONG_NO_HIRE"]),
+            "difficulty_vocab": np.array(DIFFICULTY),
+        }
+
+        started = time.perf_counter()
+        stats = report(data)
+        assert time.perf_counter() - started < 5.0
+        assert stats["sessions"] == n
+        assert sum(g["sessions"] for g in stats["funnel"].values()) == n
+        assert stats["depth"][0] == 1.0
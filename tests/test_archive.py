@@ -0,0 +1,75 @@
+"""
+Tests for the FTS5 interview archive.
+"""
+import json
+import os
+
+
+def _write_log(path, name="Иван", grade="Senior", position="Python Backend Developer",
+               decision="HIRE", answer="Asyncio использует event loop"):
+    log = {
+        "participant_name": name,
+        "turns": [{
+            "turn_id": 1,
+            "agent_visible_message": "Как работает asyncio?",
+            "user_message": answer,
+            "internal_thoughts": "[Observer]: Кандидат галлюцинирует про asyncio.\n"
+        }],
+        "final_feedback": f"- **Позиция**: {position}\n- **Грейд**: {grade}\n\n"
+                          f"### Решение: **{decision}**\n- **Уверенность**: 80%\n"
+    }
+    path.write_text(json.dumps(log, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+class TestInterviewArchive:
+    """Test ingest and search."""
+
+    def test_search_with_metadata_filters(self, tmp_path):
+        from utils.archive import InterviewArchive
+
+        _write_log(tmp_path / "interview_log_1.json")
+        _write_log(tmp_path / "interview_log_2.json", grade="Junior")
+        _write_log(tmp_path / "interview_log_3.json", position="Frontend Developer")
+        archive = InterviewArchive(str(tmp_path / "archive.sqlite"))
+        archive.ingest([str(tmp_path / "interview_log_*.json")])
+
+        hits = archive.search("галлюцинирует AND asyncio", grade="senior", position="Backend")
+        assert [os.path.basename(h["path"]) for h in hits] == ["interview_log_1.json"]
+        assert hits[0]["decision"] == "HIRE"
+        assert hits[0]["turn_id"] == 1
+        assert "[" in hits[0]["snippet"]
+        assert archive.search("HIRE", scope="reports", position="Frontend")[0]["grade"] == "Senior"
+        archive.close()
+
+    def test_ingest_is_incremental(self, tmp_path):
+        from utils.archive import InterviewArchive
+
+        path = _write_log(tmp_path / "log.json")
+        archive = InterviewArchive(str(tmp_path / "archive.sqlite"))
+        assert archive.ingest([path])["indexed"] == 1
+        assert archive.ingest([path])["unchanged"] == 1
+
+        # Touched with identical content: not re-indexed
+        os.utime(path, (0, 0))
+        assert archive.ingest([path])["unchanged"] == 1
+
+        _write_log(tmp_path / "log.json", answer="Корутины и GIL")
+        assert archive.ingest([path])["indexed"] == 1
+        assert archive.search("корутины")
+        assert archive.search("loop") == []  # Old turn text left the index
+        archive.close()
+
+    def test_prune_and_unreadable(self, tmp_path):
+        from utils.archive import InterviewArchive
+
+        path = _write_log(tmp_path / "log.json")
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+        archive = InterviewArchive(str(tmp_path / "archive.sqlite"))
+        assert archive.ingest([str(tmp_path)])["skipped"] == 1
+
+        os.remove(path)
+        assert archive.ingest([], prune=True)["pruned"] == 1
+        assert archive.search("asyncio") == []
+        assert archive.search("HIRE", scope="reports") == []
+        archive.close()
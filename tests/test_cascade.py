@@ -0,0 +1,129 @@
+"""
+Tests for the interviewer model cascade.
+"""
+from unittest.mock import MagicMock, patch
+
+
+def _response(text):
+    return MagicMock(response_text=text)
+
+
+class TestLocalCheck:
+    """Test the rule-based checks run before escalation."""
+
+    def test_accepts_normal_question(self):
+        from agents.critic import local_check
+
+        assert local_check("Что такое GIL в Python?", []) == ""
+
+    def test_rejects_bad_drafts(self):
+        from agents.critic import local_check
+
+        assert local_check("   ", [])
+        assert local_check("What is the GIL?", [])
+        assert local_check("Что такое GIL? 🙂", [])
+        assert local_check("Что такое GIL?", ["Что такое GIL?"])
+        assert local_check("Вопрос " * 200, [])
+
+
+class TestCascadeStats:
+    """Test escalation rate tracking."""
+
+    def test_rates_per_grade(self):
+        from utils.cascade import CascadeStats
+
+        stats = CascadeStats()
+        for escalated in (False, False, True, False):
+            stats.record("Junior", escalated)
+        stats.record("Middle", True)
+
+        result = stats.stats()
+        assert result["Junior"]["escalation_rate"] == 0.25
+        assert result["Middle"] == {"attempts": 1, "escalations": 1, "escalation_rate": 1.0}
+
+    def test_exported_as_metrics(self):
+        from utils import metrics
+        from utils.cascade import CascadeStats
+
+        attempts = metrics.CASCADE_ATTEMPTS.value(grade="Senior")
+        escalations = metrics.CASCADE_ESCALATIONS.value(grade="Senior")
+        stats = CascadeStats()
+        stats.record("Senior", escalated=False)
+        stats.record("Senior", escalated=True)
+
+        assert metrics.CASCADE_ATTEMPTS.value(grade="Senior") == attempts + 2
+        assert metrics.CASCADE_ESCALATIONS.value(grade="Senior") == escalations + 1
+        assert 'interview_cascade_escalations_total{grade="Senior"}' in metrics.registry.render()
+
+
+class TestInterviewerCascade:
+    """Test model selection in InterviewerAgent."""
+
+    def _agent(self):
+        from agents.interviewer import InterviewerAgent
+
+        return InterviewerAgent(MagicMock(name="full"), fast_model=MagicMock(name="fast"))
+
+    def test_first_attempt_uses_cheap_model(self, sample_state):
+        agent = self._agent()
+        with patch("config.settings.INTERVIEWER_CASCADE", True), \
+                patch("agents.interviewer.invoke_llm", return_value=_response("Что такое GIL?")) as invoke:
+            result = agent.run(sample_state)
+
+        assert invoke.call_args[0][0] is agent.fast_model
+        assert result["interviewer_tier"] == "cascade"
+
+    def test_local_rejection_escalates(self, sample_state):
+        agent = self._agent()
+        responses = [_response("What is the GIL?"), _response("Что такое GIL?")]
+        with patch("config.settings.INTERVIEWER_CASCADE", True), \
+                patch("agents.interviewer.invoke_llm", side_effect=responses) as invoke:
+            result = agent.run(sample_state)
+
+        assert [c[0][0] for c in invoke.call_args_list] == [agent.fast_model, agent.model]
+        assert result["interviewer_tier"] == "full"
+        assert result["current_question"] == "Что такое GIL?"
+
+    def test_retry_and_senior_use_full_model(self, sample_state):
+        agent = self._agent()
+        senior = {**sample_state, "candidate_info": {**sample_state["candidate_info"], "Grade": "Senior"}}
+        retry = {**sample_state, "critic_feedback": "Слишком просто"}
+        with patch("config.settings.INTERVIEWER_CASCADE", True), \
+                patch("agents.interviewer.invoke_llm", return_value=_response("Вопрос?")) as invoke:
+            agent.run(senior)
+            agent.run(retry)
+
+        assert all(c[0][0] is agent.model for c in invoke.call_args_list)
+
+    def test_disabled_by_default(self, sample_state):
+        agent = self._agent()
+        with patch("agents.interviewer.invoke_llm", return_value=_response("Вопрос?")) as invoke:
+            result = agent.run(sample_state)
+
+        assert invoke.call_args[0][0] is agent.model
+        assert result["interviewer_tier"] == "full"
+
+
+class TestCascadeEscalation:
+    """Only a rejection that schedules a retry counts as an escalation."""
+
+    def _record(self, sample_state, retry_count, deadline):
+        import time
+        from langchain_core.messages import AIMessage
+        import graph
+
+        state = {**sample_state, "interviewer_tier": "cascade", "critic_retry_count": retry_count,
+                 "messages": [AIMessage(content="What is the GIL?", id="q1")],
+                 "turn_deadline": time.time() + deadline}
+        verdict = {"critic_status": "REJECTED", "critic_feedback": "Не по-русски", "current_turn_thoughts": {}}
+        with patch.object(graph, "critic_node", return_value=verdict), \
+                patch.object(graph.cascade_stats, "record") as record:
+            graph.critic_node_wrapper(state)
+        return record.call_args
+
+    def test_retry_escalates(self, sample_state):
+        assert self._record(sample_state, retry_count=0, deadline=60).kwargs == {"escalated": True}
+
+    def test_kept_draft_does_not_escalate(self, sample_state):
+        assert self._record(sample_state, retry_count=1, deadline=60).kwargs == {"escalated": False}
+        assert self._record(sample_state, retry_count=0, deadline=1).kwargs == {"escalated": False}
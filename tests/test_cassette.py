@@ -0,0 +1,137 @@
+"""
+Tests for LLM call cassettes: recording, matching and session replay.
+"""
+import pytest
+
+
+class TestResponses:
+    """Responses survive the JSON round trip."""
+
+    def test_round_trip(self):
+        from langchain_core.messages import AIMessage
+        from state import CriticOutput
+        from utils.cassette import dump_response, load_response
+
+        critic = CriticOutput(status="REJECTED", feedback="Слишком общий вопрос")
+        assert load_response(dump_response(critic)) == critic
+        message = load_response(dump_response(AIMessage(content="## Report")))
+        assert isinstance(message, AIMessage) and message.content == "## Report"
+        assert load_response(dump_response({"a": 1})) == {"a": 1}
+
+
+class TestRecorder:
+    """Call indexes continue across restarts and evictions."""
+
+    def _call(self, recorder, thread_id, node, invoke=lambda: "ok"):
+        from utils.log_config import log_context
+
+        with log_context(thread_id=thread_id):
+            return recorder.call(node, {"q": node}, invoke)
+
+    def _indexes(self, recorder, thread_id):
+        from utils.cassette import load_cassette
+        return [(c["node"], c["index"]) for c in load_cassette(recorder.path(thread_id))["calls"]]
+
+    def test_resumed_thread_continues_indexes(self, tmp_path):
+        from utils.cassette import Recorder
+
+        first = Recorder(str(tmp_path))
+        self._call(first, "t", "critic")
+        self._call(first, "t", "router")
+        restarted = Recorder(str(tmp_path))
+        self._call(restarted, "t", "critic")
+
+        assert self._indexes(restarted, "t") == [("critic", 0), ("router", 0), ("critic", 1)]
+
+    def test_active_thread_is_not_evicted(self, tmp_path, monkeypatch):
+        from utils import cassette
+
+        monkeypatch.setattr(cassette, "_MAX_THREADS", 1)
+        recorder = cassette.Recorder(str(tmp_path))
+
+        def outer():  # Thread "a" has a call in flight while "b" and "a" call again
+            self._call(recorder, "b", "critic")
+            return self._call(recorder, "a", "critic")
+
+        self._call(recorder, "a", "critic", outer)
+        self._call(recorder, "b", "critic")
+
+        assert self._indexes(recorder, "a") == [("critic", 1), ("critic", 0)]
+        assert self._indexes(recorder, "b") == [("critic", 0), ("critic", 1)]
+        assert list(recorder._indexes) == ["b"]
+
+
+class TestReplayer:
+    """Calls are answered by node and index, checked against the request hash."""
+
+    def _entry(self, node, index, inputs, value):
+        from utils.cassette import request_key
+        return {"type": "call", "node": node, "index": index, "request_hash": request_key(inputs)[1],
+                "response": {"value": value}, "usage": [{"model": "m", "prompt_tokens": 3, "completion_tokens": 1}]}
+
+    def test_matching(self):
+        from utils.cassette import CassetteMiss, Replayer
+
+        replayer = Replayer([self._entry("critic", 0, {"q": "a"}, "first"),
+                             self._entry("critic", 1, {"q": "b"}, "second")])
+        never = lambda: pytest.fail("models must not be called")
+
+        assert replayer.call("critic", {"q": "b"}, never) == "second"  # Reordered, matched by hash
+        assert replayer.call("critic", {"q": "changed"}, never) == "first"  # Diverged, by index
+        with pytest.raises(CassetteMiss):
+            replayer.call("critic", {"q": "c"}, never)
+        assert replayer.summary() == {"recorded": 2, "matched": 1, "diverged": 1, "missing": 1, "unused": 0}
+
+    def test_errors_and_usage(self):
+        from utils.cassette import Replayer
+        from utils.llm_utils import LLMUnavailable
+        from utils.log_config import node_scope
+
+        entry = self._entry("router", 0, {}, None)
+        entry["error"] = {"type": "LLMUnavailable", "message": "No model available for router"}
+        with node_scope("router") as stats, pytest.raises(LLMUnavailable):
+            Replayer([entry]).call("router", {}, lambda: None)
+        assert stats.calls == [{"node": "router", "model": "m", "prompt_tokens": 3, "completion_tokens": 1}]
+
+
+class TestSessionReplay:
+    """A recorded session replays through the graph without models."""
+
+    def test_record_and_replay(self, tmp_path, monkeypatch):
+        import contextlib
+        import io
+        from benchmarks import fake_llm
+        from benchmarks.run import run_session
+        from config import settings
+        from graph import graph
+        from utils import llm_utils
+        from utils.cassette import Recorder, load_cassette, replay
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(settings, "LLM_DEFAULT_RPS", 1000.0)
+        recorder = Recorder(str(tmp_path / "cassettes"))
+        answers = ["GIL мешает потокам исполнять байткод параллельно.", "Стоп"]
+        previous = llm_utils.use_cassette(recorder)
+        try:
+            with fake_llm.installed(), contextlib.redirect_stdout(io.StringIO()):
+                run_session(graph, "recorded", answers)
+        finally:
+            llm_utils.use_cassette(previous)
+
+        cassette = load_cassette(recorder.path("recorded"))
+        assert [t["message"] for t in cassette["turns"]] == [None, *answers]
+        assert cassette["turns"][0]["setup"]["candidate_info"]["Name"] == "Bench"
+        assert {"planner", "router", "observer", "interviewer", "critic"} <= {c["node"] for c in cassette["calls"]}
+
+        report = replay(cassette, graph)  # No fake model installed: every call comes from the cassette
+        calls = report["calls"]
+        assert calls["matched"] == calls["recorded"] == len(cassette["calls"])
+        assert calls["diverged"] == calls["missing"] == calls["unused"] == 0
+        assert report["turns"][-1]["reply"] == "INTERVIEW_FINISHED"
+        assert llm_utils._cassette is previous
+
+    def test_requires_opening_turn(self):
+        from utils.cassette import replay
+
+        with pytest.raises(ValueError):
+            replay({"thread_id": "t", "turns": [{"type": "turn", "message": "Стоп"}], "calls": []})
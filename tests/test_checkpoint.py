@@ -0,0 +1,257 @@
+"""
+Tests for the SQLite checkpointer.
+"""
+import operator
+from typing import Annotated, List, TypedDict
+
+import pytest
+
+
+class _State(TypedDict):
+    items: Annotated[List[str], operator.add]
+    count: int
+
+
+def _graph(saver):
+    from langgraph.graph import StateGraph, END
+
+    builder = StateGraph(_State)
+    builder.add_node("step", lambda s: {"items": [f"item-{s['count']}"], "count": s["count"] + 1})
+    builder.set_entry_point("step")
+    builder.add_edge("step", END)
+    return builder.compile(checkpointer=saver)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.sqlite")
+
+
+class TestSQLiteCheckpointSaver:
+    """Test persistence, retention and multi-connection access."""
+
+    def test_state_survives_restart(self, db_path):
+        """A new saver on the same file resumes the thread."""
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        config = {"configurable": {"thread_id": "t1"}}
+        graph = _graph(SQLiteCheckpointSaver(db_path))
+        graph.invoke({"items": [], "count": 0}, config)
+        graph.invoke({"count": 5}, config)
+
+        restarted = _graph(SQLiteCheckpointSaver(db_path))
+        assert restarted.get_state(config).values == {"items": ["item-0", "item-5"], "count": 6}
+
+    def test_wal_mode(self, db_path):
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        saver = SQLiteCheckpointSaver(db_path)
+        assert saver.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_keeps_latest_checkpoints(self, db_path):
+        """Old checkpoints and the blobs only they referenced are pruned."""
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        saver = SQLiteCheckpointSaver(db_path, keep_last=3, snapshot_every=0)  # Full blobs only
+        graph = _graph(saver)
+        config = {"configurable": {"thread_id": "t2"}}
+        graph.invoke({"items": [], "count": 0}, config)
+        for count in range(10):
+            graph.invoke({"count": count}, config)
+
+        assert len(list(saver.list(config))) == 3
+        assert graph.get_state(config).values["count"] == 10
+        referenced = {(channel, version) for item in saver.list(config)
+                      for channel, version in item.checkpoint["channel_versions"].items()}
+        stored = set(saver.conn.execute("SELECT channel, version FROM blobs WHERE thread_id = 't2'"))
+        assert stored == referenced
+
+    def test_two_workers_share_thread(self, db_path):
+        """Turns served by different savers (processes) continue the same thread."""
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        config = {"configurable": {"thread_id": "t3"}}
+        worker_a = _graph(SQLiteCheckpointSaver(db_path))
+        worker_b = _graph(SQLiteCheckpointSaver(db_path))
+
+        worker_a.invoke({"items": [], "count": 0}, config)
+        worker_b.invoke({"count": 1}, config)
+        worker_a.invoke({"count": 2}, config)
+
+        assert worker_b.get_state(config).values["items"] == ["item-0", "item-1", "item-2"]
+
+    def test_delete_thread_and_compact(self, db_path):
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        saver = SQLiteCheckpointSaver(db_path)
+        config = {"configurable": {"thread_id": "t4"}}
+        _graph(saver).invoke({"items": ["x" * 200_000], "count": 0}, config)
+
+        saver.delete_thread("t4")
+        freed = saver.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        saver.compact()
+        assert saver.get_tuple(config) is None
+        assert freed > 10
+        assert saver.conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    def test_backend_selection(self, db_path):
+        from unittest.mock import patch
+        from langgraph.checkpoint.memory import MemorySaver
+        from utils.checkpoint import create_checkpointer, SQLiteCheckpointSaver
+
+        assert isinstance(create_checkpointer(), MemorySaver)
+        with patch("config.settings.CHECKPOINT_BACKEND", "sqlite"), \
+                patch("config.settings.CHECKPOINT_DB_PATH", db_path):
+            assert isinstance(create_checkpointer(), SQLiteCheckpointSaver)
+
+
+class TestDeltaCheckpoints:
+    """Test delta encoding of list channels."""
+
+    def test_codec_round_trip_and_snapshots(self):
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+        from utils.checkpoint import DeltaCodec, DELTA_PREFIX
+
+        store = {}
+        writer = DeltaCodec(JsonPlusSerializer(), snapshot_every=3)
+        key = ("t", "", "items")
+        value = []
+        for n in range(1, 9):
+            value = value + [f"item-{n}"]
+            type_, data, base = writer.encode(key, f"{n}.0", value)
+            store[f"{n}.0"] = (type_, data)
+            assert (base is None) == (not type_.startswith(DELTA_PREFIX))
+
+        full = [v for v, (t, _) in store.items() if not t.startswith(DELTA_PREFIX)]
+        assert full == ["1.0", "5.0"]  # Snapshot after three deltas
+
+        reader = DeltaCodec(JsonPlusSerializer(), snapshot_every=3)
+        assert reader.decode(key, "8.0", store["8.0"], store.__getitem__) == value
+
+    def test_rewritten_list_is_stored_in_full(self):
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+        from utils.checkpoint import DeltaCodec
+
+        codec = DeltaCodec(JsonPlusSerializer(), snapshot_every=10)
+        key = ("t", "", "items")
+        codec.encode(key, "1.0", ["a", "b"])
+        assert codec.encode(key, "2.0", ["a", "b", "c"])[2] == "1.0"
+        assert codec.encode(key, "3.0", ["x", "b", "c"])[2] is None
+
+    def test_storage_grows_linearly(self, db_path):
+        """Per-version blob size stays constant as the list grows."""
+        from utils.checkpoint import DeltaMemorySaver
+
+        saver = DeltaMemorySaver(snapshot_every=1000)
+        graph = _graph(saver)
+        config = {"configurable": {"thread_id": "t5"}}
+        graph.invoke({"items": [], "count": 0}, config)
+        for count in range(40):
+            graph.invoke({"count": count}, config)
+
+        sizes = [len(data) for (_, _, channel, _), (_, data) in sorted(saver.blobs.items())
+                 if channel == "items"]
+        assert max(sizes[2:]) - min(sizes[2:]) < 16
+        assert len(graph.get_state(config).values["items"]) == 41
+
+    def test_pruning_keeps_delta_chain(self, db_path):
+        """Pruned databases still rebuild lists whose snapshot is older than the kept checkpoints."""
+        from utils.checkpoint import SQLiteCheckpointSaver
+
+        config = {"configurable": {"thread_id": "t6"}}
+        graph = _graph(SQLiteCheckpointSaver(db_path, keep_last=2, snapshot_every=50))
+        graph.invoke({"items": [], "count": 0}, config)
+        for count in range(20):
+            graph.invoke({"count": count}, config)
+
+        fresh = _graph(SQLiteCheckpointSaver(db_path))
+        assert len(fresh.get_state(config).values["items"]) == 21
+
+
+class TestHibernation:
+    """Test idle-session eviction and transparent rehydration."""
+
+    def _run(self, graph, thread_id, turns=3):
+        config = {"configurable": {"thread_id": thread_id}}
+        graph.invoke({"items": [], "count": 0}, config)
+        for count in range(turns):
+            graph.invoke({"count": count}, config)
+        return config
+
+    def test_idle_thread_rehydrates_on_access(self, tmp_path):
+        from utils.checkpoint import HibernatingMemorySaver
+
+        saver = HibernatingMemorySaver(str(tmp_path), idle_ttl=0.01, high_water_bytes=0)
+        graph = _graph(saver)
+        config = self._run(graph, "idle")
+        expected = graph.get_state(config).values
+
+        import time
+        time.sleep(0.02)
+        assert saver.evict() == 1
+        assert "idle" not in saver.storage
+        assert len(list(tmp_path.iterdir())) == 1
+
+        assert graph.get_state(config).values == expected
+        graph.invoke({"count": 10}, config)
+        assert graph.get_state(config).values["items"][-1] == "item-10"
+        assert not list(tmp_path.iterdir())
+
+    def test_high_water_evicts_least_recently_used(self, tmp_path):
+        from utils.checkpoint import HibernatingMemorySaver
+
+        saver = HibernatingMemorySaver(str(tmp_path), idle_ttl=0, high_water_bytes=10 ** 9)
+        graph = _graph(saver)
+        for thread_id in ("a", "b", "c"):
+            self._run(graph, thread_id)
+
+        saver.high_water_bytes = sum(saver._sizes.values()) // 2
+        saver.evict(keep="a")
+        assert "a" in saver.storage
+        assert "b" not in saver.storage
+        assert len(graph.get_state({"configurable": {"thread_id": "b"}}).values["items"]) == 4
+
+    def test_delete_removes_hibernated_file(self, tmp_path):
+        from utils.checkpoint import HibernatingMemorySaver
+
+        saver = HibernatingMemorySaver(str(tmp_path))
+        config = self._run(_graph(saver), "gone")
+        saver.hibernate("gone")
+        saver.delete_thread("gone")
+
+        assert not list(tmp_path.iterdir())
+        assert saver.get_tuple(config) is None
+
+
+
+class TestStateRecordSerde:
+    """State records deserialize under langgraph's strict msgpack mode."""
+
+    def test_records_round_trip_strict(self, tmp_path):
+        import os
+        import subprocess
+        import sys
+
+        # Strict mode is read when langgraph builds its default serializer, at import
+        script = f"""
+from state import ObserverThought, TurnRecord
+from utils.checkpoint import DeltaMemorySaver, HibernatingMemorySaver, SQLiteCheckpointSaver
+
+records = [ObserverThought("ok", "MAINTAIN", "go on", ("GIL",)),
+           TurnRecord.build(1, "Вопрос?", "Ответ", {{"Observer": "ok"}}, decision="MAINTAIN")]
+savers = [DeltaMemorySaver(), HibernatingMemorySaver({str(tmp_path / "sessions")!r}),
+          SQLiteCheckpointSaver({str(tmp_path / "checkpoints.sqlite")!r})]
+for saver in savers:
+    # The graph derives a clone with its own allowlist when it compiles
+    serde = saver.with_allowlist([("tests", "Other")]).serde
+    loaded = serde.loads_typed(serde.dumps_typed(records))
+    assert [type(record) for record in loaded] == [ObserverThought, TurnRecord], loaded
+    assert loaded == records
+"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "LANGGRAPH_STRICT_MSGPACK": "true", "PYTHONPATH": root}
+        result = subprocess.run([sys.executable, "-c", script], cwd=str(tmp_path), env=env,
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert "Blocked deserialization" not in result.stderr
+        assert "unregistered type" not in result.stderr
@@ -0,0 +1,154 @@
+"""
+Tests for circuit breakers and fallback chains.
+"""
+import time
+import pytest
+import openai
+from unittest.mock import MagicMock, patch
+from langchain_core.runnables import RunnableLambda
+
+
+def _server_error():
+    response = MagicMock(status_code=503, headers={})
+    return openai.InternalServerError("down", response=response, body=None)
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def _breaker(self, **overrides):
+        from utils.circuit_breaker import CircuitBreaker
+
+        params = dict(failure_rate=0.5, min_calls=4, window_seconds=60,
+                      slow_call_seconds=10, open_seconds=0.05)
+        params.update(overrides)
+        return CircuitBreaker("test", **params)
+
+    def test_opens_on_failure_rate(self):
+        """The circuit opens once enough calls fail within the window."""
+        from utils.circuit_breaker import OPEN
+
+        breaker = self._breaker()
+        for success in (True, False, True, False):
+            breaker.record(success)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_slow_calls_count_as_failures(self):
+        """Successful but slow calls trip the circuit too."""
+        from utils.circuit_breaker import OPEN
+
+        breaker = self._breaker(slow_call_seconds=1)
+        for _ in range(4):
+            breaker.record(True, latency=2)
+
+        assert breaker.state == OPEN
+
+    def test_half_open_single_probe(self):
+        """After the open period exactly one probe is admitted, and success closes the circuit."""
+        from utils.circuit_breaker import CLOSED
+
+        breaker = self._breaker()
+        for _ in range(4):
+            breaker.record(False)
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record(True)
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        """A failing probe sends the circuit back to open."""
+        from utils.circuit_breaker import OPEN
+
+        breaker = self._breaker()
+        for _ in range(4):
+            breaker.record(False)
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == OPEN
+
+
+class TestFallbackChains:
+    """Test failover in invoke_llm."""
+
+    def test_chain_continues_after_primary(self):
+        from utils.llm_utils import fallback_chain
+
+        with patch("config.settings.FALLBACK_CHAINS", {"observer": ["a", "b", "template"]}):
+            assert fallback_chain("observer", "b") == ["b", "template"]
+            assert fallback_chain("observer", "x") == ["x", "a", "b", "template"]
+
+    def test_open_circuit_fails_over_without_calling(self):
+        """A model with an open circuit is skipped for the next one in the chain."""
+        from utils.llm_utils import invoke_llm
+        from utils.circuit_breaker import get_breaker
+
+        breaker = get_breaker("cb-primary")
+        breaker.open_seconds = 60
+        breaker._open(time.monotonic())
+
+        primary = MagicMock(model_name="cb-primary", temperature=0)
+        backup = MagicMock(model_name="cb-backup", temperature=0)
+        calls = []
+
+        def build(model):
+            return RunnableLambda(lambda _: calls.append(model.model_name) or model.model_name)
+
+        with patch("config.settings.FALLBACK_CHAINS", {"router": ["cb-primary", "cb-backup"]}), \
+                patch("utils.llm_utils.get_chat_model", return_value=backup):
+            assert invoke_llm(primary, build, {}, node="router") == "cb-backup"
+        assert calls == ["cb-backup"]
+
+    def test_template_entry_raises_unavailable(self):
+        """Exhausting real models at a "template" entry raises LLMUnavailable."""
+        from utils.llm_utils import invoke_llm, LLMUnavailable
+
+        primary = MagicMock(model_name="cb-down", temperature=0)
+        build = lambda m: RunnableLambda(lambda _: (_ for _ in ()).throw(_server_error()))
+
+        with patch("config.settings.FALLBACK_CHAINS", {"critic": ["cb-down", "template"]}), \
+                patch("utils.llm_utils.time.sleep"):
+            with pytest.raises(LLMUnavailable):
+                invoke_llm(primary, build, {}, node="critic", max_attempts=2)
+
+    def test_fatal_error_does_not_fail_over(self):
+        """Request errors are not a reason to try another model."""
+        from utils.llm_utils import invoke_llm
+
+        primary = MagicMock(model_name="cb-fatal", temperature=0)
+        response = MagicMock(status_code=401, headers={})
+        error = openai.AuthenticationError("bad key", response=response, body=None)
+        build = lambda m: RunnableLambda(lambda _: (_ for _ in ()).throw(error))
+
+        with patch("config.settings.FALLBACK_CHAINS", {"router": ["cb-fatal", "template"]}):
+            with pytest.raises(openai.AuthenticationError):
+                invoke_llm(primary, build, {}, node="router")
+
+    def test_fatal_errors_open_the_circuit(self):
+        """A misconfigured model trips its circuit; malformed output does not."""
+        from utils.llm_utils import invoke_llm
+        from utils.circuit_breaker import get_breaker, OPEN, CLOSED
+
+        response = MagicMock(status_code=404, headers={})
+        error = openai.NotFoundError("no such model", response=response, body=None)
+        missing = MagicMock(model_name="cb-missing", temperature=0)
+        garbled = MagicMock(model_name="cb-garbled", temperature=0)
+
+        with patch("config.settings.FALLBACK_CHAINS", {"router": ["template"]}), \
+                patch("utils.llm_utils.time.sleep"):
+            for _ in range(get_breaker("cb-missing").min_calls):
+                with pytest.raises(openai.NotFoundError):
+                    invoke_llm(missing, lambda m: RunnableLambda(lambda _: (_ for _ in ()).throw(error)),
+                               {}, node="router", max_attempts=1)
+            for _ in range(get_breaker("cb-garbled").min_calls):
+                with pytest.raises(ValueError):
+                    invoke_llm(garbled, lambda m: RunnableLambda(lambda _: (_ for _ in ()).throw(ValueError("{"))),
+                               {}, node="router", max_attempts=1)
+
+        assert get_breaker("cb-missing").state == OPEN
+        assert get_breaker("cb-garbled").state == CLOSED
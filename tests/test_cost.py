@@ -0,0 +1,97 @@
+"""
+Tests for the per-session token and cost ledger.
+"""
+import json
+
+PRICES = {"gpt-4o": [2.5, 10.0], "openai/gpt-4o-mini": [0.15, 0.6]}
+
+
+def _call(node, model="openai/gpt-4o", prompt=1000, completion=200, turn=1):
+    return {"node": node, "model": model, "prompt_tokens": prompt, "completion_tokens": completion, "turn": turn}
+
+
+class TestPricing:
+    """Price lookup and ledger totals."""
+
+    def test_call_cost(self):
+        from utils.cost import call_cost
+
+        assert call_cost("openai/gpt-4o", 1_000_000, 100_000, PRICES) == 3.5
+        assert call_cost("openai/gpt-4o-mini", 2_000_000, 0, PRICES) == 0.3
+        assert call_cost("local/llama", 10, 10, PRICES) is None
+
+    def test_summarize_by_node_and_model(self):
+        from utils.cost import summarize
+
+        summary = summarize([_call("observer"), _call("observer"), _call("router", "openai/gpt-4o-mini"),
+                             _call("critic", "local/llama")], PRICES)
+        assert summary["calls"] == 4 and summary["unpriced_calls"] == 1
+        assert summary["by_node"]["observer"]["cost_usd"] == 0.009
+        assert summary["by_model"]["openai/gpt-4o-mini"]["prompt_tokens"] == 1000
+        assert summary["cost_usd"] == round(0.009 + 0.00027, 6)
+
+
+class TestLedger:
+    """Calls reach the state ledger and the saved log."""
+
+    def test_node_appends_calls_with_turn(self):
+        from graph import instrumented
+        from utils.log_config import record_llm_call
+
+        def node(state):
+            record_llm_call("openai/gpt-4o", 120, 30, node="manager")
+            record_llm_call("openai/gpt-4o-mini", 50, 5, node="report")
+            return {"done": True}
+
+        result = instrumented("feedback", node)({"loop_count": 4}, {"configurable": {"thread_id": "t"}})
+        assert result["done"] is True
+        assert [(c["node"], c["prompt_tokens"], c["turn"]) for c in result["llm_usage"]] == [
+            ("manager", 120, 4), ("report", 50, 4)]
+        assert "llm_usage" not in instrumented("router", lambda s: {})({"loop_count": 4}, {"configurable": {}})
+
+    def test_usage_saved_with_log_and_manifest(self, tmp_path):
+        from state import TurnRecord
+        from utils.cost import session_ledger
+        from utils.log_store import LogStore
+        from validate_logs import check_log
+
+        store = LogStore(str(tmp_path / "store"))
+        usage = session_ledger([_call("observer")], {"Grade": "Senior", "Position": "Backend"})
+        turns = [TurnRecord.build(1, "Q", "A", {"Observer": "ok"})]
+
+        journal = tmp_path / "t-1.jsonl"
+        journal.write_text(turns[0].to_json() + "\n", encoding="utf-8")
+        for thread_id, journal_path in (("t-1", str(journal)), ("t-2", None)):
+            path = store.save(thread_id, "Alex", turns, "Report", journal_path=journal_path, usage=usage)
+            with open(path, encoding="utf-8") as f:
+                log = json.load(f)
+            assert log["llm_usage"]["grade"] == "Senior"
+            assert log["llm_usage"]["calls"][0]["node"] == "observer"
+            assert check_log(path)["ok"]
+        assert [e["cost_usd"] for e in store.entries()] == [usage["summary"]["cost_usd"]] * 2
+
+
+class TestAggregate:
+    """Cost across saved logs by node and by grade."""
+
+    def test_aggregate_and_cli(self, tmp_path, capsys):
+        from utils.cost import aggregate, main, session_ledger
+
+        logs = [("Senior", [_call("observer"), _call("manager")]), ("Senior", [_call("observer")]),
+                ("Junior", [_call("router", "openai/gpt-4o-mini")])]
+        for i, (grade, calls) in enumerate(logs):
+            (tmp_path / f"interview_log_{i}.json").write_text(json.dumps({
+                "participant_name": "x", "turns": [], "final_feedback": "r",
+                "llm_usage": session_ledger(calls, {"Grade": grade})}), encoding="utf-8")
+        (tmp_path / "interview_log_old.json").write_text(
+            json.dumps({"participant_name": "x", "turns": [], "final_feedback": "r"}), encoding="utf-8")
+
+        result = aggregate([str(tmp_path)], PRICES)
+        assert result["sessions"] == 3
+        assert result["by_node"]["observer"]["calls"] == 2
+        assert result["by_grade"]["Senior"]["sessions"] == 2
+        assert result["by_grade"]["Senior"]["cost_per_session_usd"] == round(3 * 0.0045 / 2, 6)
+
+        assert main([str(tmp_path)]) == 0
+        out = capsys.readouterr().out
+        assert out.startswith("3 sessions, 4 calls") and "Senior" in out and "observer" in out
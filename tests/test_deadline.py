@@ -0,0 +1,185 @@
+"""
+Tests for turn deadline propagation and graceful degradation.
+"""
+import time
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.messages import HumanMessage, AIMessage
+
+
+class TestDeadlineBudget:
+    """Test budget arithmetic helpers."""
+
+    def test_no_deadline_means_unlimited(self):
+        """State without a deadline has infinite budget."""
+        from utils.deadline import remaining, has_budget
+
+        assert remaining({}) == float("inf")
+        assert remaining({"turn_deadline": 0.0}) == float("inf")
+        assert has_budget({}, 1000) is True
+
+    def test_remaining_budget(self):
+        """Remaining budget counts down from the deadline."""
+        from utils.deadline import remaining, open_turn
+
+        state = open_turn(10)
+        assert 9 < remaining(state) <= 10
+        assert state["turn_deadline"] - state["turn_started"] == pytest.approx(10)
+
+    def test_elapsed_since_turn_start(self, monkeypatch):
+        """Elapsed time is measured from the recorded start, whatever the budget."""
+        from config import settings
+        from utils.deadline import elapsed, open_turn
+
+        state = open_turn(300)
+        monkeypatch.setattr(settings, "TURN_DEADLINE_SECONDS", 5)
+        assert 0 <= elapsed(state) < 1
+        assert elapsed({"turn_deadline": time.time() + 10}) is None
+
+    def test_pick_model_tiers(self):
+        """Model tier degrades as the budget shrinks."""
+        from utils.deadline import pick_model
+
+        full, fast = object(), object()
+        now = time.time()
+
+        assert pick_model({"turn_deadline": now + 60}, full, fast) is full
+        assert pick_model({"turn_deadline": now + 5}, full, fast) is fast
+        assert pick_model({"turn_deadline": now + 1}, full, fast) is None
+
+    def test_run_within_raises_on_timeout(self):
+        """Calls overrunning the deadline are abandoned."""
+        from utils.deadline import run_within, DeadlineExceeded
+
+        state = {"turn_deadline": time.time() + 0.05}
+        with pytest.raises(DeadlineExceeded):
+            run_within(time.sleep, state, 1)
+
+    def test_run_within_returns_result(self):
+        """Calls finishing in time return normally."""
+        from utils.deadline import run_within
+
+        state = {"turn_deadline": time.time() + 5}
+        assert run_within(lambda x: x * 2, state, 21) == 42
+
+
+class TestGracefulDegradation:
+    """Test node fallbacks when the turn budget is exhausted."""
+
+    def test_router_keyword_fallback(self):
+        """Router uses keyword matching without budget."""
+        from router import router_node
+
+        state = {"messages": [HumanMessage(content="Стоп!")], "turn_deadline": time.time() - 1}
+        assert router_node(state)["router_decision"] == "STOP"
+
+        state["messages"] = [HumanMessage(content="Я использую asyncio")]
+        assert router_node(state)["router_decision"] == "ANSWER"
+
+    def test_critic_skipped_without_budget(self, sample_state):
+        """Critic approves unreviewed when time is short."""
+        from agents.critic import critic_node
+
+        sample_state["messages"] = [AIMessage(content="Что такое GIL?")]
+        sample_state["turn_deadline"] = time.time() + 1
+
+        result = critic_node(sample_state)
+
+        assert result["critic_status"] == "APPROVED"
+        assert "deadline" in result["current_turn_thoughts"]["Critic"]
+
+    def test_observer_templated_thought(self, sample_state):
+        """Observer falls back to a plan-driven thought without calling the model."""
+        from agents.observer import ObserverAgent
+
+        model = MagicMock()
+        sample_state["messages"] = [HumanMessage(content="Ответ")]
+        sample_state["turn_deadline"] = time.time() + 1
+
+        result = ObserverAgent(model).run(sample_state)
+
+        model.with_structured_output.assert_not_called()
+        assert "Python Basics" in result["internal_thoughts"][0]["instruction"]
+
+    def test_interviewer_templated_question(self, sample_state):
+        """Interviewer falls back to a templated question without calling the model."""
+        from agents.interviewer import InterviewerAgent
+
+        model = MagicMock()
+        sample_state["turn_deadline"] = time.time() + 1
+
+        result = InterviewerAgent(model).run(sample_state)
+
+        model.with_structured_output.assert_not_called()
+        assert "Python Basics" in result["current_question"]
+        assert isinstance(result["messages"][0], AIMessage)
+
+    def test_report_templated_without_budget(self, sample_state):
+        """Report calls are bounded by the state's deadline."""
+        from agents.manager import ManagerAgent
+        from utils.report import generate_development_roadmap, generate_technical_report
+
+        sample_state["turn_deadline"] = time.time() - 1
+        model = MagicMock(model_name="openai/gpt-4o", temperature=0)
+
+        decision = ManagerAgent(model).evaluate(sample_state)
+        technical = generate_technical_report(sample_state, model)
+        roadmap = generate_development_roadmap(sample_state, model)
+
+        model.assert_not_called()
+        assert decision["decision"] == "UNABLE_TO_EVALUATE"
+        assert technical.startswith("## Техническая оценка")
+        assert roadmap.startswith("## План развития") and "Python Basics" in roadmap
+
+    def test_feedback_opens_report_budget(self, sample_state, tmp_path, monkeypatch):
+        """The STOP turn's report gets its own budget, not the leftovers of the turn."""
+        from unittest.mock import patch
+        from config import settings
+        from feedback import feedback_node
+        from utils.deadline import DeadlineExceeded
+
+        monkeypatch.chdir(tmp_path)
+        sample_state["turn_deadline"] = time.time() + 1
+        deadlines = []
+
+        def out_of_time(*args, **kwargs):
+            deadlines.append(kwargs["state"]["turn_deadline"] - time.time())
+            raise DeadlineExceeded("late")
+
+        with patch("agents.manager.invoke_llm", side_effect=out_of_time), \
+                patch("utils.report.invoke_llm", side_effect=out_of_time), \
+                patch("feedback._search_learning_resources", return_value=""), \
+                patch("builtins.print"):
+            result = feedback_node(sample_state)
+
+        assert len(deadlines) == 3
+        assert all(settings.REPORT_DEADLINE_SECONDS - 5 < d <= settings.REPORT_DEADLINE_SECONDS for d in deadlines)
+        assert result["messages"][0].content == "INTERVIEW_FINISHED"
+
+    def test_report_templated_when_models_unavailable(self, sample_state):
+        """Manager, report and roadmap fall back to the Observer's notes when every model is down."""
+        from unittest.mock import patch
+        from agents.manager import ManagerAgent
+        from utils.circuit_breaker import CircuitOpenError
+        from utils.report import generate_development_roadmap, generate_technical_report
+
+        sample_state["internal_thoughts"] = [
+            {"analysis": "Путает GIL и асинхронность", "instruction": "", "decision": "MAINTAIN"}]
+        model = MagicMock(model_name="openai/gpt-4o", temperature=0)
+        with patch("utils.llm_utils._invoke_model", side_effect=CircuitOpenError("open")) as call:
+            decision = ManagerAgent(model).evaluate(sample_state)
+            technical = generate_technical_report(sample_state, model)
+            roadmap = generate_development_roadmap(sample_state, model)
+
+        assert call.call_count == 6  # Both models of each chain were tried
+        assert decision["decision"] == "UNABLE_TO_EVALUATE"
+        assert technical.startswith("## Техническая оценка") and "Путает GIL" in technical
+        assert roadmap.startswith("## План развития") and "Путает GIL" in roadmap
+
+    def test_no_regeneration_without_budget(self):
+        """A rejected question is kept when there is no time to regenerate."""
+        from graph import route_critic_decision
+        from langgraph.graph import END
+
+        state = {"critic_status": "REJECTED", "critic_retry_count": 0, "turn_deadline": time.time() + 1}
+        assert route_critic_decision(state) == END
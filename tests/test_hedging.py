@@ -0,0 +1,88 @@
+"""
+Tests for hedged LLM requests.
+"""
+import itertools
+import time
+from unittest.mock import patch
+
+
+class TestHedgingPrimitives:
+    """Test latency tracking and the hedge budget."""
+
+    def test_quantile_requires_samples(self):
+        """No hedge delay until enough samples are observed."""
+        from utils.hedging import LatencyTracker
+
+        tracker = LatencyTracker()
+        for latency in range(10):
+            tracker.observe(latency / 10)
+
+        assert tracker.quantile(0.9, min_samples=20) is None
+        assert tracker.quantile(0.9, min_samples=5) == 0.9
+
+    def test_budget_caps_hedges(self):
+        """Hedges are limited to the configured ratio of calls."""
+        from utils.hedging import HedgeBudget
+
+        budget = HedgeBudget(ratio=0.25, burst=1.0)
+        budget.credits = 0.0
+        spent = 0
+        for _ in range(100):
+            budget.on_call()
+            spent += budget.try_spend()
+
+        assert spent == 25
+
+
+class TestRunHedged:
+    """Test hedged execution."""
+
+    def _warm(self, model, node, latency=0.01):
+        from utils.hedging import observe
+        for _ in range(30):
+            observe(model, node, latency)
+
+    def test_hedge_wins_over_slow_primary(self):
+        """A slow primary is beaten by the duplicate request."""
+        from utils.hedging import run_hedged
+
+        self._warm("hedge-model", "router")
+        calls = itertools.count()
+
+        def call():
+            if next(calls) == 0:
+                time.sleep(1.0)
+                return "primary"
+            return "hedge"
+
+        start = time.monotonic()
+        assert run_hedged(call, "hedge-model", "router") == "hedge"
+        assert time.monotonic() - start < 0.5
+
+    def test_no_hedge_without_budget(self):
+        """Without budget the call simply waits for the primary."""
+        from utils.hedging import run_hedged, _budget
+
+        self._warm("budget-model", "critic")
+        _budget("budget-model").credits = -100
+        calls = itertools.count()
+
+        def call():
+            next(calls)
+            time.sleep(0.05)
+            return "primary"
+
+        assert run_hedged(call, "budget-model", "critic") == "primary"
+        assert next(calls) == 1
+
+    def test_invoke_llm_hedges_only_opted_in_nodes(self):
+        """Only nodes listed in HEDGE_NODES are hedged."""
+        from langchain_core.runnables import RunnableLambda
+        from utils.llm_utils import invoke_llm
+
+        runnable = RunnableLambda(lambda _: "ok")
+        with patch("utils.llm_utils.run_hedged", return_value="hedged") as hedged, \
+                patch("config.settings.HEDGE_NODES", ["router"]):
+            assert invoke_llm(None, lambda m: runnable, {}, node="router") == "hedged"
+            assert invoke_llm(None, lambda m: runnable, {}, node="observer") == "ok"
+        assert hedged.call_count == 1
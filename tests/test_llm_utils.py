@@ -0,0 +1,108 @@
+"""
+Tests for the classified, deadline-aware LLM retry engine.
+"""
+import time
+import pytest
+import openai
+from unittest.mock import MagicMock, patch
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import RunnableLambda
+
+
+def _api_error(cls, status, headers=None, code=None):
+    """Build an OpenAI status error without a real HTTP response."""
+    response = MagicMock(status_code=status, headers=headers or {})
+    body = {"code": code} if code else None
+    return cls("error", response=response, body=body)
+
+
+def _flaky(errors, result="ok"):
+    """Runnable that raises the given errors in order, then returns result."""
+    calls = {"n": 0}
+
+    def call(_inputs):
+        calls["n"] += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return RunnableLambda(call), calls
+
+
+class TestErrorClassification:
+    """Test classify_error and header parsing."""
+
+    def test_rate_limit(self):
+        from utils.llm_utils import classify_error, RATE_LIMIT, FATAL
+
+        assert classify_error(_api_error(openai.RateLimitError, 429)) == RATE_LIMIT
+        quota = _api_error(openai.RateLimitError, 429, code="insufficient_quota")
+        assert classify_error(quota) == FATAL
+
+    def test_non_transient_errors(self):
+        from utils.llm_utils import classify_error, FATAL
+        from utils.deadline import DeadlineExceeded
+
+        context = _api_error(openai.BadRequestError, 400, code="context_length_exceeded")
+        assert classify_error(context) == FATAL
+        assert classify_error(_api_error(openai.AuthenticationError, 401)) == FATAL
+        assert classify_error(DeadlineExceeded()) == FATAL
+
+    def test_transient_and_parse(self):
+        from utils.llm_utils import classify_error, TRANSIENT, PARSE
+
+        assert classify_error(_api_error(openai.InternalServerError, 503)) == TRANSIENT
+        assert classify_error(OutputParserException("bad json")) == PARSE
+
+    def test_retry_after_headers(self):
+        from utils.llm_utils import retry_after_seconds
+
+        assert retry_after_seconds(_api_error(openai.RateLimitError, 429, {"retry-after": "7"})) == 7.0
+        assert retry_after_seconds(_api_error(openai.RateLimitError, 429, {"retry-after-ms": "250"})) == 0.25
+        assert retry_after_seconds(_api_error(openai.RateLimitError, 429)) is None
+
+    def test_decorrelated_jitter_bounds(self):
+        from utils.llm_utils import next_backoff
+
+        for _ in range(100):
+            delay = next_backoff(2.0, 0.5, 4.0)
+            assert 0.5 <= delay <= 4.0
+
+
+class TestInvokeLLM:
+    """Test retry behavior of invoke_llm."""
+
+    def test_fatal_error_not_retried(self):
+        from utils.llm_utils import invoke_llm
+
+        runnable, calls = _flaky([_api_error(openai.BadRequestError, 400)])
+        with pytest.raises(openai.BadRequestError):
+            invoke_llm(None, lambda m: runnable, {}, node="test")
+        assert calls["n"] == 1
+
+    def test_parse_error_retried_once_without_sleep(self):
+        from utils.llm_utils import invoke_llm
+
+        runnable, calls = _flaky([OutputParserException("bad")])
+        with patch("utils.llm_utils.time.sleep") as sleep:
+            assert invoke_llm(None, lambda m: runnable, {}, node="test") == "ok"
+        sleep.assert_not_called()
+        assert calls["n"] == 2
+
+    def test_rate_limit_honors_retry_after(self):
+        from utils.llm_utils import invoke_llm
+
+        runnable, calls = _flaky([_api_error(openai.RateLimitError, 429, {"retry-after": "6"})])
+        with patch("utils.llm_utils.time.sleep") as sleep:
+            assert invoke_llm(None, lambda m: runnable, {}, node="test") == "ok"
+        assert any(call[0][0] >= 6 for call in sleep.call_args_list)
+        assert calls["n"] == 2
+
+    def test_no_retry_past_deadline(self):
+        from utils.llm_utils import invoke_llm
+
+        runnable, calls = _flaky([_api_error(openai.RateLimitError, 429, {"retry-after": "30"})])
+        state = {"turn_deadline": time.time() + 10}
+        with pytest.raises(openai.RateLimitError):
+            invoke_llm(None, lambda m: runnable, {}, node="test", state=state)
+        assert calls["n"] == 1
@@ -0,0 +1,177 @@
+"""
+Tests for queue-based logging and the colored formatter.
+"""
+import io
+import logging
+import queue
+
+import pytest
+
+
+def _record(level=logging.INFO, name="observer", msg="message"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+class TestQueueLogging:
+    """Test the background writer and overflow policies."""
+
+    @pytest.fixture(autouse=True)
+    def restore_root(self):
+        from utils.log_config import shutdown_logging
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        yield
+        shutdown_logging()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    def test_records_reach_file_after_shutdown(self, tmp_path):
+        from utils.log_config import OverflowQueueHandler, setup_logging, shutdown_logging
+
+        path = tmp_path / "app.log"
+        setup_logging("DEBUG", log_file=str(path))
+        assert isinstance(logging.getLogger().handlers[0], OverflowQueueHandler)
+
+        logging.getLogger("interviewer").info("turn %d", 7)
+        shutdown_logging()
+        assert "turn 7" in path.read_text(encoding="utf-8")
+
+    def test_drop_policy_keeps_warnings_and_reports(self):
+        from utils.log_config import OverflowQueueHandler
+
+        records = queue.Queue(maxsize=2)
+        handler = OverflowQueueHandler(records, overflow="drop", block_timeout=0.01)
+        for _ in range(5):
+            handler.handle(_record())
+        assert records.qsize() == 2
+        assert handler.dropped == 3
+
+        records.get_nowait()
+        records.get_nowait()
+        handler.handle(_record(logging.WARNING, msg="important"))
+        notice, warning = records.get_nowait(), records.get_nowait()
+        assert "dropped 3 records" in notice.getMessage()
+        assert warning.getMessage() == "important"
+        assert handler.dropped == 0
+
+    def test_block_policy_times_out(self):
+        from utils.log_config import OverflowQueueHandler
+
+        records = queue.Queue(maxsize=1)
+        handler = OverflowQueueHandler(records, overflow="block", block_timeout=0.01)
+        handler.handle(_record())
+        handler.handle(_record())
+        assert handler.dropped == 1
+
+    def test_unknown_policy(self):
+        from utils.log_config import OverflowQueueHandler
+
+        with pytest.raises(ValueError):
+            OverflowQueueHandler(queue.Queue(), overflow="spill")
+
+
+class TestColoredFormatter:
+    """Color dispatch is decided once, not per record."""
+
+    def test_no_color_off_terminal(self):
+        from utils.log_config import ColoredFormatter
+
+        formatter = ColoredFormatter("%(message)s", stream=io.StringIO())
+        assert formatter.format(_record()) == "message"
+
+    def test_agent_color_is_cached(self):
+        from utils.log_config import ColoredFormatter
+
+        class Tty(io.StringIO):
+            def isatty(self):
+                return True
+
+        formatter = ColoredFormatter("%(message)s", stream=Tty())
+        text = formatter.format(_record(name="agents.critic", level=logging.ERROR))
+        assert text.startswith(ColoredFormatter.AGENT_COLORS["critic"])
+        assert formatter.format(_record(name="graph", level=logging.ERROR)).startswith(ColoredFormatter.COLORS["ERROR"])
+        assert ("agents.critic", "ERROR") in formatter._colors
+
+
+class TestJsonLogging:
+    """Structured records carry the correlation context of the node."""
+
+    @pytest.fixture(autouse=True)
+    def restore_root(self):
+        from utils.log_config import shutdown_logging
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        yield
+        shutdown_logging()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    def _read(self, path):
+        import json
+        from utils.log_config import shutdown_logging
+        shutdown_logging()
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    def test_context_reaches_worker_threads(self, tmp_path):
+        import contextvars
+        import threading
+        from utils.log_config import log_context, setup_logging
+
+        path = tmp_path / "app.jsonl"
+        setup_logging("DEBUG", log_file=str(path), fmt="json")
+        with log_context(thread_id="t-1", turn=3):
+            ctx = contextvars.copy_context()
+            worker = threading.Thread(target=ctx.run, args=(logging.getLogger("llm").info, "from worker"))
+            worker.start()
+            worker.join()
+            logging.getLogger("x").info("explicit", extra={"turn": 9})
+        logging.getLogger("x").info("outside")
+
+        worker_line, explicit, outside = self._read(path)
+        assert worker_line["thread_id"] == "t-1" and worker_line["turn"] == 3
+        assert worker_line["message"] == "from worker" and "ts" in worker_line
+        assert explicit["turn"] == 9
+        assert "thread_id" not in outside
+
+    def test_current_context_is_a_copy(self):
+        from utils.log_config import current_context, log_context
+
+        assert current_context() == {}
+        current_context()["thread_id"] = "leaked"
+        assert current_context() == {}
+        with log_context(turn=1):
+            current_context()["turn"] = 99
+            assert current_context() == {"turn": 1}
+
+    def test_node_records_usage_and_retries(self, tmp_path):
+        import openai
+        from unittest.mock import MagicMock, patch
+        from langchain_core.runnables import RunnableLambda
+        from graph import instrumented
+        from utils.llm_utils import invoke_llm
+        from utils.log_config import setup_logging
+
+        errors = [openai.InternalServerError("boom", response=MagicMock(status_code=503, headers={}), body=None)]
+
+        def call(_inputs):
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        def node(state):
+            return {"answer": invoke_llm(None, lambda m: RunnableLambda(call), {}, node="critic")}
+
+        path = tmp_path / "app.jsonl"
+        setup_logging("DEBUG", log_file=str(path), fmt="json")
+        with patch("utils.llm_utils.time.sleep"):
+            result = instrumented("critic", node)({"loop_count": 2}, {"configurable": {"thread_id": "t-9"}})
+        assert result["answer"] == "ok" and len(result["llm_usage"]) == 1
+
+        records = self._read(path)
+        retry = next(r for r in records if r["level"] == "WARNING")
+        assert retry["node"] == "critic" and retry["model"] == "default" and retry["attempt"] == 1
+        call_record = next(r for r in records if "answered" in r["message"])
+        assert call_record["attempt"] == 2 and call_record["thread_id"] == "t-9" and "latency_ms" in call_record
+        summary = records[-1]
+        assert summary["message"].startswith("Node critic finished")
+        assert summary["turn"] == 2 and summary["llm_calls"] == 1 and summary["retries"] == 1
@@ -0,0 +1,100 @@
+"""
+Tests for the sharded session log store.
+"""
+import json
+import os
+import threading
+
+
+def _turns(n):
+    from state import TurnRecord
+    return [TurnRecord.build(i, f"Вопрос {i}?", "Ответ", {"Observer": "Ок."}) for i in range(1, n + 1)]
+
+
+class TestLogStore:
+    """Test sharding, atomic writes and the manifest index."""
+
+    def test_same_scenario_does_not_collide(self, tmp_path):
+        from utils.log_store import LogStore
+
+        store = LogStore(str(tmp_path))
+        first = store.save("thread-a", "A", _turns(1), "F", session_id=1)
+        second = store.save("thread-b", "B", _turns(2), "F", session_id=1)
+
+        assert first != second
+        assert store.find("thread-a") == first
+        with open(store.find("thread-b"), encoding="utf-8") as f:
+            assert json.load(f)["participant_name"] == "B"
+
+    def test_path_is_sharded_by_date_and_hash(self, tmp_path):
+        from utils.log_store import LogStore
+
+        path = LogStore(str(tmp_path)).path_for("thread-a", saved_at=0)
+        parts = os.path.relpath(path, tmp_path).split(os.sep)
+        assert parts[:3] == ["1970", "01", "01"]
+        assert len(parts[3]) == 2
+        assert parts[4] == "thread-a.json"
+
+    def test_compacts_journal(self, tmp_path):
+        from utils.log_store import LogStore
+        from utils.turn_log import TurnJournal
+        from validate_logs import validate_log
+
+        journal = TurnJournal(str(tmp_path / "turns"))
+        for turn in _turns(3):
+            journal.append("t", turn)
+        journal.close("t")
+
+        path = LogStore(str(tmp_path / "sessions")).save("t", "N", _turns(3), "F", journal_path=journal.path("t"))
+        assert validate_log(path)
+        assert not os.path.exists(journal.path("t"))
+
+    def test_concurrent_writers(self, tmp_path):
+        """Parallel saves leave complete logs, one manifest line each and no temp files."""
+        from utils.log_store import LogStore
+
+        store = LogStore(str(tmp_path))
+        threads = [threading.Thread(target=store.save, args=(f"t{i}", "N", _turns(5), "F" * 10_000))
+                   for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        entries = list(store.entries())
+        assert sorted(e["thread_id"] for e in entries) == sorted(f"t{i}" for i in range(16))
+        for e in entries:
+            with open(os.path.join(tmp_path, e["path"]), encoding="utf-8") as f:
+                assert len(json.load(f)["turns"]) == 5
+        leftovers = [n for _, _, files in os.walk(tmp_path) for n in files if n.startswith(".tmp-")]
+        assert leftovers == []
+
+    def test_failed_write_is_not_indexed(self, tmp_path):
+        """A manifest entry always points at a log that was written."""
+        from unittest.mock import patch
+        from utils.log_store import LogStore
+
+        store = LogStore(str(tmp_path))
+        with patch("utils.logger.atomic_write", side_effect=OSError("disk full")):
+            assert store.save("thread-a", "A", _turns(1), "F") is None
+
+        assert store.find("thread-a") is None
+        assert list(store.entries()) == []
+
+    def test_rebuild_manifest(self, tmp_path):
+        from utils.log_store import LogStore, MANIFEST
+
+        store = LogStore(str(tmp_path))
+        path = store.save("thread-a", "A", _turns(2), "F")
+        os.remove(os.path.join(tmp_path, MANIFEST))
+
+        assert store.find("thread-a") is None
+        assert store.rebuild_manifest() == 1
+        assert store.find("thread-a") == path
+
+    def test_disabled_store_uses_legacy_name(self, tmp_path, monkeypatch):
+        from utils.log_store import LogStore
+
+        monkeypatch.chdir(tmp_path)
+        assert LogStore("").save("thread-a", "A", _turns(1), "F", session_id=3) == "interview_log_3.json"
+        assert os.path.exists(tmp_path / "interview_log_3.json")
@@ -0,0 +1,141 @@
+"""
+Tests for the metrics registry, the /metrics endpoint and the graph hooks.
+"""
+import pytest
+
+
+class TestRegistry:
+    """Prometheus text format rendering."""
+
+    def test_counter_and_gauge(self):
+        from utils.metrics import Registry
+
+        registry = Registry()
+        calls = registry.counter("calls_total", "Calls", ("model",))
+        calls.inc(model='gpt "mini"')
+        calls.inc(2, model='gpt "mini"')
+        registry.gauge("sessions", "Open sessions").set_function(lambda: 4)
+
+        text = registry.render()
+        assert "# TYPE calls_total counter\n" in text
+        assert 'calls_total{model="gpt \\"mini\\""} 3\n' in text
+        assert "# TYPE sessions gauge\nsessions 4\n" in text
+        assert registry.counter("calls_total", "Calls", ("model",)) is calls
+
+    def test_histogram_buckets_are_cumulative(self):
+        from utils.metrics import Histogram
+
+        latency = Histogram("latency_seconds", "Latency", ("node",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 30):
+            latency.observe(value, node="critic")
+        lines = latency.render().splitlines()[2:]
+        assert lines == [
+            'latency_seconds_bucket{node="critic",le="0.1"} 1',
+            'latency_seconds_bucket{node="critic",le="1"} 3',
+            'latency_seconds_bucket{node="critic",le="+Inf"} 4',
+            'latency_seconds_sum{node="critic"} 31.25',
+            'latency_seconds_count{node="critic"} 4',
+        ]
+
+    def test_labels_are_validated(self):
+        from utils.metrics import Counter, Registry
+
+        with pytest.raises(ValueError):
+            Counter("x_total", "X", ("node",)).inc(model="m")
+        registry = Registry()
+        registry.counter("x", "X")
+        with pytest.raises(ValueError):
+            registry.gauge("x", "X")
+
+    def test_session_tracker(self):
+        from utils.metrics import SessionTracker
+
+        sessions = SessionTracker(window=60)
+        sessions.touch("a")
+        sessions.touch("b")
+        sessions.touch(None)
+        sessions.end("a")
+        assert sessions.count() == 1
+        sessions.window = -1
+        assert sessions.count() == 0
+
+
+class TestEndpoint:
+    """The HTTP exporter serves the process registry."""
+
+    def test_scrape(self):
+        import socket
+        import urllib.request
+        from utils.metrics import TURNS, start_server, stop_server
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        assert start_server(0) is None
+        server = start_server(port)
+        try:
+            assert start_server(port) is server
+            TURNS.inc()
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert "interview_turns_total" in response.read().decode()
+        finally:
+            stop_server()
+
+
+class TestGraphHooks:
+    """Nodes and LLM calls update the process metrics."""
+
+    def test_node_and_llm_metrics(self):
+        import openai
+        from unittest.mock import MagicMock, patch
+        from langchain_core.runnables import RunnableLambda
+        from graph import instrumented
+        from utils import metrics
+        from utils.llm_utils import invoke_llm
+
+        errors = [openai.RateLimitError("slow down", response=MagicMock(status_code=429, headers={}), body=None)]
+
+        def call(_inputs):
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        def node(state):
+            return {"answer": invoke_llm(None, lambda m: RunnableLambda(call), {}, node="observer")}
+
+        turns = metrics.TURNS.value()
+        limited = metrics.LLM_RATE_LIMITED.value(model="default")
+        retries = metrics.LLM_RETRIES.value(node="observer", error="rate_limit")
+        calls = metrics.LLM_CALLS.value(node="observer", model="default")
+        observed = metrics.NODE_LATENCY.count(node="observer")
+        config = {"configurable": {"thread_id": "metrics-1"}}
+
+        with patch("utils.llm_utils.time.sleep"):
+            instrumented("observer", node, starts_turn=True)({"loop_count": 0}, config)
+
+        assert metrics.TURNS.value() == turns + 1
+        assert metrics.LLM_RATE_LIMITED.value(model="default") == limited + 1
+        assert metrics.LLM_RETRIES.value(node="observer", error="rate_limit") == retries + 1
+        assert metrics.LLM_CALLS.value(node="observer", model="default") == calls + 1
+        assert metrics.NODE_LATENCY.count(node="observer") == observed + 1
+        assert "metrics-1" in metrics.sessions._seen
+        instrumented("feedback", lambda s: {})({"loop_count": 1}, config)
+        assert "metrics-1" not in metrics.sessions._seen
+
+    def test_checkpoint_bytes(self):
+        from utils.checkpoint import DeltaMemorySaver, stored_bytes
+        from langgraph.graph import StateGraph, END
+        from typing import TypedDict
+
+        class State(TypedDict):
+            text: str
+
+        builder = StateGraph(State)
+        builder.add_node("step", lambda s: {"text": s["text"] * 2})
+        builder.set_entry_point("step")
+        builder.add_edge("step", END)
+        saver = DeltaMemorySaver()
+        assert stored_bytes(saver) == 0
+        builder.compile(checkpointer=saver).invoke({"text": "x" * 500}, {"configurable": {"thread_id": "t"}})
+        assert stored_bytes(saver) > 1000
@@ -0,0 +1,91 @@
+"""
+Tests for the shared token-bucket and AIMD concurrency limiters.
+"""
+import time
+
+
+class TestTokenBucket:
+    """Test TokenBucket refill and timeout behavior."""
+
+    def test_burst_then_wait(self):
+        """Bucket allows a burst up to capacity, then paces callers."""
+        from utils.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate=100, capacity=2)
+        assert bucket.acquire(1, timeout=0)
+        assert bucket.acquire(1, timeout=0)
+        assert bucket.acquire(1, timeout=0) is False
+
+        start = time.monotonic()
+        assert bucket.acquire(1, timeout=1)
+        assert time.monotonic() - start < 0.5
+
+    def test_adjust_records_debt(self):
+        """Negative adjustments put the bucket in debt."""
+        from utils.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate=1, capacity=10)
+        bucket.adjust(-20)
+        assert bucket.acquire(1, timeout=0) is False
+
+
+class TestAdaptiveConcurrency:
+    """Test AIMD concurrency adaptation."""
+
+    def test_throttle_halves_limit_once_per_epoch(self):
+        """A burst of 429s from the same epoch only halves the limit once."""
+        from utils.rate_limit import AdaptiveConcurrency
+
+        limiter = AdaptiveConcurrency(max_limit=8, latency_target=10)
+        epochs = [limiter.acquire(timeout=0) for _ in range(4)]
+
+        for epoch in epochs:
+            limiter.release(epoch, latency=0.1, throttled=True)
+
+        assert limiter.limit == 4.0
+        assert limiter.in_flight == 0
+
+    def test_additive_increase(self):
+        """Successful calls grow the limit back towards the maximum."""
+        from utils.rate_limit import AdaptiveConcurrency
+
+        limiter = AdaptiveConcurrency(max_limit=8, latency_target=10)
+        limiter.limit = 2.0
+        for _ in range(4):
+            limiter.release(limiter.acquire(timeout=0), latency=0.1)
+
+        assert 3.0 <= limiter.limit <= 8.0
+
+    def test_acquire_times_out_when_full(self):
+        """No slot is granted beyond the current limit."""
+        from utils.rate_limit import AdaptiveConcurrency
+
+        limiter = AdaptiveConcurrency(max_limit=1, latency_target=10)
+        assert limiter.acquire(timeout=0) is not None
+        assert limiter.acquire(timeout=0.01) is None
+
+
+class TestModelLimiter:
+    """Test the combined per-model limiter."""
+
+    def test_failed_acquire_refunds_buckets(self):
+        """Tokens are refunded when the concurrency slot is not granted."""
+        from utils.rate_limit import ModelLimiter
+
+        limiter = ModelLimiter("test", rps=100, tpm=6000, max_in_flight=1, latency_target=10)
+        permit = limiter.acquire(100, timeout=0)
+        assert permit is not None
+        before = limiter.tokens.tokens
+
+        assert limiter.acquire(100, timeout=0.01) is None
+        assert limiter.tokens.tokens >= before
+
+        permit.release(0.1, tokens=50)
+        assert limiter.acquire(100, timeout=0) is not None
+
+    def test_registry_is_shared(self):
+        """All callers share one limiter per model."""
+        from utils.rate_limit import get_limiter
+
+        assert get_limiter("model-a") is get_limiter("model-a")
+        assert get_limiter("model-a") is not get_limiter("model-b")
@@ -0,0 +1,83 @@
+"""
+Tests for priority scheduling of LLM requests.
+"""
+import threading
+import time
+
+
+class TestPriorityScheduler:
+    """Test admission order, quotas and starvation protection."""
+
+    def test_node_classes(self):
+        """Interactive nodes are live, report generation is background."""
+        from utils.scheduler import priority_for, LIVE, BACKGROUND
+
+        for node in ("router", "observer", "interviewer", "critic"):
+            assert priority_for(node) == LIVE
+        for node in ("planner", "manager", "report", "roadmap"):
+            assert priority_for(node) == BACKGROUND
+
+    def test_live_preempts_queued_background(self):
+        """A live request queued after a background one is admitted first."""
+        from utils.scheduler import PriorityScheduler, LIVE, BACKGROUND
+
+        scheduler = PriorityScheduler(background_share=1.0, starvation_seconds=60)
+        background = scheduler.enqueue(BACKGROUND)
+        live = scheduler.enqueue(LIVE)
+
+        assert scheduler.can_start(live, free_slots=1, capacity=4)
+        assert not scheduler.can_start(background, free_slots=1, capacity=4)
+
+    def test_background_quota(self):
+        """Background requests cannot take more than their share of slots."""
+        from utils.scheduler import PriorityScheduler, BACKGROUND
+
+        scheduler = PriorityScheduler(background_share=0.5, starvation_seconds=60)
+        for _ in range(2):
+            scheduler.start(scheduler.enqueue(BACKGROUND))
+
+        waiter = scheduler.enqueue(BACKGROUND)
+        assert not scheduler.can_start(waiter, free_slots=2, capacity=4)
+
+    def test_starving_background_is_promoted(self):
+        """Background requests waiting too long rank as live."""
+        from utils.scheduler import PriorityScheduler, LIVE, BACKGROUND
+
+        scheduler = PriorityScheduler(background_share=1.0, starvation_seconds=0.01)
+        background = scheduler.enqueue(BACKGROUND)
+        time.sleep(0.02)
+        scheduler.enqueue(LIVE)
+
+        assert scheduler.can_start(background, free_slots=1, capacity=4)
+
+
+class TestPriorityAdmission:
+    """Test priority ordering through the concurrency limiter."""
+
+    def test_live_admitted_before_background(self):
+        """When a slot frees up, the waiting live call gets it."""
+        from utils.rate_limit import AdaptiveConcurrency
+        from utils.scheduler import LIVE, BACKGROUND
+
+        limiter = AdaptiveConcurrency(max_limit=1, latency_target=10)
+        limiter.scheduler.quotas[BACKGROUND] = 1.0
+        held = limiter.acquire(timeout=0)
+        order = []
+
+        def worker(priority):
+            epoch = limiter.acquire(timeout=2, priority=priority)
+            order.append(priority)
+            limiter.release(epoch, latency=0.01, priority=priority)
+
+        background = threading.Thread(target=worker, args=(BACKGROUND,))
+        background.start()
+        time.sleep(0.05)
+        live = threading.Thread(target=worker, args=(LIVE,))
+        live.start()
+        time.sleep(0.05)
+
+        limiter.release(held, latency=0.01)
+        background.join()
+        live.join()
+
+        assert order == [LIVE, BACKGROUND]
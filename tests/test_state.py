@@ -100,3 +100,59 @@ class TestAgentStateStructure:
         
         for field in required_fields:
             assert field in annotations, f"Missing field: {field}"
+
+
+class TestCompactRecords:
+    """Test slotted turn and thought records."""
+
+    def test_records_have_no_instance_dict(self):
+        from state import ObserverThought, TurnRecord
+
+        thought = ObserverThought("ok", "MAINTAIN", "Ask about GIL")
+        turn = TurnRecord.build(1, "Q", "A", {"Observer": "ok"})
+        assert not hasattr(thought, "__dict__")
+        assert not hasattr(turn, "__dict__")
+        with pytest.raises(AttributeError):
+            thought.decision = "STOP"
+
+    def test_dict_style_access(self):
+        """Existing consumers read records like dicts."""
+        from state import ObserverThought
+
+        thought = ObserverThought("ok", "MAINTAIN", "Ask about GIL", ["GIL"])
+        assert thought["instruction"] == "Ask about GIL"
+        assert thought.get("topics_covered") == ("GIL",)
+        assert thought.get("missing", "N/A") == "N/A"
+        assert "analysis" in thought
+
+    def test_strings_are_interned(self):
+        from state import ObserverThought, TurnRecord
+
+        decision = "".join(["MAIN", "TAIN"])
+        assert ObserverThought("a", decision, "i").decision is ObserverThought("b", "MAINTAIN", "j").decision
+        agent = "".join(["Obs", "erver"])
+        first = TurnRecord(1, "Q", "A", ((agent, "x"),))
+        second = TurnRecord(2, "Q", "A", (("Observer", "y"),))
+        assert first.thoughts[0][0] is second.thoughts[0][0]
+
+    def test_turn_serializes_to_log_schema(self):
+        """to_dict matches the format validate_logs.py checks."""
+        import json
+        from state import TurnRecord
+
+        turn = TurnRecord.build(3, "Что такое GIL?", "Блокировка", {"Observer": "Верно.", "Critic": "APPROVED."})
+        assert turn.to_dict() == {
+            "turn_id": 3,
+            "agent_visible_message": "Что такое GIL?",
+            "user_message": "Блокировка",
+            "internal_thoughts": "[Observer]: Верно.\n[Critic]: APPROVED.\n"
+        }
+        assert json.loads(turn.to_json()) == turn.to_dict()
+
+    def test_turn_metrics_are_optional(self):
+        """Metrics appear in the log only when the live graph recorded them."""
+        from state import TurnRecord
+
+        assert "metrics" not in TurnRecord.build(1, "Q", "A", {}).to_dict()
+        turn = TurnRecord.build(1, "Q", "A", {}, decision="MAINTAIN", critic_rejections=1, latency_ms=1200)
+        assert turn.to_dict()["metrics"] == {"decision": "MAINTAIN", "critic_rejections": 1, "latency_ms": 1200}
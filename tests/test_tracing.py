@@ -0,0 +1,122 @@
+"""
+Tests for span tracing and the Chrome/OTLP exporters.
+"""
+import json
+
+import pytest
+
+
+@pytest.fixture
+def traced(tmp_path, monkeypatch):
+    from utils.tracing import tracer
+    monkeypatch.setattr(tracer, "directory", str(tmp_path))
+    monkeypatch.setattr(tracer, "_turns", type(tracer._turns)())
+    return tmp_path
+
+
+class TestSpans:
+    """Spans nest across nodes, retries and worker threads."""
+
+    def test_disabled_tracer_is_a_no_op(self, tmp_path):
+        from utils.tracing import Tracer
+
+        tracer = Tracer("")
+        with tracer.span("node") as current:
+            assert current is None
+        tracer.flush()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_llm_retry_spans_nest_under_node(self, traced):
+        import openai
+        from unittest.mock import MagicMock, patch
+        from langchain_core.runnables import RunnableLambda
+        from graph import instrumented
+        from utils.llm_utils import invoke_llm
+        from utils.tracing import load_spans
+
+        errors = [openai.InternalServerError("boom", response=MagicMock(status_code=503, headers={}), body=None)]
+
+        def call(_inputs):
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        def node(state):
+            return {"answer": invoke_llm(None, lambda m: RunnableLambda(call), {}, node="critic")}
+
+        with patch("utils.llm_utils.time.sleep"):
+            instrumented("critic", node)({"loop_count": 2}, {"configurable": {"thread_id": "t-9"}})
+
+        spans = load_spans(str(traced / "t-9.jsonl"))
+        by_id = {s["span_id"]: s for s in spans}
+        names = {s["name"]: s for s in spans}
+        assert len({s["trace_id"] for s in spans}) == 1
+
+        root = names["critic"]
+        assert root["parent_id"] is None and root["attrs"] == {"thread_id": "t-9", "turn": 2}
+        assert by_id[names["llm critic"]["parent_id"]] is root
+        attempts = sorted((s for s in spans if s["name"] == "attempt"), key=lambda s: s["attrs"]["attempt"])
+        assert [a.get("error") for a in attempts] == ["InternalServerError", None]
+        assert names["backoff"]["attrs"]["error"] == "transient"
+        # Worker-thread spans of the second attempt stay under it
+        assert by_id[names["rate_limit"]["parent_id"]]["name"] == "attempt"
+        assert by_id[names["call"]["parent_id"]] in attempts
+
+    def test_entry_node_starts_new_trace(self, traced):
+        from graph import instrumented
+        from utils.tracing import group_traces, load_spans, select_trace
+
+        config = {"configurable": {"thread_id": "t-1"}}
+        for turn in (0, 1):
+            instrumented("planner", lambda s: {}, starts_turn=True)({"loop_count": turn}, config)
+            instrumented("observer", lambda s: {})({"loop_count": turn}, config)
+
+        spans = load_spans(str(traced / "t-1.jsonl"))
+        traces = list(group_traces(spans).values())
+        assert [[s["name"] for s in t] for t in traces] == [["planner", "observer"]] * 2
+        assert [s["name"] for s in select_trace(spans, turn=1)] == ["planner", "observer"]
+        assert select_trace(spans, turn=1)[0]["trace_id"] == traces[1][0]["trace_id"]
+        assert select_trace(spans, slowest=True) in traces
+
+
+class TestExport:
+    """Chrome trace-event and OTLP/JSON output."""
+
+    SPANS = [
+        {"name": "critic", "cat": "node", "trace_id": "a" * 32, "span_id": "1" * 16, "parent_id": None,
+         "start_us": 1000, "dur_us": 500, "tid": 11, "attrs": {"thread_id": "t", "turn": 3}},
+        {"name": "ChatOpenAI", "cat": "provider", "trace_id": "a" * 32, "span_id": "2" * 16,
+         "parent_id": "1" * 16, "start_us": 1100, "dur_us": 300, "tid": 12,
+         "attrs": {"prompt_tokens": 40}, "error": "APITimeoutError"},
+    ]
+
+    def test_chrome_events(self):
+        from utils.tracing import to_chrome
+
+        events = to_chrome(self.SPANS)["traceEvents"]
+        complete = [e for e in events if e["ph"] == "X"]
+        assert [(e["name"], e["ts"], e["dur"]) for e in complete] == [("critic", 1000, 500), ("ChatOpenAI", 1100, 300)]
+        assert complete[1]["args"]["error"] == "APITimeoutError"
+        assert complete[0]["tid"] != complete[1]["tid"]
+        process = next(e for e in events if e["name"] == "process_name")
+        assert process["args"]["name"] == "thread t turn 3"
+
+    def test_otlp_spans(self):
+        from utils.tracing import to_otlp
+
+        spans = to_otlp(self.SPANS)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        root, call = spans
+        assert "parentSpanId" not in root and call["parentSpanId"] == "1" * 16
+        assert call["kind"] == 3 and call["status"]["code"] == 2
+        assert call["startTimeUnixNano"] == "1100000" and call["endTimeUnixNano"] == "1400000"
+        assert {"key": "prompt_tokens", "value": {"intValue": "40"}} in call["attributes"]
+
+    def test_cli_exports_turn(self, tmp_path):
+        from utils.tracing import main
+
+        source = tmp_path / "t.jsonl"
+        source.write_text("".join(json.dumps(s) + "\n" for s in self.SPANS) + '{"torn', encoding="utf-8")
+        out = tmp_path / "trace.json"
+        assert main([str(source), str(out), "--turn", "3"]) == 0
+        assert len([e for e in json.loads(out.read_text())["traceEvents"] if e["ph"] == "X"]) == 2
+        assert main([str(source), str(out), "--turn", "4"]) == 1
@@ -0,0 +1,93 @@
+"""
+Tests for the append-only turn journal and its compaction.
+"""
+import json
+import os
+
+
+def _turn(turn_id, answer="Ответ"):
+    from state import TurnRecord
+    return TurnRecord.build(turn_id, f"Вопрос {turn_id}?", answer, {"Observer": "Ок."})
+
+
+class TestTurnJournal:
+    """Test journaling and fsync batching."""
+
+    def test_each_turn_is_one_line(self, tmp_path):
+        from utils.turn_log import TurnJournal
+
+        journal = TurnJournal(str(tmp_path), fsync_every=100, fsync_interval=3600)
+        journal.append("thread-1", _turn(1))
+        journal.append("thread-1", _turn(2))
+
+        # Lines are visible before any fsync or close
+        with open(journal.path("thread-1"), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["turn_id"] for line in lines] == [1, 2]
+        journal.close_all()
+
+    def test_fsync_is_batched(self, tmp_path):
+        from unittest.mock import patch
+        from utils.turn_log import TurnJournal
+
+        journal = TurnJournal(str(tmp_path), fsync_every=3, fsync_interval=3600)
+        with patch("utils.turn_log.os.fsync") as fsync:
+            for i in range(5):
+                journal.append(f"thread-{i % 2}", _turn(i))
+            assert fsync.call_count == 2  # One batch of 3 lines across both journals
+            journal.close_all()
+            assert fsync.call_count == 4
+
+    def test_disabled_journal_writes_nothing(self, tmp_path):
+        from utils.turn_log import TurnJournal
+
+        journal = TurnJournal("")
+        journal.append("thread-1", _turn(1))
+        assert not journal.enabled
+        assert os.listdir(tmp_path) == []
+
+
+class TestJournalCompaction:
+    """Test compaction into the validate_logs format."""
+
+    def test_compacted_log_is_valid(self, tmp_path):
+        from utils.turn_log import TurnJournal
+        from utils.logger import LoggerUtils
+        from validate_logs import validate_log
+
+        journal = TurnJournal(str(tmp_path / "turns"))
+        for i in (1, 2, 3):
+            journal.append("t", _turn(i))
+        journal.close("t")
+        target = str(tmp_path / "interview_log_1.json")
+
+        written = LoggerUtils.compact_journal(journal.path("t"), "Данил", "# Отчёт", filename=target)
+
+        assert written == 3
+        assert validate_log(target)
+        with open(target, encoding="utf-8") as f:
+            log = json.load(f)
+        assert log["participant_name"] == "Данил"
+        assert log["turns"][0] == _turn(1).to_dict()
+        assert not os.path.exists(journal.path("t"))
+
+    def test_replayed_and_torn_lines(self, tmp_path):
+        """A replayed turn keeps its place with the last content; a torn line is dropped."""
+        from utils.logger import LoggerUtils
+
+        path = tmp_path / "t.jsonl"
+        path.write_text("\n".join([_turn(1, "old").to_json(), _turn(2).to_json(),
+                                   _turn(1, "new").to_json(), '{"turn_id": 3, "agent_vis']),
+                        encoding="utf-8")
+        target = str(tmp_path / "log.json")
+
+        assert LoggerUtils.compact_journal(str(path), "N", "F", filename=target) == 2
+        with open(target, encoding="utf-8") as f:
+            turns = json.load(f)["turns"]
+        assert [(t["turn_id"], t["user_message"]) for t in turns] == [(1, "new"), (2, "Ответ")]
+
+    def test_missing_journal(self, tmp_path):
+        from utils.logger import LoggerUtils
+
+        assert LoggerUtils.compact_journal(str(tmp_path / "none.jsonl"), "N", "F",
+                                           filename=str(tmp_path / "log.json")) == 0
@@ -0,0 +1,86 @@
+"""
+Tests for the streaming and bulk log validator.
+"""
+import io
+import json
+
+import pytest
+
+
+def _log(turn_ids=(1, 2), feedback="# Отчёт", thoughts="[Observer]: ok\n"):
+    return {
+        "participant_name": "Иван",
+        "turns": [{"turn_id": i, "agent_visible_message": "Вопрос " * 50, "user_message": "Ответ " * 50,
+                   "internal_thoughts": thoughts} for i in turn_ids],
+        "final_feedback": feedback,
+    }
+
+
+def _write(path, log):
+    path.write_text(json.dumps(log, ensure_ascii=False, indent=2) if isinstance(log, dict) else log,
+                    encoding="utf-8")
+    return str(path)
+
+
+class TestCheckLog:
+    """Test the streaming checks on single files."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+    def test_valid_log_any_chunk_size(self, tmp_path, chunk_size):
+        from validate_logs import check_log
+
+        result = check_log(_write(tmp_path / "log.json", _log(range(1, 30))), chunk_size=chunk_size)
+        assert result["ok"], result["errors"]
+        assert result["turns"] == 29
+        assert result["participant_name"] == "Иван"
+
+    @pytest.mark.parametrize("log, message", [
+        (_log((1, 3, 2)), "does not increase"),
+        (_log((1, 1)), "does not increase"),
+        (_log(feedback="  "), "'final_feedback' is empty"),
+        ({"participant_name": "N", "turns": []}, "Missing required key 'final_feedback'"),
+        ({"participant_name": "N", "turns": {}, "final_feedback": "F"}, "'turns' must be a list"),
+        ('{"participant_name": "N", "turns": [{"turn_id": 1,', "Failed to parse JSON"),
+        ('{"participant_name": "N", "turns": [], "final_feedback": "F"} {}', "Extra data"),
+    ])
+    def test_invariant_violations(self, tmp_path, log, message):
+        from validate_logs import check_log
+
+        result = check_log(_write(tmp_path / "log.json", log), chunk_size=5)
+        assert not result["ok"]
+        assert any(message in error for error in result["errors"]), result["errors"]
+
+    def test_missing_markers_warn(self, tmp_path):
+        from validate_logs import check_log
+
+        result = check_log(_write(tmp_path / "log.json", _log(thoughts="no markers")))
+        assert result["ok"]
+        assert len(result["warnings"]) == 2
+
+
+class TestBulkValidation:
+    """Test directory/glob expansion and JSONL output."""
+
+    def test_bulk_jsonl(self, tmp_path):
+        from validate_logs import validate_bulk
+
+        _write(tmp_path / "a.json", _log())
+        (tmp_path / "nested").mkdir()
+        _write(tmp_path / "nested" / "b.json", _log((2, 1)))
+        _write(tmp_path / "nested" / "c.json", _log(thoughts="none"))
+        out = io.StringIO()
+
+        assert validate_bulk([str(tmp_path)], jobs=2, out=out) == (3, 1)
+        results = {r["path"].rsplit("/", 1)[-1]: r for r in map(json.loads, out.getvalue().splitlines())}
+        assert results["a.json"]["ok"] and not results["b.json"]["ok"]
+
+        assert validate_bulk([str(tmp_path / "**" / "*.json")], jobs=1, out=io.StringIO(), strict=True) == (3, 2)
+
+    def test_cli_exit_codes(self, tmp_path, capsys):
+        from validate_logs import main
+
+        good = _write(tmp_path / "good.json", _log())
+        bad = _write(tmp_path / "bad.json", _log(feedback=""))
+        assert main([good]) == 0
+        assert main([good, bad, "--jobs", "1"]) == 1
+        assert "1/2 logs valid" in capsys.readouterr().err
@@ -0,0 +1,305 @@
+"""
+Columnar analytics over interview logs.
+`export` flattens logs once into NumPy arrays (.npz): one row per session
+(grade, position, manager decision and confidence) and one per turn
+(latency, Observer difficulty decision, critic rejections), sessions
+pointing at their turns through CSR offsets. `report` then computes
+hiring-funnel, calibration, difficulty and latency statistics with array
+operations only, so tens of thousands of sessions take well under a second.
+
+Usage:
+    python -m utils.analytics export analytics.npz [paths ...]
+    python -m utils.analytics report analytics.npz
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.archive import default_sources, expand_paths, report_metadata
+from utils.log_config import get_logger
+
+logger = get_logger("analytics")
+
+DIFFICULTY = ("", "INCREASE_DIFFICULTY", "DECREASE_DIFFICULTY", "MAINTAIN")
+"""Turn decision codes; 0 means the Observer did not run or the log predates metrics."""
+
+HIRE_DECISIONS = ("STRONG_HIRE", "HIRE")
+
+# Confidence bands the Manager prompt prescribes for each decision
+CONFIDENCE_BANDS = {
+    "STRONG_HIRE": (90, 100),
+    "HIRE": (70, 89),
+    "MAYBE": (50, 69),
+    "NO_HIRE": (30, 49),
+    "STRONG_NO_HIRE": (0, 29),
+}
+
+
+class _Vocab:
+    """String -> small integer code, in first-seen order."""
+
+    def __init__(self, initial: Iterable[str] = ()):
+        self.codes: Dict[str, int] = {}
+        for value in initial:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        return self.codes.setdefault(value or "", len(self.codes))
+
+    def array(self) -> np.ndarray:
+        return np.array(list(self.codes), dtype=str)
+
+
+# === Export ===
+
+def export(paths: Iterable[str], out_path: str) -> Dict[str, int]:
+    """
+    Flatten interview logs into a compressed .npz file.
+
+    Args:
+        paths: Log files, directories or globs (see utils.archive.expand_paths)
+        out_path: Target .npz file
+
+    Returns:
+        Counts of exported "sessions", "turns" and "skipped" files
+    """
+    grades, positions, decisions = _Vocab([""]), _Vocab([""]), _Vocab([""])
+    difficulty = _Vocab(DIFFICULTY)
+    s_path, s_grade, s_position, s_decision, s_confidence, offsets = [], [], [], [], [], [0]
+    t_id, t_latency, t_decision, t_rejections = [], [], [], []
+    skipped = 0
+
+    for path in expand_paths(paths):
+        try:
+            with open(path, encoding="utf-8") as f:
+                log = json.load(f)
+            turns = log["turns"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Skipping %s: %s", path, e)
+            skipped += 1
+            continue
+        meta = report_metadata(log.get("final_feedback", ""))
+        s_path.append(path)
+        s_grade.append(grades.code(meta["grade"]))
+        s_position.append(positions.code(meta["position"]))
+        s_decision.append(decisions.code(meta["decision"]))
+        s_confidence.append(float(meta["confidence"]) if meta["confidence"] else np.nan)
+        for turn in turns:
+            metrics = turn.get("metrics") or {}
+            latency = metrics.get("latency_ms")
+            t_id.append(turn.get("turn_id", 0))
+            t_latency.append(np.nan if latency is None else latency)
+            t_decision.append(difficulty.code(metrics.get("decision")))
+            t_rejections.append(metrics.get("critic_rejections", -1))  # -1: not recorded
+        offsets.append(len(t_id))
+
+    offsets_arr = np.array(offsets, dtype=np.int64)
+    np.savez_compressed(
+        out_path,
+        session_path=np.array(s_path, dtype=str),
+        session_grade=np.array(s_grade, dtype=np.int16),
+        session_position=np.array(s_position, dtype=np.int16),
+        session_decision=np.array(s_decision, dtype=np.int16),
+        session_confidence=np.array(s_confidence, dtype=np.float32),
+        turn_offsets=offsets_arr,
+        turn_session=np.repeat(np.arange(len(s_path), dtype=np.int32), np.diff(offsets_arr)),
+        turn_id=np.array(t_id, dtype=np.int32),
+        turn_latency_ms=np.array(t_latency, dtype=np.float32),
+        turn_decision=np.array(t_decision, dtype=np.int8),
+        turn_critic_rejections=np.array(t_rejections, dtype=np.int16),
+        grade_vocab=grades.array(),
+        position_vocab=positions.array(),
+        decision_vocab=decisions.array(),
+        difficulty_vocab=difficulty.array(),
+    )
+    counts = {"sessions": len(s_path), "turns": len(t_id), "skipped": skipped}
+    logger.info("Analytics export to %s: %s", out_path, counts)
+    return counts
+
+
+def load(path: str) -> Dict[str, np.ndarray]:
+    """All arrays of an exported .npz file."""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+# === Report ===
+
+def report(data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Funnel, calibration, difficulty, latency and critic statistics.
+
+    Args:
+        data: Arrays as written by `export` (see `load`)
+
+    Returns:
+        JSON-serialisable nested dict of statistics
+    """
+    return {
+        "sessions": int(len(data["session_grade"])),
+        "turns": int(len(data["turn_id"])),
+        "funnel": funnel(data),
+        "depth": depth(data),
+        "calibration": calibration(data),
+        "difficulty": difficulty_stats(data),
+        "latency": latency(data),
+        "critic": critic(data),
+    }
+
+
+def funnel(data: Dict[str, np.ndarray]) -> Dict[str, Dict[str, Any]]:
+    """Manager decisions per grade and the hire rate."""
+    grade_vocab, decision_vocab = data["grade_vocab"], data["decision_vocab"]
+    n_grades, n_decisions = len(grade_vocab), len(decision_vocab)
+    counts = np.bincount(data["session_grade"].astype(np.int64) * n_decisions + data["session_decision"],
+                         minlength=n_grades * n_decisions).reshape(n_grades, n_decisions)
+    hired = np.isin(decision_vocab, HIRE_DECISIONS)
+    totals = counts.sum(axis=1)
+    hires = counts[:, hired].sum(axis=1)
+    return {
+        (grade or "unknown"): {
+            "sessions": int(totals[g]),
+            "decisions": {(d or "unknown"): int(counts[g, i]) for i, d in enumerate(decision_vocab) if counts[g, i]},
+            "hire_rate": round(float(hires[g] / totals[g]), 4),
+        }
+        for g, grade in enumerate(grade_vocab) if totals[g]
+    }
+
+
+def depth(data: Dict[str, np.ndarray]) -> List[float]:
+    """Share of sessions reaching at least k turns, k = 1, 2, ..."""
+    turn_counts = np.diff(data["turn_offsets"])
+    if not len(turn_counts):
+        return []
+    reached = np.cumsum(np.bincount(turn_counts)[::-1])[::-1]
+    return [round(float(x), 4) for x in reached[1:] / len(turn_counts)]
+
+
+def calibration(data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Manager confidence against its own decision bands: the share of
+    decisions whose confidence lies in the prescribed band, plus the hire
+    rate per confidence decile.
+    """
+    decision_vocab = data["decision_vocab"]
+    codes, confidence = data["session_decision"], data["session_confidence"]
+    known = ~np.isnan(confidence)
+
+    lows = np.full(len(decision_vocab), np.nan)
+    highs = np.full(len(decision_vocab), np.nan)
+    for i, decision in enumerate(decision_vocab):
+        if decision in CONFIDENCE_BANDS:
+            lows[i], highs[i] = CONFIDENCE_BANDS[decision]
+    banded = known & ~np.isnan(lows[codes])
+    in_band = banded & (confidence >= lows[codes]) & (confidence <= highs[codes])
+
+    per_decision = {}
+    for i, decision in enumerate(decision_vocab):
+        mask = banded & (codes == i)
+        if mask.any():
+            per_decision[decision] = {
+                "sessions": int(mask.sum()),
+                "mean_confidence": round(float(confidence[mask].mean()), 2),
+                "in_band": round(float(in_band[mask].mean()), 4),
+            }
+
+    deciles = np.clip(confidence[known] // 10, 0, 9).astype(np.int64)
+    hired = np.isin(decision_vocab, HIRE_DECISIONS)[codes[known]]
+    sessions = np.bincount(deciles, minlength=10)
+    hires = np.bincount(deciles, weights=hired, minlength=10)
+    return {
+        "in_band": round(float(in_band[banded].mean()), 4) if banded.any() else None,
+        "by_decision": per_decision,
+        "hire_rate_by_decile": {
+            f"{d * 10}-{d * 10 + 9}": round(float(hires[d] / sessions[d]), 4)
+            for d in range(10) if sessions[d]
+        },
+    }
+
+
+def difficulty_stats(data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Observer decision mix, turn-to-turn transitions and net trajectory by manager decision."""
+    vocab = [str(v) for v in data["difficulty_vocab"]]
+    k = len(vocab)
+    codes = data["turn_decision"].astype(np.int64)
+    sessions = data["turn_session"]
+
+    same_session = (sessions[1:] == sessions[:-1]) & (codes[1:] > 0) & (codes[:-1] > 0)
+    transitions = np.bincount(codes[:-1][same_session] * k + codes[1:][same_session],
+                              minlength=k * k).reshape(k, k)
+
+    step = (codes == vocab.index("INCREASE_DIFFICULTY")).astype(np.int64) \
+        - (codes == vocab.index("DECREASE_DIFFICULTY"))
+    n_sessions = len(data["session_decision"])
+    net = np.bincount(sessions, weights=step, minlength=n_sessions)
+    decision_codes = data["session_decision"]
+    per_decision = np.bincount(decision_codes, weights=net, minlength=len(data["decision_vocab"]))
+    decision_counts = np.bincount(decision_codes, minlength=len(data["decision_vocab"]))
+
+    return {
+        "mix": {v: int(c) for v, c in zip(vocab, np.bincount(codes, minlength=k)) if v and c},
+        "transitions": {f"{vocab[a]}->{vocab[b]}": int(transitions[a, b])
+                        for a in range(1, k) for b in range(1, k) if transitions[a, b]},
+        "mean_net_trajectory": {
+            (str(d) or "unknown"): round(float(per_decision[i] / decision_counts[i]), 3)
+            for i, d in enumerate(data["decision_vocab"]) if decision_counts[i]
+        },
+    }
+
+
+def latency(data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Answer-to-question latency percentiles (ms), overall and per grade."""
+    values = data["turn_latency_ms"]
+    known = ~np.isnan(values)
+    turn_grades = data["session_grade"][data["turn_session"]]
+
+    def summary(mask: np.ndarray) -> Dict[str, float]:
+        p50, p95, p99 = np.percentile(values[mask], [50, 95, 99])
+        return {"turns": int(mask.sum()), "p50": round(float(p50), 1),
+                "p95": round(float(p95), 1), "p99": round(float(p99), 1)}
+
+    result: Dict[str, Any] = {"overall": summary(known) if known.any() else None, "by_grade": {}}
+    for g, grade in enumerate(data["grade_vocab"]):
+        mask = known & (turn_grades == g)
+        if mask.any():
+            result["by_grade"][str(grade) or "unknown"] = summary(mask)
+    return result
+
+
+def critic(data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Critic rejections per turn, over turns that recorded them."""
+    rejections = data["turn_critic_rejections"]
+    known = rejections >= 0
+    if not known.any():
+        return {"turns": 0}
+    return {
+        "turns": int(known.sum()),
+        "rejected_share": round(float((rejections[known] > 0).mean()), 4),
+        "mean_rejections": round(float(rejections[known].mean()), 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.analytics", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="Flatten logs into an .npz file")
+    export_cmd.add_argument("out", help="Target .npz file")
+    export_cmd.add_argument("paths", nargs="*", help="Files, directories or globs (default: legacy logs + log store)")
+
+    report_cmd = commands.add_parser("report", help="Funnel and calibration report from an .npz file")
+    report_cmd.add_argument("data", help="File written by export")
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        print(export(args.paths or default_sources(), args.out))
+    else:
+        print(json.dumps(report(load(args.data)), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Searchable interview archive: SQLite FTS5 index over saved interview logs.
+Each log becomes a row of metadata (participant, position, grade, manager
+decision) plus full-text rows for its turns and final report. Ingest is
+incremental: files whose mtime and size are unchanged are skipped, and
+changed files are re-indexed only if their content hash differs.
+
+Usage:
+    python -m utils.archive ingest [paths ...]
+    python -m utils.archive search "asyncio AND галлюц*" --grade Senior --position Backend
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("archive")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    participant TEXT,
+    position TEXT,
+    grade TEXT,
+    decision TEXT,
+    confidence INTEGER,
+    turn_count INTEGER,
+    final_feedback TEXT
+);
+CREATE INDEX IF NOT EXISTS logs_grade ON logs (grade);
+CREATE INDEX IF NOT EXISTS logs_decision ON logs (decision);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    log_id INTEGER NOT NULL REFERENCES logs (id) ON DELETE CASCADE,
+    turn_id INTEGER,
+    question TEXT,
+    answer TEXT,
+    thoughts TEXT
+);
+CREATE INDEX IF NOT EXISTS turns_log ON turns (log_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5 (
+    question, answer, thoughts,
+    content='turns', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5 (
+    final_feedback,
+    content='logs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, question, answer, thoughts)
+    VALUES (new.id, new.question, new.answer, new.thoughts);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, question, answer, thoughts)
+    VALUES ('delete', old.id, old.question, old.answer, old.thoughts);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_ai AFTER INSERT ON logs BEGIN
+    INSERT INTO reports_fts (rowid, final_feedback) VALUES (new.id, new.final_feedback);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_ad AFTER DELETE ON logs BEGIN
+    INSERT INTO reports_fts (reports_fts, rowid, final_feedback) VALUES ('delete', old.id, old.final_feedback);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_au AFTER UPDATE OF final_feedback ON logs BEGIN
+    INSERT INTO reports_fts (reports_fts, rowid, final_feedback) VALUES ('delete', old.id, old.final_feedback);
+    INSERT INTO reports_fts (rowid, final_feedback) VALUES (new.id, new.final_feedback);
+END;
+"""
+
+# Report lines written by feedback_node and ManagerAgent.format_decision_report
+_FIELDS = {
+    "position": re.compile(r"\*\*Позиция\*\*:\s*(.+)"),
+    "grade": re.compile(r"\*\*Грейд\*\*:\s*(.+)"),
+    "decision": re.compile(r"### Решение:\s*\*\*(.+?)\*\*"),
+    "confidence": re.compile(r"\*\*Уверенность\*\*:\s*(\d+)"),
+}
+
+
+class InterviewArchive:
+    """
+    FTS5 index of interview logs.
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # === Ingest ===
+
+    def ingest(self, paths: Iterable[str], prune: bool = False) -> Dict[str, int]:
+        """
+        Index new and changed logs.
+
+        Args:
+            paths: Log files, directories (searched recursively for *.json) or glob patterns
+            prune: Drop indexed logs whose file no longer exists
+
+        Returns:
+            Counts of "indexed", "unchanged", "skipped" (unreadable) and "pruned" files
+        """
+        counts = {"indexed": 0, "unchanged": 0, "skipped": 0, "pruned": 0}
+        known = {row["path"]: row for row in self.conn.execute("SELECT id, path, mtime, size, sha1 FROM logs")}
+        with self.conn:
+            for path in expand_paths(paths):
+                counts[self._ingest_file(path, known.get(path))] += 1
+            if prune:
+                for path, row in known.items():
+                    if not os.path.exists(path):
+                        self.conn.execute("DELETE FROM logs WHERE id = ?", (row["id"],))
+                        counts["pruned"] += 1
+        logger.info("Archive ingest: %s", counts)
+        return counts
+
+    def _ingest_file(self, path: str, known: Optional[sqlite3.Row]) -> str:
+        try:
+            stat = os.stat(path)
+            if known is not None and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+                return "unchanged"
+            with open(path, "rb") as f:
+                raw = f.read()
+            sha1 = hashlib.sha1(raw).hexdigest()
+            if known is not None and known["sha1"] == sha1:
+                # Touched but identical: remember the new mtime, keep the index
+                self.conn.execute("UPDATE logs SET mtime = ?, size = ? WHERE id = ?",
+                                  (stat.st_mtime, stat.st_size, known["id"]))
+                return "unchanged"
+            log = json.loads(raw)
+            turns = log["turns"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Skipping %s: %s", path, e)
+            return "skipped"
+
+        feedback = log.get("final_feedback", "")
+        meta = report_metadata(feedback)
+        if known is not None:
+            self.conn.execute("DELETE FROM logs WHERE id = ?", (known["id"],))
+        log_id = self.conn.execute(
+            "INSERT INTO logs (path, mtime, size, sha1, participant, position, grade, decision,"
+            " confidence, turn_count, final_feedback) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, stat.st_mtime, stat.st_size, sha1, log.get("participant_name"),
+             meta["position"], meta["grade"], meta["decision"],
+             int(meta["confidence"]) if meta["confidence"] else None, len(turns), feedback),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO turns (log_id, turn_id, question, answer, thoughts) VALUES (?, ?, ?, ?, ?)",
+            [(log_id, t.get("turn_id"), t.get("agent_visible_message", ""), t.get("user_message", ""),
+              t.get("internal_thoughts", "")) for t in turns],
+        )
+        return "indexed"
+
+    # === Query ===
+
+    def search(self, query: str, grade: Optional[str] = None, position: Optional[str] = None,
+               decision: Optional[str] = None, scope: str = "turns", limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search with metadata filters, best matches first.
+
+        Args:
+            query: FTS5 query, e.g. 'asyncio AND галлюц*' or 'thoughts: "event loop"'
+            grade: Exact grade (case-insensitive)
+            position: Substring of the position
+            decision: Manager decision, e.g. "HIRE"
+            scope: "turns" (questions, answers, thoughts) or "reports" (final feedback)
+            limit: Maximum number of hits
+
+        Returns:
+            Hits with log path and metadata; turn hits also carry turn_id and a snippet
+        """
+        if scope == "turns":
+            sql = ("SELECT l.path, l.participant, l.position, l.grade, l.decision, t.turn_id,"
+                   " snippet(turns_fts, -1, '[', ']', '…', 12) AS snippet, bm25(turns_fts) AS rank"
+                   " FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid JOIN logs l ON l.id = t.log_id"
+                   " WHERE turns_fts MATCH ?")
+        elif scope == "reports":
+            sql = ("SELECT l.path, l.participant, l.position, l.grade, l.decision, NULL AS turn_id,"
+                   " snippet(reports_fts, 0, '[', ']', '…', 12) AS snippet, bm25(reports_fts) AS rank"
+                   " FROM reports_fts JOIN logs l ON l.id = reports_fts.rowid"
+                   " WHERE reports_fts MATCH ?")
+        else:
+            raise ValueError(f"Unknown scope: {scope}")
+        params: List[Any] = [query]
+        if grade:
+            sql += " AND l.grade = ? COLLATE NOCASE"
+            params.append(grade)
+        if position:
+            sql += " AND l.position LIKE ?"
+            params.append(f"%{position}%")
+        if decision:
+            sql += " AND l.decision = ? COLLATE NOCASE"
+            params.append(decision)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+
+def report_metadata(final_feedback: str) -> Dict[str, Optional[str]]:
+    """Position, grade, manager decision and confidence parsed from a final report."""
+    meta = {}
+    for name, pattern in _FIELDS.items():
+        found = pattern.search(final_feedback)
+        meta[name] = found.group(1).strip() if found else None
+    return meta
+
+
+def expand_paths(paths: Iterable[str]) -> Iterable[str]:
+    """Absolute, de-duplicated log paths; the log store manifest and temp files are ignored."""
+    seen = set()
+    for pattern in paths:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.json"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            path = os.path.abspath(path)
+            if path not in seen and not os.path.basename(path).startswith(".tmp-"):
+                seen.add(path)
+                yield path
+
+
+def default_sources() -> List[str]:
+    """Legacy logs in the working directory plus the log store."""
+    sources = ["interview_log_*.json"]
+    if settings.LOG_STORE_DIR:
+        sources.append(settings.LOG_STORE_DIR)
+    return sources
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.archive", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default=settings.ARCHIVE_DB_PATH, help="Archive database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Index new and changed logs")
+    ingest.add_argument("paths", nargs="*", help="Files, directories or globs (default: legacy logs + log store)")
+    ingest.add_argument("--prune", action="store_true", help="Drop logs whose file was deleted")
+
+    search = commands.add_parser("search", help="Full-text search")
+    search.add_argument("query", help="FTS5 query")
+    search.add_argument("--grade")
+    search.add_argument("--position")
+    search.add_argument("--decision")
+    search.add_argument("--scope", choices=["turns", "reports"], default="turns")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="Print hits as JSON lines")
+
+    args = parser.parse_args(argv)
+    archive = InterviewArchive(args.db)
+    try:
+        if args.command == "ingest":
+            print(archive.ingest(args.paths or default_sources(), prune=args.prune))
+            return 0
+
+        started = time.perf_counter()
+        try:
+            hits = archive.search(args.query, grade=args.grade, position=args.position,
+                                  decision=args.decision, scope=args.scope, limit=args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid query: {e}", file=sys.stderr)
+            return 2
+        for hit in hits:
+            if args.json:
+                print(json.dumps(hit, ensure_ascii=False))
+            else:
+                turn = f" turn {hit['turn_id']}" if hit["turn_id"] is not None else ""
+                print(f"{hit['path']}{turn} | {hit['participant']} | {hit['grade']} {hit['position']}"
+                      f" | {hit['decision']}\n    {hit['snippet']}")
+        print(f"{len(hits)} hits in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        return 0
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
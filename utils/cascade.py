@@ -0,0 +1,50 @@
+"""
+Escalation tracking for the interviewer model cascade.
+With INTERVIEWER_CASCADE on, the first attempt of a question uses the
+router-tier model; a rejection (local checks or critic) escalates the
+retry to MODEL_INTERVIEWER. Rates per grade show where the cheap tier works;
+they are exported as the interview_cascade_* metrics.
+"""
+import threading
+from typing import Dict
+
+from utils.log_config import get_logger
+from utils.metrics import CASCADE_ATTEMPTS, CASCADE_ESCALATIONS
+
+logger = get_logger("cascade")
+
+
+class CascadeStats:
+    """Per-grade counters of cheap-tier attempts and escalations."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, grade: str, escalated: bool) -> None:
+        """Record the outcome of one cheap-tier attempt."""
+        with self._lock:
+            counts = self._counts.setdefault(grade, {"attempts": 0, "escalations": 0})
+            counts["attempts"] += 1
+            counts["escalations"] += int(escalated)
+            rate = counts["escalations"] / counts["attempts"]
+        CASCADE_ATTEMPTS.inc(grade=grade)
+        if escalated:
+            CASCADE_ESCALATIONS.inc(grade=grade)
+        logger.debug("Cascade %s: %s, escalation rate %.0f%%",
+                     grade, "escalated" if escalated else "accepted", rate * 100)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Attempts, escalations and escalation rate per grade."""
+        with self._lock:
+            return {
+                grade: {**counts, "escalation_rate": counts["escalations"] / counts["attempts"]}
+                for grade, counts in self._counts.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+cascade_stats = CascadeStats()
@@ -0,0 +1,380 @@
+"""
+Record/replay cassettes of LLM calls.
+
+    python -m utils.cassette logs/cassettes/<thread_id>.jsonl [--strict]
+
+With CASSETTE_RECORD on, every invoke_llm call of a session is appended to
+the thread's cassette: node, call index within the node, the prompt
+variables and their hash, and the parsed response (or the error) with the
+ledger usage. The entry node also records each turn's candidate message
+(and, on the opening turn, the initial state).
+
+Replay re-runs the turns through the graph with a Replayer in place of the
+models: calls are answered from the cassette by node and call index
+(checked against the request hash), so there is no network, no rate
+limiting and no backoff - the session runs in milliseconds and exercises
+only the orchestration. Calls whose request differs from the recording
+are reported as diverged; calls with no recording fall back to templates.
+"""
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, message_to_dict, messages_from_dict
+from pydantic import BaseModel
+
+from config import settings
+from utils.deadline import DeadlineExceeded
+from utils.circuit_breaker import CircuitOpenError
+from utils.llm_utils import LLMUnavailable, use_cassette
+from utils.log_config import current_context, current_node_stats, get_logger, record_llm_call
+
+logger = get_logger("cassette")
+
+_UNSAFE = re.compile(r"[^\w.-]")
+
+# Threads whose call indexes are kept in memory; idle ones beyond this are re-read from disk
+_MAX_THREADS = 1024
+
+# State fields not carried into a replayed session's initial state
+_TRANSIENT_FIELDS = ("messages", "llm_usage", "turn_started", "turn_deadline")
+
+# Recorded errors raised again on replay; others become ReplayedError
+_ERRORS = {cls.__name__: cls for cls in (LLMUnavailable, DeadlineExceeded, CircuitOpenError)}
+
+
+class CassetteMiss(LLMUnavailable):
+    """The cassette has no response for this call; the node uses its templated output."""
+
+
+class ReplayedError(RuntimeError):
+    """A recorded call failed with an error that is not raised again as is."""
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return {"type": value.type, "content": value.content}
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def request_key(inputs: Mapping[str, Any]) -> Tuple[Any, str]:
+    """JSON form of a call's prompt variables and its hash."""
+    text = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=_plain)
+    return json.loads(text), hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def dump_response(result: Any) -> Dict[str, Any]:
+    """JSON form of a runnable output: a message, a pydantic model (structured output) or plain data."""
+    if isinstance(result, BaseMessage):
+        return {"message": message_to_dict(result)}
+    if isinstance(result, BaseModel):
+        cls = type(result)
+        return {"model": f"{cls.__module__}.{cls.__qualname__}", "data": result.model_dump(mode="json")}
+    return {"value": result}
+
+
+def load_response(data: Mapping[str, Any]) -> Any:
+    """Inverse of dump_response."""
+    if "message" in data:
+        return messages_from_dict([data["message"]])[0]
+    if "model" in data:
+        module, _, name = data["model"].rpartition(".")
+        return getattr(importlib.import_module(module), name).model_validate(data["data"])
+    return data.get("value")
+
+
+class Recorder:
+    """
+    Appends each thread's turns and LLM calls to its cassette as JSONL.
+
+    Args:
+        directory: Where cassettes are written; "" disables recording
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._indexes: "OrderedDict[str, Counter]" = OrderedDict()
+        self._in_flight: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, thread_id: Any) -> str:
+        return os.path.join(self.directory, f"{_UNSAFE.sub('_', str(thread_id))}.jsonl")
+
+    def turn(self, thread_id: Any, turn: int, state: Mapping[str, Any]) -> None:
+        """Record a turn's candidate message; the opening turn also records the initial state."""
+        if not self.enabled or thread_id is None:
+            return
+        messages = state.get("messages") or []
+        entry: Dict[str, Any] = {"type": "turn", "thread_id": str(thread_id), "turn": turn, "ts": time.time()}
+        if messages and isinstance(messages[-1], HumanMessage):
+            entry["message"] = messages[-1].content
+        else:
+            entry["message"] = None
+            entry["setup"] = json.loads(json.dumps(
+                {k: v for k, v in state.items() if k not in _TRANSIENT_FIELDS},
+                ensure_ascii=False, default=_plain))
+        self._write(thread_id, entry)
+
+    def call(self, node: str, inputs: Mapping[str, Any], invoke: Callable[[], Any]) -> Any:
+        """Run `invoke()` and record its outcome under the node's next call index."""
+        context = current_context()
+        thread_id = context.get("thread_id")
+        if not self.enabled or thread_id is None:
+            return invoke()
+        key = str(thread_id)
+        with self._lock:
+            if key not in self._indexes:
+                # A resumed thread (after a restart or eviction) continues after its recorded calls
+                self._indexes[key] = self._recorded_indexes(thread_id)
+            self._indexes.move_to_end(key)
+            index = self._indexes[key][node]
+            self._indexes[key][node] += 1
+            self._in_flight[key] += 1
+            self._evict()
+
+        request, request_hash = request_key(inputs)
+        entry: Dict[str, Any] = {"type": "call", "node": node, "index": index, "turn": context.get("turn"),
+                                 "request_hash": request_hash, "request": request}
+        stats = current_node_stats()
+        seen = len(stats.calls) if stats is not None else 0
+        try:
+            result = invoke()
+        except Exception as exc:
+            entry["error"] = {"type": type(exc).__name__, "message": str(exc)}
+            raise
+        else:
+            entry["response"] = dump_response(result)
+            return result
+        finally:
+            if stats is not None:
+                entry["usage"] = [{field: call[field] for field in ("model", "prompt_tokens", "completion_tokens")}
+                                  for call in stats.calls[seen:] if call.get("node") == node]
+            self._write(thread_id, entry)
+            with self._lock:
+                self._in_flight[key] -= 1
+                if not self._in_flight[key]:
+                    del self._in_flight[key]
+
+    def _recorded_indexes(self, thread_id: Any) -> Counter:
+        """Next call index per node after the calls already in the thread's cassette."""
+        indexes: Counter = Counter()
+        try:
+            calls = load_cassette(self.path(thread_id))["calls"]
+        except OSError:
+            return indexes
+        for call in calls:
+            indexes[call["node"]] = max(indexes[call["node"]], call.get("index", 0) + 1)
+        return indexes
+
+    def _evict(self) -> None:
+        """Forget the least recently used threads beyond _MAX_THREADS that have no call in flight."""
+        idle = [key for key in self._indexes if not self._in_flight[key]]
+        for key in idle[:len(self._indexes) - _MAX_THREADS]:
+            del self._indexes[key]
+
+    def _write(self, thread_id: Any, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=_plain)
+        try:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self.path(thread_id), "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            logger.warning("Cannot write cassette for %s: %s", thread_id, e)
+
+
+class Replayer:
+    """
+    Answers calls from recorded entries, matched by node and call index.
+    An unused entry of the node with the same request hash wins over the
+    indexed one (parallel calls may start in another order); a changed
+    request gets the indexed entry, or the node's first unused one.
+    """
+
+    def __init__(self, calls: List[Mapping[str, Any]]):
+        self._calls: Dict[str, List[Mapping[str, Any]]] = {}
+        for entry in sorted(calls, key=lambda c: c.get("index", 0)):
+            self._calls.setdefault(entry["node"], []).append(entry)
+        self._next: Counter = Counter()
+        self._used: Set[Tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self.matched = self.diverged = self.missing = 0
+
+    def turn(self, thread_id: Any, turn: int, state: Mapping[str, Any]) -> None:
+        """Turns are driven by replay(), nothing to record."""
+
+    def _match(self, node: str, index: int, request_hash: str) -> Optional[Mapping[str, Any]]:
+        entries = self._calls.get(node, [])
+        candidates = [index] if index < len(entries) else []
+        candidates += [i for i in range(len(entries)) if i != index]
+        for i in candidates:
+            if (node, i) not in self._used and entries[i]["request_hash"] == request_hash:
+                self._used.add((node, i))
+                self.matched += 1
+                return entries[i]
+        for i in candidates:
+            if (node, i) not in self._used:
+                self._used.add((node, i))
+                self.diverged += 1
+                logger.warning("[%s] call %d differs from the recorded request", node, index)
+                return entries[i]
+        self.missing += 1
+        return None
+
+    def call(self, node: str, inputs: Mapping[str, Any], invoke: Callable[[], Any]) -> Any:
+        """Return (or raise) the recorded outcome; `invoke` is never called."""
+        _, request_hash = request_key(inputs)
+        with self._lock:
+            index = self._next[node]
+            self._next[node] += 1
+            entry = self._match(node, index, request_hash)
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {node} call {index}")
+        for usage in entry.get("usage", []):
+            record_llm_call(usage["model"], usage["prompt_tokens"], usage["completion_tokens"], node=node)
+        if "error" in entry:
+            error = entry["error"]
+            raise _ERRORS.get(error["type"], ReplayedError)(error["message"])
+        return load_response(entry["response"])
+
+    def summary(self) -> Dict[str, int]:
+        recorded = sum(len(entries) for entries in self._calls.values())
+        return {"recorded": recorded, "matched": self.matched, "diverged": self.diverged,
+                "missing": self.missing, "unused": recorded - len(self._used)}
+
+
+def record_turn(thread_id: Any, turn: int, state: Mapping[str, Any]) -> None:
+    """Record a turn start with the active cassette, if any (called by the graph's entry node)."""
+    from utils import llm_utils
+    if isinstance(llm_utils._cassette, (Recorder, Replayer)):
+        llm_utils._cassette.turn(thread_id, turn, state)
+
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    """Turns and calls of a cassette file; torn lines are skipped."""
+    turns, calls = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            (turns if entry.get("type") == "turn" else calls).append(entry)
+    thread_id = turns[0]["thread_id"] if turns else os.path.splitext(os.path.basename(path))[0]
+    return {"thread_id": thread_id, "turns": turns, "calls": calls}
+
+
+def replay(cassette: Mapping[str, Any], graph: Any = None) -> Dict[str, Any]:
+    """
+    Re-run a recorded session through the graph, answering LLM calls from
+    the cassette. Web search is disabled; logs and checkpoints go to the
+    current directory.
+
+    Args:
+        cassette: Output of load_cassette
+        graph: Compiled graph (defaults to graph.graph)
+
+    Returns:
+        {"thread_id", "turns": [{"turn", "message", "reply", "latency_ms"}], "total_ms", "calls": summary}
+
+    Raises:
+        ValueError: If the cassette does not start at the opening turn
+    """
+    turns = cassette["turns"]
+    if not turns or turns[0].get("setup") is None:
+        raise ValueError(f"Cassette {cassette['thread_id']} does not start at the opening turn")
+    if graph is None:
+        from graph import graph
+
+    replayer = Replayer(cassette["calls"])
+    config = {"configurable": {"thread_id": f"replay-{cassette['thread_id']}-{uuid.uuid4().hex[:8]}"}}
+    results = []
+    previous = use_cassette(replayer)
+    web_search, settings.WEB_SEARCH_ENABLED = settings.WEB_SEARCH_ENABLED, False
+    try:
+        # The feedback node prints the final report
+        with contextlib.redirect_stdout(io.StringIO()):
+            for turn in turns:
+                if turn.get("setup") is not None:
+                    inputs = {**turn["setup"], "messages": []}
+                else:
+                    inputs = {"messages": [HumanMessage(content=turn["message"])]}
+                start = time.perf_counter()
+                state = graph.invoke(inputs, config)
+                messages = state.get("messages") or []
+                results.append({"turn": turn.get("turn"), "message": turn.get("message"),
+                                "reply": messages[-1].content if messages else None,
+                                "latency_ms": round((time.perf_counter() - start) * 1000, 2)})
+    finally:
+        use_cassette(previous)
+        settings.WEB_SEARCH_ENABLED = web_search
+
+    return {"thread_id": cassette["thread_id"], "turns": results,
+            "total_ms": round(sum(r["latency_ms"] for r in results), 2), "calls": replayer.summary()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.cassette",
+                                     description="Replay recorded interviews without calling the models.")
+    parser.add_argument("cassettes", nargs="+", help="Cassette files (logs/cassettes/<thread_id>.jsonl)")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 if any call diverged or was not recorded")
+    args = parser.parse_args(argv)
+
+    from utils.log_config import setup_logging
+    setup_logging("WARNING", use_queue=False)
+    cassettes = [load_cassette(os.path.abspath(path)) for path in args.cassettes]
+
+    # Logs, journals and SQLite checkpoints of replayed sessions stay out of the working tree
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="replay-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for cassette in cassettes:
+                try:
+                    reports.append(replay(cassette))
+                except ValueError as e:
+                    print(e, file=sys.stderr)
+                    return 1
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        for report in reports:
+            calls = report["calls"]
+            print(f"{report['thread_id']}: {len(report['turns'])} turns in {report['total_ms']} ms; "
+                  f"calls {calls['matched']} matched, {calls['diverged']} diverged, "
+                  f"{calls['missing']} missing, {calls['unused']} unused")
+            for turn in report["turns"]:
+                print(f"  turn {turn['turn']}: {turn['latency_ms']:>8.1f} ms  {(turn['reply'] or '')[:80]}")
+    return 1 if args.strict and any(r["calls"]["diverged"] or r["calls"]["missing"] for r in reports) else 0
+
+
+recorder = Recorder(settings.CASSETTE_DIR if settings.CASSETTE_RECORD else "")
+if recorder.enabled:
+    use_cassette(recorder)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
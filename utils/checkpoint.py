@@ -0,0 +1,805 @@
+"""
+LangGraph checkpointers: in-memory and persistent SQLite.
+Both delta-encode list channels (messages, interview_log, ...), so every
+checkpoint stores only the items appended since the previous version, with
+a full snapshot every CHECKPOINT_SNAPSHOT_EVERY versions.
+The SQLite saver runs in WAL mode so several worker processes can serve the
+same thread_id, writes each checkpoint in one batched transaction, keeps
+only the latest N checkpoints per thread and periodically compacts the file.
+The in-memory saver hibernates idle threads to disk so a long-running
+Streamlit server does not grow without bound.
+"""
+import collections
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("checkpoint")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    base_version TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+DELTA_PREFIX = "delta/"
+
+# Slotted state records (state.py) that checkpoints carry; everything else must be a built-in safe type
+STATE_TYPES = (("state", "ObserverThought"), ("state", "TurnRecord"))
+
+
+def state_serde() -> JsonPlusSerializer:
+    """Serializer that deserializes the state records without langgraph's unregistered-type fallback."""
+    return JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES)
+
+ChannelKey = Tuple[str, str, str]  # (thread_id, checkpoint_ns, channel)
+
+
+def _ordinal(version: Any) -> int:
+    return int(str(version).split(".")[0])
+
+
+def _extends(previous: list, value: list) -> bool:
+    """True if `value` starts with all items of `previous` (identity first, then equality)."""
+    if len(value) < len(previous):
+        return False
+    return all(a is b or a == b for a, b in zip(previous, value))
+
+
+class DeltaCodec:
+    """
+    Encodes list channel values as deltas against the channel's previous version.
+
+    A delta blob is `[base_version, prefix_len, chain_length, suffix]` stored
+    under the type "delta/<serde type>". Decoding is lazy: a value is rebuilt
+    on read from the newest cached version or by walking back to the nearest
+    full snapshot. The cache is an LRU of the latest value per channel.
+    """
+
+    def __init__(self, serde: SerializerProtocol, snapshot_every: int, max_cached: int = 1024):
+        self.serde = serde
+        self.snapshot_every = snapshot_every
+        self.max_cached = max_cached
+        self._latest: "collections.OrderedDict[ChannelKey, Tuple[str, list, int]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, key: ChannelKey, version: Any, value: Any,
+               base_exists: Optional[Callable[[str], bool]] = None) -> Tuple[str, bytes, Optional[str]]:
+        """
+        Serialize a channel value.
+
+        Args:
+            key: (thread_id, checkpoint_ns, channel)
+            version: New channel version
+            value: Channel value
+            base_exists: Optional check that the cached base is still stored
+
+        Returns:
+            (type, data, base_version); base_version is None for full snapshots
+        """
+        version = str(version)
+        if not isinstance(value, list):
+            type_, data = self.serde.dumps_typed(value)
+            return type_, data, None
+
+        with self._lock:
+            latest = self._latest.get(key)
+        if (latest is not None and self.snapshot_every and latest[2] < self.snapshot_every
+                and _ordinal(version) > _ordinal(latest[0]) and _extends(latest[1], value)
+                and (base_exists is None or base_exists(latest[0]))):
+            base, previous, chain = latest
+            inner_type, data = self.serde.dumps_typed([base, len(previous), chain + 1, value[len(previous):]])
+            self._remember(key, version, value, chain + 1)
+            return DELTA_PREFIX + inner_type, data, base
+
+        self._remember(key, version, value, 0)
+        type_, data = self.serde.dumps_typed(value)
+        return type_, data, None
+
+    def decode(self, key: ChannelKey, version: Any, typed: Tuple[str, bytes],
+               fetch: Callable[[str], Tuple[str, bytes]]) -> Any:
+        """Deserialize a blob, rebuilding deltas via `fetch(base_version) -> (type, data)`."""
+        version = str(version)
+        type_, data = typed
+        if not type_.startswith(DELTA_PREFIX):
+            value = self.serde.loads_typed(typed)
+            if isinstance(value, list):
+                self._remember(key, version, value, 0)
+            return value
+
+        with self._lock:
+            latest = self._latest.get(key)
+        if latest is not None and latest[0] == version:
+            return list(latest[1])
+
+        base, prefix_len, chain, suffix = self.serde.loads_typed((type_[len(DELTA_PREFIX):], data))
+        if latest is not None and latest[0] == base:
+            base_value = latest[1]
+        else:
+            base_value = self.decode(key, base, fetch(base), fetch)
+        value = base_value[:prefix_len] + list(suffix)
+        self._remember(key, version, value, chain)
+        return value
+
+    def _remember(self, key: ChannelKey, version: str, value: list, chain: int) -> None:
+        with self._lock:
+            latest = self._latest.get(key)
+            # Reading history must not replace a newer cached version
+            if latest is not None and _ordinal(latest[0]) > _ordinal(version):
+                return
+            self._latest[key] = (version, list(value), chain)
+            self._latest.move_to_end(key)
+            while len(self._latest) > self.max_cached:
+                self._latest.popitem(last=False)
+
+    def forget(self, thread_id: str) -> None:
+        """Drop cached values of a thread."""
+        with self._lock:
+            for key in [k for k in self._latest if k[0] == thread_id]:
+                del self._latest[key]
+
+
+class DeltaMemorySaver(MemorySaver):
+    """MemorySaver that stores list channels as deltas (see DeltaCodec)."""
+
+    def __init__(self, snapshot_every: int = 50, **kwargs):
+        kwargs.setdefault("serde", state_serde())
+        super().__init__(**kwargs)
+        self.codec = DeltaCodec(self.serde, snapshot_every)
+
+    # The parent implementation reads raw blobs; the generic one goes through get_tuple
+    get_delta_channel_history = BaseCheckpointSaver.get_delta_channel_history
+
+    def with_allowlist(self, extra_allowlist):
+        """Clone with the graph's serde allowlist; the codec must use the clone's serializer."""
+        return _with_codec(self, super().with_allowlist(extra_allowlist))
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            typed = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+            if typed is None or typed[0] == "empty":
+                continue
+            result[channel] = self.codec.decode(
+                (thread_id, checkpoint_ns, channel), version, typed,
+                lambda base, channel=channel: self.blobs[(thread_id, checkpoint_ns, channel, base)]
+            )
+        return result
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        """Same as MemorySaver.put, with list channels delta-encoded."""
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        for channel, version in new_versions.items():
+            if channel in values:
+                type_, data, _ = self.codec.encode((thread_id, checkpoint_ns, channel), version, values[channel])
+                self.blobs[(thread_id, checkpoint_ns, channel, version)] = (type_, data)
+            else:
+                self.blobs[(thread_id, checkpoint_ns, channel, version)] = ("empty", b"")
+        self.storage[thread_id][checkpoint_ns][checkpoint["id"]] = (
+            self.serde.dumps_typed(c),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            config["configurable"].get("checkpoint_id"),  # parent
+        )
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self.codec.forget(thread_id)
+
+
+class HibernatingMemorySaver(DeltaMemorySaver):
+    """
+    DeltaMemorySaver that moves cold threads to disk.
+
+    Threads idle longer than `idle_ttl` seconds, or the least recently used
+    ones once the stored checkpoint bytes exceed `high_water_bytes`, are
+    written to `directory` as one zlib-compressed file and dropped from
+    memory. Any later get/put for that thread_id loads it back first.
+    `list(None)` only covers threads currently in memory.
+    """
+
+    def __init__(self, directory: str, idle_ttl: float = 1800, high_water_bytes: int = 512 * 2 ** 20,
+                 sweep_interval: float = 60, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.idle_ttl = idle_ttl
+        self.high_water_bytes = high_water_bytes
+        self.sweep_interval = sweep_interval
+        self._sizes: Dict[str, int] = collections.defaultdict(int)
+        self._last_access: "collections.OrderedDict[str, float]" = collections.OrderedDict()
+        self._last_sweep = time.monotonic()
+        self._lock = threading.RLock()
+
+    # === Access hooks ===
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._activate(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config:
+                self._activate(config["configurable"]["thread_id"])
+            items = list(super().list(config, **kwargs))
+        yield from items
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._activate(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            self._sizes[thread_id] += len(saved[0][1]) + len(saved[1][1]) + sum(
+                len(self.blobs[(thread_id, checkpoint_ns, channel, version)][1])
+                for channel, version in new_versions.items()
+            )
+            self._maybe_sweep(thread_id)
+            return result
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._activate(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            self._sizes[thread_id] += sum(len(self.serde.dumps_typed(value)[1]) for _, value in writes)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._forget(thread_id)
+            if os.path.exists(self._path(thread_id)):
+                os.remove(self._path(thread_id))
+
+    # === Eviction ===
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Hibernate idle threads, then LRU threads while over the high-water mark.
+
+        Args:
+            keep: Thread that must stay in memory (the one being served)
+
+        Returns:
+            Number of threads hibernated
+        """
+        with self._lock:
+            now = time.monotonic()
+            evicted = 0
+            for thread_id, last_access in list(self._last_access.items()):
+                if thread_id != keep and self.idle_ttl and now - last_access > self.idle_ttl:
+                    self.hibernate(thread_id)
+                    evicted += 1
+            # Go below the mark (to 80%) so the next put does not trigger another eviction
+            for thread_id in list(self._last_access):
+                if not self.high_water_bytes or sum(self._sizes.values()) <= self.high_water_bytes * 0.8:
+                    break
+                if thread_id != keep:
+                    self.hibernate(thread_id)
+                    evicted += 1
+            if evicted:
+                logger.info("Hibernated %d idle sessions, %d remain in memory", evicted, len(self._last_access))
+            return evicted
+
+    def hibernate(self, thread_id: str) -> None:
+        """Write a thread to disk and drop it from memory."""
+        with self._lock:
+            namespaces = self.storage.pop(thread_id, {})
+            payload = {
+                "storage": [[ns, checkpoint_id, *checkpoint, *metadata, parent]
+                            for ns, checkpoints in namespaces.items()
+                            for checkpoint_id, (checkpoint, metadata, parent) in checkpoints.items()],
+                "writes": [[ns, checkpoint_id, task_id, idx, channel, *value, task_path]
+                           for (tid, ns, checkpoint_id), writes in list(self.writes.items()) if tid == thread_id
+                           for (task_id, idx), (_, channel, value, task_path) in writes.items()],
+                "blobs": [[ns, channel, version, *value]
+                          for (tid, ns, channel, version), value in list(self.blobs.items()) if tid == thread_id]
+            }
+            type_, data = self.serde.dumps_typed(payload)
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(thread_id)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(type_.encode() + b"\n" + zlib.compress(data))
+            os.replace(tmp_path, path)
+
+            super().delete_thread(thread_id)
+            self._forget(thread_id)
+            logger.debug("Hibernated thread %s (%d bytes on disk)", thread_id, os.path.getsize(path))
+
+    def _activate(self, thread_id: str) -> None:
+        """Mark a thread as used, loading it from disk if it was hibernated."""
+        if thread_id not in self._last_access and os.path.exists(self._path(thread_id)):
+            self._rehydrate(thread_id)
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _rehydrate(self, thread_id: str) -> None:
+        path = self._path(thread_id)
+        with open(path, "rb") as f:
+            type_, _, data = f.read().partition(b"\n")
+        payload = self.serde.loads_typed((type_.decode(), zlib.decompress(data)))
+
+        size = 0
+        for ns, checkpoint_id, c_type, c_data, m_type, m_data, parent in payload["storage"]:
+            self.storage[thread_id][ns][checkpoint_id] = ((c_type, c_data), (m_type, m_data), parent)
+            size += len(c_data) + len(m_data)
+        for ns, checkpoint_id, task_id, idx, channel, w_type, w_data, task_path in payload["writes"]:
+            self.writes[(thread_id, ns, checkpoint_id)][(task_id, idx)] = (
+                task_id, channel, (w_type, w_data), task_path
+            )
+            size += len(w_data)
+        for ns, channel, version, b_type, b_data in payload["blobs"]:
+            self.blobs[(thread_id, ns, channel, version)] = (b_type, b_data)
+            size += len(b_data)
+
+        self._sizes[thread_id] = size
+        os.remove(path)
+        logger.debug("Rehydrated thread %s", thread_id)
+
+    def _maybe_sweep(self, current: str) -> None:
+        now = time.monotonic()
+        over_limit = self.high_water_bytes and sum(self._sizes.values()) > self.high_water_bytes
+        if over_limit or now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.evict(keep=current)
+
+    def _forget(self, thread_id: str) -> None:
+        self._sizes.pop(thread_id, None)
+        self._last_access.pop(thread_id, None)
+
+    def _path(self, thread_id: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(thread_id.encode()).hexdigest() + ".ckpt")
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver backed by a SQLite database in WAL mode.
+
+    Storage mirrors MemorySaver: checkpoints without channel values, one
+    blob row per (channel, version) and pending writes per task. A channel
+    blob is only written when its version changes and list channels are
+    delta-encoded, so a checkpoint costs one small row plus what changed.
+    """
+
+    def __init__(self, path: str, keep_last: int = 10, compact_every: int = 200,
+                 snapshot_every: int = 50, busy_timeout_ms: int = 5000, **kwargs):
+        kwargs.setdefault("serde", state_serde())
+        super().__init__(**kwargs)
+        self.codec = DeltaCodec(self.serde, snapshot_every)
+        self.path = path
+        self.keep_last = keep_last
+        self.compact_every = compact_every
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection per process; graph nodes run on threads, so calls are serialized by _lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                    timeout=busy_timeout_ms / 1000)
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Only takes effect on a new file
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Durable at WAL checkpoints, safe with WAL
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(blobs)")}
+        if "base_version" not in columns:  # Databases created before delta encoding
+            self.conn.execute("ALTER TABLE blobs ADD COLUMN base_version TEXT")
+
+    def _transaction(self):
+        return _Transaction(self.conn, self._lock)
+
+    def with_allowlist(self, extra_allowlist):
+        """Clone with the graph's serde allowlist; the codec must use the clone's serializer."""
+        return _with_codec(self, super().with_allowlist(extra_allowlist))
+
+    # === Reads ===
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Fetch the checkpoint named in `config`, or the thread's latest one."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self._lock:
+            if checkpoint_id:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._load_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints newest first, filtered like MemorySaver.list."""
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints")
+        clauses: List[str] = []
+        params: List[Any] = []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed((row[4], row[5]))
+            if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                item = self._load_tuple(thread_id, checkpoint_ns, row, metadata)
+            yield item
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any],
+                    metadata: Optional[CheckpointMetadata] = None) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, data, metadata_type, metadata_data = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, data))
+        writes = self.conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        writes.sort(key=lambda w: writes_sort_key(w[5], w[0], w[1]))
+
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"])
+            },
+            metadata=metadata if metadata is not None else self.serde.loads_typed((metadata_type, metadata_data)),
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v)))
+                            for task_id, _, channel, t, v, _ in writes]
+        )
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        if not versions:
+            return {}
+        keys = [(channel, str(version)) for channel, version in versions.items()]
+        rows = self.conn.execute(
+            "SELECT channel, version, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND "
+            f"(channel, version) IN (VALUES {', '.join(['(?, ?)'] * len(keys))})",
+            (thread_id, checkpoint_ns, *[part for key in keys for part in key])
+        ).fetchall()
+        return {
+            channel: self.codec.decode(
+                (thread_id, checkpoint_ns, channel), version, (type_, blob),
+                lambda base, channel=channel: self._fetch_blob(thread_id, checkpoint_ns, channel, base)
+            )
+            for channel, version, type_, blob in rows if type_ != "empty"
+        }
+
+    def _fetch_blob(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> Tuple[str, bytes]:
+        return self.conn.execute(
+            "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            (thread_id, checkpoint_ns, channel, version)
+        ).fetchone()
+
+    # === Writes ===
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        """Store a checkpoint and the channel blobs whose versions changed, in one transaction."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+
+        type_, data = self.serde.dumps_typed(c)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._transaction() as conn:
+            # Encode inside the write transaction so no other worker can prune a delta base meanwhile
+            blob_rows = [
+                (thread_id, checkpoint_ns, channel, str(version),
+                 *(self.codec.encode((thread_id, checkpoint_ns, channel), version, values[channel],
+                                     lambda base, channel=channel: _blob_exists(conn, thread_id, checkpoint_ns,
+                                                                                channel, base))
+                   if channel in values else ("empty", None, None)))
+                for channel, version in new_versions.items()
+            ]
+            conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)", blob_rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, data, metadata_type, metadata_data)
+            )
+            self._prune(conn, thread_id, checkpoint_ns)
+
+        self._puts += 1
+        if self.compact_every and self._puts % self.compact_every == 0:
+            self.compact()
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        """Store a task's pending writes in one batched statement."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Like MemorySaver: regular writes are never overwritten, special channels (errors, interrupts) are
+        verb = "INSERT OR REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+             channel, *self.serde.dumps_typed(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._transaction() as conn:
+            conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints, blobs and writes of a thread."""
+        with self._transaction() as conn:
+            for table in ("checkpoints", "blobs", "writes"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+        self.codec.forget(thread_id)
+
+    # === Retention ===
+
+    def _prune(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop checkpoints beyond the latest `keep_last` and blobs no kept checkpoint needs."""
+        if not self.keep_last:
+            return
+        stale = [row[0] for row in conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last)
+        )]
+        if not stale:
+            return
+
+        placeholders = ", ".join("?" * len(stale))
+        for table in ("checkpoints", "writes"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND checkpoint_id IN ({placeholders})",
+                (thread_id, checkpoint_ns, *stale)
+            )
+
+        referenced = set()
+        for type_, data in conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns)
+        ):
+            versions = self.serde.loads_typed((type_, data))["channel_versions"]
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+
+        # Delta blobs keep their chain back to the last full snapshot alive
+        bases = {(channel, version): base for channel, version, base in conn.execute(
+            "SELECT channel, version, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns)
+        )}
+        pending = list(referenced)
+        while pending:
+            channel, version = pending.pop()
+            base = bases.get((channel, version))
+            if base is not None and (channel, base) not in referenced:
+                referenced.add((channel, base))
+                pending.append((channel, base))
+
+        orphaned = [(thread_id, checkpoint_ns, channel, version)
+                    for channel, version in bases if (channel, version) not in referenced]
+        conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            orphaned
+        )
+
+    def compact(self) -> None:
+        """Return freed pages to the OS and fold the WAL back into the main file."""
+        with self._lock:
+            # execute() steps the pragma once, freeing a single page; a script runs it to completion
+            self.conn.executescript("PRAGMA incremental_vacuum;")
+            busy, _, _ = self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            logger.debug("WAL checkpoint deferred: database busy in another process")
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Zero-padded, sortable versions (same format as MemorySaver)."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # Graph invocations are synchronous in this app; async variants delegate
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT under the saver lock; rolls back on error."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            # Take the write lock up front so concurrent workers wait on busy_timeout, not deadlock
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+def _with_codec(saver: BaseCheckpointSaver, clone: BaseCheckpointSaver) -> BaseCheckpointSaver:
+    if clone is not saver:
+        clone.codec = DeltaCodec(clone.serde, saver.codec.snapshot_every, saver.codec.max_cached)
+    return clone
+
+
+def _blob_exists(conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+        (thread_id, checkpoint_ns, channel, version)
+    ).fetchone() is not None
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                             "checkpoint_id": checkpoint_id}}
+
+
+def stored_bytes(saver: BaseCheckpointSaver) -> int:
+    """Serialized checkpoint bytes a saver holds in memory (database and WAL size for SQLite)."""
+    if isinstance(saver, SQLiteCheckpointSaver):
+        return sum(os.path.getsize(p) for p in (saver.path, saver.path + "-wal") if os.path.exists(p))
+    if isinstance(saver, HibernatingMemorySaver):
+        return sum(saver._sizes.values())
+    if isinstance(saver, MemorySaver):
+        total = sum(len(typed[1]) for typed in list(saver.blobs.values()))
+        for namespaces in list(saver.storage.values()):
+            for checkpoints in list(namespaces.values()):
+                total += sum(len(c[0][1]) + len(c[1][1]) for c in list(checkpoints.values()))
+        return total
+    return 0
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """Build the checkpointer selected by CHECKPOINT_BACKEND ("memory" or "sqlite")."""
+    backend = settings.CHECKPOINT_BACKEND.lower()
+    if backend == "sqlite":
+        logger.info("Using SQLite checkpointer at %s", settings.CHECKPOINT_DB_PATH)
+        return SQLiteCheckpointSaver(
+            settings.CHECKPOINT_DB_PATH,
+            keep_last=settings.CHECKPOINT_KEEP_LAST,
+            compact_every=settings.CHECKPOINT_COMPACT_EVERY,
+            snapshot_every=settings.CHECKPOINT_SNAPSHOT_EVERY
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND: {settings.CHECKPOINT_BACKEND}")
+    if settings.SESSION_IDLE_TTL_SECONDS or settings.SESSION_MEMORY_HIGH_WATER_MB:
+        return HibernatingMemorySaver(
+            settings.SESSION_HIBERNATE_DIR,
+            idle_ttl=settings.SESSION_IDLE_TTL_SECONDS,
+            high_water_bytes=int(settings.SESSION_MEMORY_HIGH_WATER_MB * 2 ** 20),
+            snapshot_every=settings.CHECKPOINT_SNAPSHOT_EVERY
+        )
+    return DeltaMemorySaver(snapshot_every=settings.CHECKPOINT_SNAPSHOT_EVERY)
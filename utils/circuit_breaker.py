@@ -0,0 +1,109 @@
+"""
+Per-model circuit breakers for LLM calls.
+A breaker opens when the error or slow-call rate over a sliding window
+crosses the threshold; while open, calls to that model fail immediately
+so invoke_llm can move on to the next model in the node's fallback chain.
+"""
+import collections
+import threading
+import time
+from typing import Deque, Dict, Tuple
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a model whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> Open on high failure rate -> Half-open single probe -> Closed."""
+
+    def __init__(self, name: str, failure_rate: float, min_calls: int, window_seconds: float,
+                 slow_call_seconds: float, open_seconds: float):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._events: Deque[Tuple[float, bool]] = collections.deque()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may be sent now. Half-open admits a single probe."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot that was never used."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, success: bool, latency: float = 0.0) -> None:
+        """Record a call outcome; slow successes count as failures."""
+        failed = not success or latency >= self.slow_call_seconds
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    logger.info("Circuit for %s closed", self.name)
+                    self.state = CLOSED
+                    self._events.clear()
+                return
+
+            self._events.append((now, failed))
+            while self._events and now - self._events[0][0] > self.window_seconds:
+                self._events.popleft()
+
+            if self.state == CLOSED and len(self._events) >= self.min_calls:
+                failures = sum(1 for _, f in self._events if f)
+                if failures / len(self._events) >= self.failure_rate:
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        logger.warning("Circuit for %s opened for %.0fs", self.name, self.open_seconds)
+        self.state = OPEN
+        self.opened_at = now
+        self._events.clear()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Get the shared breaker for a model, configured from settings."""
+    with _registry_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(
+                model,
+                failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                window_seconds=settings.CIRCUIT_WINDOW_SECONDS,
+                slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS
+            )
+        return _breakers[model]
@@ -0,0 +1,137 @@
+"""
+Token and cost ledger.
+Every LLM call records its node, model and reported token usage (see
+log_config.record_llm_call); graph nodes append the calls to
+state["llm_usage"] and the feedback node saves them with the interview
+log under "llm_usage", priced with settings.LLM_PRICES.
+
+Usage:
+    python -m utils.cost [paths ...] [--json]
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from config import settings
+from utils.archive import default_sources, expand_paths
+from utils.log_config import get_logger
+
+logger = get_logger("cost")
+
+_EMPTY = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "unpriced_calls": 0}
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int,
+              prices: Optional[Mapping[str, List[float]]] = None) -> Optional[float]:
+    """
+    Price of one call in USD.
+
+    Args:
+        model: Model name; looked up as is, then without its provider prefix ("openai/")
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+        prices: {model: [prompt, completion] USD per 1M tokens} (defaults to settings.LLM_PRICES)
+
+    Returns:
+        Cost in USD, or None if the model has no price
+    """
+    prices = settings.LLM_PRICES if prices is None else prices
+    price = prices.get(model) or prices.get(model.rsplit("/", 1)[-1])
+    if not price:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _add(bucket: Dict[str, Any], call: Mapping[str, Any], prices: Optional[Mapping[str, List[float]]]) -> None:
+    prompt, completion = call.get("prompt_tokens", 0), call.get("completion_tokens", 0)
+    cost = call_cost(call.get("model") or "", prompt, completion, prices)
+    bucket["calls"] += 1
+    bucket["prompt_tokens"] += prompt
+    bucket["completion_tokens"] += completion
+    if cost is None:
+        bucket["unpriced_calls"] += 1
+    else:
+        bucket["cost_usd"] = round(bucket["cost_usd"] + cost, 6)
+
+
+def summarize(calls: Iterable[Mapping[str, Any]],
+              prices: Optional[Mapping[str, List[float]]] = None) -> Dict[str, Any]:
+    """Totals of a list of ledger calls, overall and by node and model."""
+    total, by_node, by_model = dict(_EMPTY), {}, {}
+    for call in calls:
+        _add(total, call, prices)
+        _add(by_node.setdefault(call.get("node") or "unknown", dict(_EMPTY)), call, prices)
+        _add(by_model.setdefault(call.get("model") or "unknown", dict(_EMPTY)), call, prices)
+    return {**total, "by_node": by_node, "by_model": by_model}
+
+
+def session_ledger(calls: List[Mapping[str, Any]], candidate_info: Mapping[str, Any]) -> Dict[str, Any]:
+    """The "llm_usage" block saved with an interview log."""
+    return {
+        "grade": candidate_info.get("Grade"),
+        "position": candidate_info.get("Position"),
+        "summary": summarize(calls),
+        "calls": [dict(call) for call in calls],
+    }
+
+
+def aggregate(paths: Iterable[str], prices: Optional[Mapping[str, List[float]]] = None) -> Dict[str, Any]:
+    """
+    Cost across saved logs, re-priced with the current price table.
+
+    Returns:
+        {"sessions", "total", "by_node", "by_grade"}; by_grade also has the mean cost per session
+    """
+    sessions, total, by_node, by_grade = 0, dict(_EMPTY), {}, {}
+    for path in expand_paths(paths):
+        try:
+            with open(path, encoding="utf-8") as f:
+                ledger = json.load(f).get("llm_usage")
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Skipping %s: %s", path, e)
+            continue
+        if not isinstance(ledger, dict):
+            continue  # Saved before the ledger existed
+        sessions += 1
+        grade = by_grade.setdefault(ledger.get("grade") or "unknown", {**_EMPTY, "sessions": 0})
+        grade["sessions"] += 1
+        for call in ledger.get("calls", []):
+            _add(total, call, prices)
+            _add(grade, call, prices)
+            _add(by_node.setdefault(call.get("node") or "unknown", dict(_EMPTY)), call, prices)
+    for grade in by_grade.values():
+        grade["cost_per_session_usd"] = round(grade["cost_usd"] / grade["sessions"], 6)
+    return {"sessions": sessions, "total": total, "by_node": by_node, "by_grade": by_grade}
+
+
+def _table(title: str, rows: Mapping[str, Mapping[str, Any]]) -> str:
+    lines = [f"{title:<14} {'calls':>7} {'prompt':>10} {'completion':>11} {'cost, $':>10}"]
+    for name, row in sorted(rows.items(), key=lambda item: -item[1]["cost_usd"]):
+        lines.append(f"{name:<14} {row['calls']:>7} {row['prompt_tokens']:>10} "
+                     f"{row['completion_tokens']:>11} {row['cost_usd']:>10.4f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.cost", description="LLM cost by node and by grade.")
+    parser.add_argument("paths", nargs="*", help="Files, directories or globs (default: legacy logs + log store)")
+    parser.add_argument("--json", action="store_true", help="Print the aggregate as JSON")
+    args = parser.parse_args(argv)
+
+    result = aggregate(args.paths or default_sources())
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0
+    total = result["total"]
+    print(f"{result['sessions']} sessions, {total['calls']} calls, ${total['cost_usd']:.4f}"
+          + (f" ({total['unpriced_calls']} calls without a price)" if total["unpriced_calls"] else ""))
+    print()
+    print(_table("node", result["by_node"]))
+    print()
+    print(_table("grade", result["by_grade"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
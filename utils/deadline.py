@@ -0,0 +1,98 @@
+"""
+Turn-level deadline utilities for Interview Coach.
+Every graph invocation (one candidate turn) carries a wall-clock deadline in
+the state; nodes consult the remaining budget to degrade gracefully.
+"""
+import concurrent.futures
+import contextvars
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("deadline")
+
+# Shared pool for deadline-bounded calls. A call that overruns is abandoned:
+# its thread finishes in the background, bounded by LLM_REQUEST_TIMEOUT.
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-call")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the turn budget runs out before an operation completes."""
+
+
+def open_turn(budget: Optional[float] = None) -> Dict[str, float]:
+    """
+    Open a new turn: its start time and deadline, as state fields.
+
+    Args:
+        budget: Seconds available for the turn (defaults to TURN_DEADLINE_SECONDS)
+
+    Returns:
+        {"turn_started", "turn_deadline"} as UNIX timestamps
+    """
+    if budget is None:
+        budget = settings.TURN_DEADLINE_SECONDS
+    now = time.time()
+    return {"turn_started": now, "turn_deadline": now + budget}
+
+
+def remaining(state: Optional[Mapping[str, Any]]) -> float:
+    """Seconds left in the current turn, or infinity if no deadline is set."""
+    deadline = state.get("turn_deadline") if state else None
+    if not deadline:
+        return float("inf")
+    return deadline - time.time()
+
+
+def elapsed(state: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Seconds since the turn started, or None if the turn start is not recorded."""
+    started = state.get("turn_started") if state else None
+    if not started:
+        return None
+    return time.time() - started
+
+
+def has_budget(state: Optional[Mapping[str, Any]], seconds: float) -> bool:
+    """True if at least `seconds` remain in the current turn."""
+    return remaining(state) >= seconds
+
+
+def pick_model(state: Mapping[str, Any], model: Any, fast_model: Any = None) -> Any:
+    """
+    Choose the model tier affordable with the remaining turn budget.
+
+    Returns:
+        `model` when there is plenty of time, `fast_model` when time is short,
+        or None when no LLM call fits and the caller should use a template.
+    """
+    budget = remaining(state)
+    if budget < settings.DEADLINE_LLM_SECONDS:
+        return None
+    if fast_model is not None and budget < settings.DEADLINE_FULL_MODEL_SECONDS:
+        logger.info("%.1fs left in turn, using the cheaper model", budget)
+        return fast_model
+    return model
+
+
+def run_within(fn: Callable[..., Any], state: Optional[Mapping[str, Any]], *args, **kwargs) -> Any:
+    """
+    Run `fn(*args, **kwargs)` but give up once the turn deadline passes.
+
+    Raises:
+        DeadlineExceeded: If the budget is exhausted before `fn` returns
+    """
+    budget = remaining(state)
+    if budget == float("inf"):
+        return fn(*args, **kwargs)
+    if budget <= 0:
+        raise DeadlineExceeded("Turn deadline already passed")
+
+    ctx = contextvars.copy_context()
+    future = _executor.submit(ctx.run, fn, *args, **kwargs)
+    try:
+        return future.result(timeout=budget)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"Call did not finish within {budget:.1f}s") from None
@@ -0,0 +1,121 @@
+"""
+Hedged requests for small, latency-critical LLM calls.
+If a call has not returned by the observed latency quantile (p90 by default),
+a duplicate is fired and whichever finishes first wins. A hedge budget caps
+the extra spend at a fraction of all calls.
+"""
+import collections
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("hedging")
+
+# Separate pool so hedges never wait behind the deadline pool that runs the attempt
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        """Latency at quantile `q`, or None until `min_samples` are collected."""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgeBudget:
+    """Each call earns `ratio` hedge credits; each hedge spends one."""
+
+    def __init__(self, ratio: float, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = 1.0
+        self._lock = threading.Lock()
+
+    def on_call(self) -> None:
+        with self._lock:
+            self.credits = min(self.burst, self.credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.credits >= 1.0:
+                self.credits -= 1.0
+                return True
+            return False
+
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = collections.defaultdict(LatencyTracker)
+_budgets: Dict[str, HedgeBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def hedging_enabled(node: str) -> bool:
+    """Hedging is opt-in per node via HEDGE_NODES."""
+    return node in settings.HEDGE_NODES
+
+
+def observe(model: str, node: str, latency: float) -> None:
+    """Record a successful call latency for (model, node)."""
+    _trackers[(model, node)].observe(latency)
+
+
+def _budget(model: str) -> HedgeBudget:
+    with _registry_lock:
+        if model not in _budgets:
+            _budgets[model] = HedgeBudget(settings.HEDGE_BUDGET_RATIO)
+        return _budgets[model]
+
+
+def run_hedged(fn: Callable[..., Any], model: str, node: str, *args) -> Any:
+    """
+    Run `fn(*args)`, firing one duplicate if it is slower than the hedge delay.
+
+    Returns:
+        The first successful result
+
+    Raises:
+        The primary call's error if no call succeeds
+    """
+    budget = _budget(model)
+    budget.on_call()
+    delay = _trackers[(model, node)].quantile(settings.HEDGE_QUANTILE, settings.HEDGE_MIN_SAMPLES)
+
+    primary = _executor.submit(contextvars.copy_context().run, fn, *args)
+    if delay is None:
+        return primary.result()
+
+    try:
+        return primary.result(timeout=delay)
+    except concurrent.futures.TimeoutError:
+        pass
+
+    if not budget.try_spend():
+        return primary.result()
+
+    logger.info("[%s] no response after %.2fs, sending hedge request", node, delay)
+    hedge = _executor.submit(contextvars.copy_context().run, fn, *args)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    logger.info("[%s] hedge request won", node)
+                return future.result()
+    return primary.result()
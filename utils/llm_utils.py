@@ -1,29 +1,422 @@
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+"""
+LLM call utilities for Interview Coach.
+Provides the shared ChatOpenAI factory and the call-level retry engine:
+errors are classified, Retry-After is honored, backoff uses decorrelated
+jitter, every attempt passes the model's shared rate limiter (optionally
+hedged) and is bounded by the turn deadline. Candidates, attempts,
+limiter waits, backoff sleeps and chain steps are tracing spans.
+Calls can be recorded and replayed through a cassette (use_cassette).
+"""
 import json
-from langchain_core.exceptions import OutputParserException
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
 import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from pydantic import ValidationError
+
+from config import settings
+from utils.deadline import DeadlineExceeded, remaining, run_within
+from utils.rate_limit import estimate_tokens, get_limiter
+from utils.scheduler import priority_for
+from utils.hedging import hedging_enabled, observe, run_hedged
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+from utils.log_config import get_logger, log_context, record_llm_call, record_retry
+from utils.tracing import Span, span, tracer
+from utils.metrics import LLM_CALLS, LLM_QUEUE_WAIT, LLM_RATE_LIMITED, LLM_RETRIES, LLM_TOKENS
+
+logger = get_logger("llm")
+
+# Error classes
+TRANSIENT = "transient"    # Network blips, timeouts, 5xx: retry with backoff
+RATE_LIMIT = "rate_limit"  # 429: wait for Retry-After (or backoff)
+PARSE = "parse"            # Malformed structured output: retry immediately, once
+FATAL = "fatal"            # Bad request, auth, context length, deadline: never retry
+UNAVAILABLE = "unavailable"  # Circuit open: skip straight to the next fallback model
+
+# Errors after which the next model in the node's fallback chain is tried
+_FAILOVER = {TRANSIENT, RATE_LIMIT, UNAVAILABLE}
+
+# Terminal fallback chain entry: the node falls back to its templated output
+TEMPLATE = "template"
+
+_RETRYABLE_STATUS = {408, 409, 425, 500, 502, 503, 504}
+
+_models: Dict[Tuple[str, float], ChatOpenAI] = {}
+
+# Replaces every model at call time (benchmarks, replay); see override_models
+_model_override: Optional[Callable[[str, float], Any]] = None
+
+# Records or replays every logical call (utils.cassette); see use_cassette
+_cassette: Optional[Any] = None
+
+
+class LLMUnavailable(RuntimeError):
+    """Every model in the node's fallback chain failed; use the templated output."""
+
+
+def get_chat_model(model: str, temperature: float = 0) -> ChatOpenAI:
+    """
+    Get a shared ChatOpenAI client for the given model and temperature.
+    SDK-level retries are disabled: retrying is done by invoke_llm.
+
+    Args:
+        model: Model name (e.g. settings.MODEL_ROUTER)
+        temperature: Sampling temperature
+
+    Returns:
+        Cached ChatOpenAI instance
+    """
+    key = (model, temperature)
+    if key not in _models:
+        _models[key] = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            base_url=settings.OPENAI_API_BASE,
+            api_key=settings.OPENAI_API_KEY,
+            timeout=settings.LLM_REQUEST_TIMEOUT,
+            max_retries=0
+        )
+    return _models[key]
+
+
+def override_models(factory: Optional[Callable[[str, float], Any]]) -> Optional[Callable[[str, float], Any]]:
+    """
+    Route every LLM call to `factory(model, temperature)` instead of the
+    model the node holds, e.g. a fake model for benchmarks. Applied at call
+    time, so agents built at import are covered too.
+
+    Args:
+        factory: Returns the chat model to call; None restores the real models
+
+    Returns:
+        The previous factory
+    """
+    global _model_override
+    previous, _model_override = _model_override, factory
+    return previous
+
+
+def classify_error(exc: BaseException) -> str:
+    """Classify an exception raised by an LLM call into a retry class."""
+    if isinstance(exc, CircuitOpenError):
+        return UNAVAILABLE
+    if isinstance(exc, DeadlineExceeded):
+        return FATAL
+    if isinstance(exc, openai.RateLimitError):
+        # Exhausted quota will not recover by waiting
+        if getattr(exc, "code", None) == "insufficient_quota":
+            return FATAL
+        return RATE_LIMIT
+    if isinstance(exc, openai.APIConnectionError):  # Includes APITimeoutError
+        return TRANSIENT
+    if isinstance(exc, openai.APIStatusError):
+        return TRANSIENT if exc.status_code in _RETRYABLE_STATUS else FATAL
+    if isinstance(exc, (OutputParserException, json.JSONDecodeError, ValidationError)):
+        return PARSE
+    if isinstance(exc, ValueError):
+        # langchain raises bare ValueErrors for unparsable structured output
+        return PARSE
+    return FATAL
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Extract the server-requested wait from Retry-After headers, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Collects token usage reported by the chat model during one call."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.reported = False
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    self.reported = True
+                    self.prompt_tokens += usage.get("input_tokens", 0)
+                    self.completion_tokens += usage.get("output_tokens", 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TraceCallback(BaseCallbackHandler):
+    """Opens a span per chain step (prompt formatting, provider request, output parsing)."""
+
+    def __init__(self):
+        self._spans: Dict[Any, Span] = {}
+
+    def _start(self, serialized: Optional[Dict[str, Any]], run_id: Any, parent_run_id: Any,
+               category: Optional[str] = None, **kwargs: Any) -> None:
+        serialized = serialized or {}
+        name = kwargs.get("name") or serialized.get("name") or (serialized.get("id") or ["chain"])[-1]
+        if category is None:
+            category = "prompt" if "Prompt" in name else "chain"
+        opened = tracer.start(name, category, parent=self._spans.get(parent_run_id))
+        if opened is not None:
+            self._spans[run_id] = opened
+
+    def _end(self, run_id: Any, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        opened = self._spans.pop(run_id, None)
+        if opened is not None:
+            opened.set(**attributes)
+            tracer.end(opened, type(error).__name__ if error else None)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(serialized, run_id, parent_run_id, **kwargs)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs) -> None:
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(serialized, run_id, parent_run_id, category="provider", **kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(serialized, run_id, parent_run_id, category="provider", **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        usage = UsageCallback()
+        usage.on_llm_end(response)
+        self._end(run_id, prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._end(run_id, error)
+
+
+def use_cassette(cassette: Optional[Any]) -> Optional[Any]:
+    """
+    Pass every invoke_llm call through `cassette.call(node, inputs, invoke)`,
+    which records the outcome of `invoke()` or returns a recorded one
+    (see utils.cassette).
+
+    Args:
+        cassette: Recorder or Replayer; None calls the models directly
+
+    Returns:
+        The previous cassette
+    """
+    global _cassette
+    previous, _cassette = _cassette, cassette
+    return previous
+
+
+def model_name(llm: Any) -> str:
+    """Best-effort model name of a chat model, used to key shared limiters."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or "default"
+
+
+def _call_once(chain: Runnable, inputs: Dict[str, Any], model: str, node: str,
+               state: Optional[Mapping[str, Any]], priority: str) -> Any:
+    """One attempt: check the circuit, wait for the rate limiter, call, report the outcome."""
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit for {model} is open")
+
+    budget = remaining(state)
+    estimate = estimate_tokens(inputs)
+    queued = time.monotonic()
+    with span("rate_limit", "wait", estimated_tokens=estimate):
+        permit = get_limiter(model).acquire(
+            estimate, timeout=None if budget == float("inf") else budget, priority=priority
+        )
+    queue_wait = time.monotonic() - queued
+    LLM_QUEUE_WAIT.observe(queue_wait, model=model)
+    if permit is None:
+        breaker.release_probe()
+        raise DeadlineExceeded(f"No {model} capacity within the turn budget")
+
+    usage = UsageCallback()
+    callbacks = [usage, TraceCallback()] if tracer.enabled else [usage]
+    start = time.monotonic()
+    try:
+        result = chain.invoke(inputs, config={"callbacks": callbacks})
+    except Exception as exc:
+        latency = time.monotonic() - start
+        kind = classify_error(exc)
+        permit.release(latency, throttled=kind == RATE_LIMIT)
+        if kind == RATE_LIMIT:
+            LLM_RATE_LIMITED.inc(model=model)
+        # Malformed output is the model's own problem; every provider error counts against the circuit
+        breaker.record(kind == PARSE, latency)
+        raise
+    latency = time.monotonic() - start
+    permit.release(latency, tokens=usage.total_tokens if usage.reported else None)
+    breaker.record(True, latency)
+    observe(model, node, latency)
+    record_llm_call(model, usage.prompt_tokens, usage.completion_tokens, node=node,
+                    queue_ms=round(queue_wait * 1000, 1))
+    LLM_CALLS.inc(node=node, model=model)
+    LLM_TOKENS.inc(usage.prompt_tokens, model=model, direction="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens, model=model, direction="completion")
+    logger.debug("[%s] %s answered in %.2fs", node, model, latency,
+                 extra={"latency_ms": round(latency * 1000), "prompt_tokens": usage.prompt_tokens,
+                        "completion_tokens": usage.completion_tokens})
+    return result
+
+
+def next_backoff(previous: float, base: float, cap: float) -> float:
+    """Decorrelated jitter: sleep = min(cap, uniform(base, previous * 3))."""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+def fallback_chain(node: str, primary: str) -> List[str]:
+    """
+    Models to try for a node, starting with `primary`.
+    If `primary` is in the node's configured chain, the chain continues
+    after it; otherwise it is tried before the whole chain.
+    """
+    chain = settings.FALLBACK_CHAINS.get(node, [])
+    if primary in chain:
+        return chain[chain.index(primary):]
+    return [primary] + chain
+
+
+def _invoke_model(llm: Any, build: Callable[[Any], Runnable], inputs: Dict[str, Any], node: str,
+                  state: Optional[Mapping[str, Any]], max_attempts: int, priority: str) -> Any:
+    """Call one model with classified, deadline-aware retries."""
+    if _model_override is not None:
+        llm = _model_override(model_name(llm), getattr(llm, "temperature", None) or 0)
+    chain = build(llm)
+    model = model_name(llm)
+    call_args = (chain, inputs, model, node, state, priority)
+    delay = settings.LLM_BACKOFF_BASE
+    parse_retried = False
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            # Worker threads run in a copy of this context, so their records carry the attempt
+            with log_context(attempt=attempt), span("attempt", "attempt", attempt=attempt):
+                if hedging_enabled(node):
+                    return run_within(run_hedged, state, _call_once, model, node, *call_args)
+                return run_within(_call_once, state, *call_args)
+        except Exception as exc:
+            kind = classify_error(exc)
+            if kind in (FATAL, UNAVAILABLE) or attempt == max_attempts:
+                raise
+
+            if kind == PARSE:
+                if parse_retried:
+                    raise
+                parse_retried = True
+                sleep = 0.0
+            else:
+                delay = next_backoff(delay, settings.LLM_BACKOFF_BASE, settings.LLM_BACKOFF_CAP)
+                sleep = delay
+                if kind == RATE_LIMIT:
+                    sleep = max(sleep, retry_after_seconds(exc) or 0.0)
+
+            if remaining(state) - sleep < settings.DEADLINE_LLM_SECONDS:
+                logger.warning("[%s] %s error, no turn budget left to retry: %s", node, kind, exc,
+                               extra={"attempt": attempt})
+                raise
+
+            logger.warning("[%s] %s error (attempt %d/%d), retrying in %.1fs: %s",
+                           node, kind, attempt, max_attempts, sleep, exc, extra={"attempt": attempt})
+            record_retry()
+            LLM_RETRIES.inc(node=node, error=kind)
+            if sleep:
+                with span("backoff", "backoff", error=kind, seconds=round(sleep, 3)):
+                    time.sleep(sleep)
+
+
+def invoke_llm(
+    llm: Any,
+    build: Callable[[Any], Runnable],
+    inputs: Dict[str, Any],
+    *,
+    node: str,
+    state: Optional[Mapping[str, Any]] = None,
+    max_attempts: Optional[int] = None,
+    priority: Optional[str] = None
+) -> Any:
+    """
+    Invoke a single LLM call with classified, deadline-aware retries,
+    failing over along the node's fallback chain when a model is down.
+
+    Args:
+        llm: Chat model to call
+        build: Builds the runnable for the model (e.g. `lambda m: prompt | m`)
+        inputs: Prompt variables passed to the runnable
+        node: Calling node name, used for logging and fallback chains
+        state: Graph state carrying the turn deadline
+        max_attempts: Attempt limit per model (defaults to LLM_MAX_ATTEMPTS)
+        priority: Scheduling class (defaults to the node's class: live or background)
+
+    Returns:
+        The runnable's output
+
+    Raises:
+        LLMUnavailable: If the chain reached its "template" entry
+        The last error once it is non-retryable, or when the chain is
+        exhausted or the turn budget cannot cover another model.
+    """
+    max_attempts = max_attempts or settings.LLM_MAX_ATTEMPTS
+    priority = priority or priority_for(node)
+    if _cassette is not None:
+        return _cassette.call(node, inputs, lambda: _invoke_chain(llm, build, inputs, node, state,
+                                                                  max_attempts, priority))
+    return _invoke_chain(llm, build, inputs, node, state, max_attempts, priority)
+
+
+def _invoke_chain(llm: Any, build: Callable[[Any], Runnable], inputs: Dict[str, Any], node: str,
+                  state: Optional[Mapping[str, Any]], max_attempts: int, priority: str) -> Any:
+    """Try the node's fallback chain in order (see invoke_llm)."""
+    primary = model_name(llm)
+    temperature = getattr(llm, "temperature", None) or 0
+    last_error: Optional[Exception] = None
+
+    for candidate in fallback_chain(node, primary):
+        if candidate == TEMPLATE:
+            raise LLMUnavailable(f"No model available for {node}") from last_error
+        if last_error is not None and remaining(state) < settings.DEADLINE_LLM_SECONDS:
+            break
+
+        target = llm if candidate == primary else get_chat_model(candidate, temperature)
+        try:
+            with log_context(model=candidate), span(f"llm {node}", "llm", node=node, model=candidate):
+                return _invoke_model(target, build, inputs, node, state, max_attempts, priority)
+        except Exception as exc:
+            if classify_error(exc) not in _FAILOVER:
+                raise
+            logger.warning("[%s] %s unavailable, trying next fallback: %s", node, candidate, exc)
+            last_error = exc
 
-def create_retry_decorator(max_attempts: int = 3):
-    """
-    Creates a tenacity retry decorator for LLM calls.
-    Retries on:
-    - OpenAI API errors (ServiceUnavailable, RateLimit, APIError)
-    - JSON parsing errors (OutputParserException)
-    """
-    return retry(
-        stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((
-            openai.APIError,
-            openai.RateLimitError,
-            openai.APIConnectionError,
-            openai.InternalServerError,
-            OutputParserException,
-            json.JSONDecodeError,
-            ValueError # Catch pydantic validation errors often
-        )),
-        reraise=True
-    )
-
-# Pre-configured decorator
-llm_retry = create_retry_decorator()
+    raise last_error
@@ -1,19 +1,50 @@
 """
 Centralized logging configuration for Interview Coach.
 Provides consistent logging across all modules.
+In queue mode (default) nodes only enqueue records; a background
+QueueListener thread formats and writes them, so a turn never waits on
+stdout or disk. A full queue either drops DEBUG/INFO records ("drop") or
+makes the caller wait ("block"), both bounded by a timeout.
+Records carry correlation fields (thread_id, turn, node, model, ...) bound
+with `log_context`/`node_scope`; the "json" format emits them as one JSON
+object per line.
 """
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, ClassVar, Dict, Iterator, List, Optional
 
+_listener: Optional[logging.handlers.QueueListener] = None
 
-def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
+# Correlation fields emitted by JsonFormatter, in output order
+LOG_FIELDS = ("thread_id", "turn", "node", "model", "attempt", "latency_ms",
+              "prompt_tokens", "completion_tokens", "retries", "llm_calls")
+
+# None until a log_context is entered; never a shared mutable default
+_context: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("log_context", default=None)
+
+
+def setup_logging(level: str = "INFO", log_file: Optional[str] = None, use_queue: bool = True,
+                  queue_size: int = 10000, overflow: str = "drop", block_timeout: float = 1.0,
+                  fmt: str = "text") -> None:
     """
     Configure logging for the entire application.
     
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR)
         log_file: Optional file path to write logs to
+        use_queue: Write through a background thread instead of in the caller
+        queue_size: Records buffered for the writer thread
+        overflow: Full-queue policy: "drop" (DEBUG/INFO dropped, others wait) or "block" (all wait)
+        block_timeout: Longest wait for queue space before a record is dropped anyway
+        fmt: "text" (human-readable) or "json" (one object per line with correlation fields)
     """
     log_format = "%(asctime)s | %(levelname)-8s | %(name)-20s | %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
@@ -22,21 +53,39 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     
-    # Clear existing handlers
+    # Clear existing handlers (and flush a previous writer thread)
+    shutdown_logging()
     root_logger.handlers.clear()
     
     # Console handler with colored output (if terminal supports it)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(ColoredFormatter(log_format, date_format))
-    root_logger.addHandler(console_handler)
+    if fmt == "json":
+        console_handler.setFormatter(JsonFormatter())
+    else:
+        console_handler.setFormatter(ColoredFormatter(log_format, date_format, stream=sys.stdout))
+    handlers = [console_handler]
     
     # Optional file handler
     if log_file:
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(logging.Formatter(log_format, date_format))
-        root_logger.addHandler(file_handler)
+        file_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(log_format, date_format))
+        handlers.append(file_handler)
+    
+    # Context is captured in the calling thread, before records cross the queue
+    if use_queue:
+        global _listener
+        records: queue.Queue = queue.Queue(maxsize=queue_size)
+        queue_handler = OverflowQueueHandler(records, overflow=overflow, block_timeout=block_timeout)
+        queue_handler.addFilter(ContextFilter())
+        root_logger.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            handler.addFilter(ContextFilter())
+            root_logger.addHandler(handler)
     
     # Reduce noise from external libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -45,11 +94,170 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
     logging.getLogger("langchain").setLevel(logging.WARNING)
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread (also runs at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+# === Correlation Context ===
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Add fields to every record logged in this context (and in copied contexts, e.g. LLM worker threads)."""
+    token = _context.set({**(_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    """A copy of the bound fields; changing it does not change the context."""
+    return dict(_context.get() or {})
+
+
+class NodeStats:
+    """LLM usage accumulated while one graph node runs; `calls` is its cost ledger."""
+    __slots__ = ("llm_calls", "prompt_tokens", "completion_tokens", "retries", "model", "calls")
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.model: Optional[str] = None
+        self.calls: List[Dict[str, Any]] = []
+
+    def as_fields(self) -> Dict[str, Any]:
+        return {"llm_calls": self.llm_calls, "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens, "retries": self.retries, "model": self.model}
+
+
+_node_stats: contextvars.ContextVar[Optional[NodeStats]] = contextvars.ContextVar("node_stats", default=None)
+
+
+@contextmanager
+def node_scope(node: str, **fields: Any) -> Iterator[NodeStats]:
+    """Bind a node's log context and collect its LLM usage."""
+    stats = NodeStats()
+    token = _node_stats.set(stats)
+    try:
+        with log_context(node=node, **fields):
+            yield stats
+    finally:
+        _node_stats.reset(token)
+
+
+def record_llm_call(model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                    node: Optional[str] = None, queue_ms: Optional[float] = None) -> None:
+    """Count one finished LLM call towards the current node and its ledger (queue_ms: rate-limiter wait)."""
+    stats = _node_stats.get()
+    if stats is not None:
+        stats.llm_calls += 1
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.model = model
+        call = {"node": node, "model": model, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        if queue_ms is not None:
+            call["queue_ms"] = queue_ms
+        stats.calls.append(call)
+
+
+def current_node_stats() -> Optional[NodeStats]:
+    """Usage collected so far by the running node, if any."""
+    return _node_stats.get()
+
+
+def record_retry() -> None:
+    stats = _node_stats.get()
+    if stats is not None:
+        stats.retries += 1
+
+
+class ContextFilter(logging.Filter):
+    """Copies the bound context onto each record; explicit `extra` fields win."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in (_context.get() or {}).items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and correlation fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class OverflowQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler with a bounded-queue overflow policy.
+
+    Args:
+        records: Bounded queue drained by a QueueListener
+        overflow: "drop" drops DEBUG/INFO at once when full and waits for others; "block" waits for all
+        block_timeout: Longest wait before a record is dropped anyway (the writer may be stuck)
+    """
+
+    def __init__(self, records: queue.Queue, overflow: str = "drop", block_timeout: float = 1.0):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(records)
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            self._report_dropped()
+        try:
+            if self.overflow == "drop" and record.levelno < logging.WARNING:
+                self.queue.put_nowait(record)
+            else:
+                self.queue.put(record, timeout=self.block_timeout)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _report_dropped(self) -> None:
+        """Tell the log how many records were lost, once there is room again."""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        notice = logging.LogRecord("log_config", logging.WARNING, __file__, 0,
+                                   "Logging queue overflowed, dropped %d records", (dropped,), None)
+        try:
+            self.queue.put_nowait(self.prepare(notice))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += dropped
+
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for terminal output."""
     
     # ANSI color codes
-    COLORS = {
+    COLORS: ClassVar[Dict[str, str]] = {
         "DEBUG": "\033[36m",     # Cyan
         "INFO": "\033[32m",      # Green
         "WARNING": "\033[33m",   # Yellow
@@ -59,7 +267,7 @@ class ColoredFormatter(logging.Formatter):
     }
     
     # Agent-specific colors for easy identification
-    AGENT_COLORS = {
+    AGENT_COLORS: ClassVar[Dict[str, str]] = {
         "router": "\033[96m",       # Light Cyan
         "observer": "\033[94m",     # Light Blue
         "interviewer": "\033[93m",  # Light Yellow
@@ -69,24 +277,28 @@ class ColoredFormatter(logging.Formatter):
         "feedback": "\033[97m",     # White
     }
     
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None, stream=None):
+        super().__init__(fmt, datefmt)
+        # Only colorize if outputting to a terminal; decided once, not per record
+        stream = stream if stream is not None else sys.stdout
+        self.colorize = hasattr(stream, "isatty") and stream.isatty()
+        self._colors: Dict[tuple, str] = {}  # (logger name, level) -> color
+    
+    def _color(self, record: logging.LogRecord) -> str:
+        key = (record.name, record.levelname)
+        color = self._colors.get(key)
+        if color is None:
+            # Agent loggers get the agent color, others the level color
+            logger_name = record.name.lower()
+            color = next((c for agent, c in self.AGENT_COLORS.items() if agent in logger_name),
+                         self.COLORS.get(record.levelname, self.COLORS["RESET"]))
+            self._colors[key] = color
+        return color
+    
     def format(self, record: logging.LogRecord) -> str:
-        # Get color based on level
-        color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
-        reset = self.COLORS["RESET"]
-        
-        # Check if this is an agent logger and apply agent-specific color
-        logger_name = record.name.lower()
-        for agent, agent_color in self.AGENT_COLORS.items():
-            if agent in logger_name:
-                color = agent_color
-                break
-        
-        # Format the message
         original = super().format(record)
-        
-        # Only colorize if outputting to a terminal
-        if sys.stdout.isatty():
-            return f"{color}{original}{reset}"
+        if self.colorize:
+            return f"{self._color(record)}{original}{self.COLORS['RESET']}"
         return original
 
 
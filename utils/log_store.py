@@ -0,0 +1,163 @@
+"""
+Session log storage keyed by thread_id.
+Logs are sharded as <root>/<YYYY>/<MM>/<DD>/<hash[:2]>/<thread_id>.json,
+written atomically, and indexed by an append-only manifest.jsonl whose
+lines are single O_APPEND writes under an advisory lock, so any number
+of processes can save concurrently.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import settings
+from utils.logger import LoggerUtils, atomic_write
+from utils.log_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND writes alone
+    fcntl = None
+
+logger = get_logger("log_store")
+
+_UNSAFE = re.compile(r"[^\w.-]")
+MANIFEST = "manifest.jsonl"
+
+
+class LogStore:
+    """
+    Sharded, collision-free store of final interview logs.
+
+    Args:
+        root: Store directory; "" keeps the legacy interview_log_{session_id}.json in the working directory
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def path_for(self, thread_id: str, saved_at: Optional[float] = None) -> str:
+        """Shard path of a thread's log for the day it is saved (UTC)."""
+        day = time.strftime("%Y/%m/%d", time.gmtime(time.time() if saved_at is None else saved_at))
+        shard = hashlib.sha1(str(thread_id).encode()).hexdigest()[:2]
+        return os.path.join(self.root, *day.split("/"), shard, f"{_UNSAFE.sub('_', str(thread_id))}.json")
+
+    def save(self, thread_id: Optional[str], participant_name: str, turns: List[Any],
+             final_feedback: str, session_id: Any = None, journal_path: Optional[str] = None,
+             usage: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Save a session log, compacting the turn journal when it covers all turns.
+
+        Args:
+            thread_id: Graph thread; without one (or with the store disabled) the legacy filename is used
+            participant_name: Name of the candidate
+            turns: Full turn log, used when the journal is missing or incomplete
+            final_feedback: The final report
+            session_id: Scenario number, kept in the manifest
+            journal_path: JSONL turn journal of the thread, if any
+            usage: Cost ledger saved with the log; its total cost goes into the manifest
+
+        Returns:
+            Path of the written log, or None if it could not be written (nothing is indexed)
+        """
+        saved_at = time.time()
+        if self.enabled and thread_id:
+            filename = self.path_for(thread_id, saved_at)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        else:
+            filename = f"interview_log_{session_id}.json"
+
+        written = 0
+        if journal_path and os.path.exists(journal_path):
+            written = LoggerUtils.compact_journal(journal_path, participant_name, final_feedback,
+                                                  filename=filename, usage=usage)
+        if written < len(turns):
+            # No journal, or one that predates this session's turns
+            if not LoggerUtils.save_log(participant_name, turns, final_feedback, filename=filename, usage=usage):
+                return None
+            written = len(turns)
+
+        if self.enabled and thread_id:
+            self._index({
+                "thread_id": thread_id,
+                "session_id": session_id,
+                "participant_name": participant_name,
+                "turns": written,
+                "saved_at": round(saved_at, 3),
+                "cost_usd": usage["summary"]["cost_usd"] if usage else None,
+                "path": os.path.relpath(filename, self.root),
+            })
+        return filename
+
+    def find(self, thread_id: str) -> Optional[str]:
+        """Path of the latest log saved for a thread, or None."""
+        latest = None
+        for entry in self.entries():
+            if entry.get("thread_id") == thread_id:
+                latest = entry
+        return os.path.join(self.root, latest["path"]) if latest else None
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Manifest entries in save order; torn lines are skipped."""
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def rebuild_manifest(self) -> int:
+        """
+        Re-index every stored log (e.g. after a crash between the log write
+        and its manifest line). Offline maintenance: lines appended while
+        it runs are lost. Returns the number of entries written.
+        """
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        log = json.load(f)
+                except (OSError, ValueError):
+                    logger.warning("Skipping unreadable log %s", path)
+                    continue
+                entries.append({
+                    "thread_id": name[:-len(".json")],
+                    "session_id": None,
+                    "participant_name": log.get("participant_name"),
+                    "turns": len(log.get("turns", [])),
+                    "saved_at": round(os.path.getmtime(path), 3),
+                    "path": os.path.relpath(path, self.root),
+                })
+        entries.sort(key=lambda e: e["saved_at"])
+        atomic_write(os.path.join(self.root, MANIFEST),
+                     lambda f: f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+        return len(entries)
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            fd = os.open(os.path.join(self.root, MANIFEST), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, line)
+            finally:
+                os.close(fd)  # Closing releases the lock
+        except OSError as e:
+            logger.error("Failed to index log of thread %s: %s", entry["thread_id"], e)
+
+
+log_store = LogStore(settings.LOG_STORE_DIR)
@@ -1,9 +1,11 @@
 """
 Utility class for saving interview logs to JSON files.
+All writes are atomic: temp file in the target directory, fsync, rename.
 """
 import json
 import os
-from typing import List, Dict, Any
+import tempfile
+from typing import Callable, IO, List, Dict, Any, Optional
 from utils.log_config import get_logger
 
 logger = get_logger("logger")
@@ -19,32 +21,108 @@ class LoggerUtils:
         participant_name: str, 
         turns: List[Dict[str, Any]], 
         final_feedback: str, 
-        filename: str = "interview_log.json"
+        filename: str = "interview_log.json",
+        usage: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         Save the interview log to a JSON file with the specified structure.
         
         Args:
             participant_name: Name of the candidate.
-            turns: List of turn data dictionaries.
+            turns: List of TurnRecord entries or turn data dictionaries.
             final_feedback: The comprehensive report generated at the end.
             filename: The file path to save the log to.
+            usage: Cost ledger (utils.cost.session_ledger), saved as "llm_usage".
             
         Returns:
             True if saved successfully, False otherwise.
         """
         data = {
             "participant_name": participant_name,
-            "turns": turns,
+            "turns": [turn.to_dict() if hasattr(turn, "to_dict") else turn for turn in turns],
             "final_feedback": final_feedback
         }
+        if usage is not None:
+            data["llm_usage"] = usage
         
         try:
             abs_path = os.path.abspath(filename)
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            atomic_write(filename, lambda f: json.dump(data, f, indent=2, ensure_ascii=False))
             logger.info("Interview log saved to %s", abs_path)
             return True
         except Exception as e:
             logger.error("Error saving interview log: %s", e)
             return False
+
+    @staticmethod
+    def compact_journal(
+        journal_path: str,
+        participant_name: str,
+        final_feedback: str,
+        filename: str = "interview_log.json",
+        usage: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Compact a JSONL turn journal into the log format save_log writes.
+        Turn lines are copied verbatim; a turn_id journaled twice (a node
+        replayed after a crash) keeps its place and last line, a torn last line is
+        skipped. The log is replaced atomically and the journal removed.
+        
+        Args:
+            journal_path: JSONL journal written by utils.turn_log.
+            participant_name: Name of the candidate.
+            final_feedback: The comprehensive report generated at the end.
+            filename: The file path to save the log to.
+            usage: Cost ledger (utils.cost.session_ledger), saved as "llm_usage".
+            
+        Returns:
+            Number of turns written, 0 if the journal is missing or unreadable.
+        """
+        turns: Dict[Any, str] = {}
+        try:
+            with open(journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        turn_id = json.loads(line)["turn_id"]
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Skipping malformed journal line in %s", journal_path)
+                        continue
+                    turns[turn_id] = line.strip()
+        except OSError as e:
+            logger.error("Error reading turn journal: %s", e)
+            return 0
+        
+        body = '{"participant_name": %s, "turns": [\n%s\n], "final_feedback": %s%s}\n' % (
+            json.dumps(participant_name, ensure_ascii=False),
+            ",\n".join(turns.values()),
+            json.dumps(final_feedback, ensure_ascii=False),
+            ',\n"llm_usage": %s' % json.dumps(usage, ensure_ascii=False) if usage is not None else ""
+        )
+        try:
+            atomic_write(filename, lambda f: f.write(body))
+            os.remove(journal_path)
+        except OSError as e:
+            logger.error("Error compacting turn journal: %s", e)
+            return 0
+        logger.info("Interview log compacted from journal to %s", os.path.abspath(filename))
+        return len(turns)
+
+
+def atomic_write(filename: str, write: Callable[[IO[str]], Any]) -> None:
+    """
+    Write a file via a uniquely named temp file in the same directory,
+    fsync and rename, so readers and concurrent writers never see a torn file.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,309 @@
+"""
+Process-wide metrics in Prometheus text format.
+
+Counters, gauges and histograms are registered once at import and updated
+from the graph wrappers and the LLM call path. With METRICS_PORT set,
+main.py and the Streamlit app serve them at http://METRICS_HOST:PORT/metrics
+from a daemon thread, e.g. for a Prometheus scrape:
+
+    rate(interview_turns_total[1m])                                   # turns per second
+    histogram_quantile(0.95, rate(interview_node_latency_seconds_bucket[5m]))
+    rate(interview_critic_decisions_total{status="REJECTED"}[5m])
+        / rate(interview_critic_decisions_total[5m])                  # rejection rate
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.log_config import get_logger
+
+logger = get_logger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {_escape(self.documentation)}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Current value per label set, or a function read at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from `function` on every scrape."""
+        self._function = function
+
+    def value(self, **labels: Any) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        if self._function is not None:
+            try:
+                yield f"{self.name} {_format_value(self._function())}"
+            except Exception as e:  # A broken collector must not fail the whole scrape
+                logger.warning("Gauge %s failed: %s", self.name, e)
+            return
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}  # Bucket counts, +Inf count, sum, count
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            row[bisect.bisect_left(self.buckets, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def count(self, **labels: Any) -> float:
+        row = self._values.get(self._key(labels))
+        return row[-1] if row else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, list(row)) for key, row in self._values.items())
+        for key, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-2]):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(row[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {_format_value(row[-1])}"
+
+
+class Registry:
+    """Named metrics rendered together; registering a name twice returns the existing metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            metric = self._metrics[name]
+        if not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+class SessionTracker:
+    """
+    Threads that ran a node within the last `window` seconds and have not
+    finished (reached the feedback node).
+    """
+
+    def __init__(self, window: float = 900):
+        self.window = window
+        self._seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, thread_id: Any) -> None:
+        if thread_id is not None:
+            with self._lock:
+                self._seen[str(thread_id)] = time.monotonic()
+
+    def end(self, thread_id: Any) -> None:
+        with self._lock:
+            self._seen.pop(str(thread_id), None)
+
+    def count(self) -> int:
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            for thread_id in [t for t, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[thread_id]
+            return len(self._seen)
+
+
+registry = Registry()
+sessions = SessionTracker()
+
+TURNS = registry.counter("interview_turns_total", "Candidate messages processed (graph invocations)")
+NODE_LATENCY = registry.histogram("interview_node_latency_seconds", "Graph node latency", ("node",))
+LLM_CALLS = registry.counter("interview_llm_calls_total", "Successful LLM calls", ("node", "model"))
+LLM_TOKENS = registry.counter("interview_llm_tokens_total", "LLM tokens by direction (prompt or completion)",
+                              ("model", "direction"))
+LLM_RETRIES = registry.counter("interview_llm_retries_total", "Retried LLM attempts by error class",
+                               ("node", "error"))
+LLM_QUEUE_WAIT = registry.histogram("interview_llm_queue_seconds", "Wait for the model's rate limiter",
+                                    ("model",), buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+LLM_RATE_LIMITED = registry.counter("interview_llm_rate_limited_total", "LLM calls answered with 429",
+                                    ("model",))
+ROUTER_DECISIONS = registry.counter("interview_router_decisions_total", "Router classifications",
+                                    ("category",))
+CRITIC_DECISIONS = registry.counter("interview_critic_decisions_total", "Critic verdicts on questions",
+                                    ("status",))
+CASCADE_ATTEMPTS = registry.counter("interview_cascade_attempts_total",
+                                    "Questions drafted by the cheap interviewer tier", ("grade",))
+CASCADE_ESCALATIONS = registry.counter("interview_cascade_escalations_total",
+                                       "Cheap-tier drafts rejected and escalated to MODEL_INTERVIEWER", ("grade",))
+ACTIVE_SESSIONS = registry.gauge("interview_active_sessions", "Sessions with recent activity, not yet finished")
+ACTIVE_SESSIONS.set_function(sessions.count)
+CHECKPOINT_BYTES = registry.gauge("interview_checkpoint_bytes",
+                                  "Serialized checkpoint bytes held in memory (database size for SQLite)")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics from a daemon thread. Idempotent per process, so the
+    Streamlit script can call it on every rerun.
+
+    Args:
+        port: TCP port; 0 disables the endpoint
+        host: Interface to bind (local only by default)
+
+    Returns:
+        The running server, or None if disabled or the port is taken
+    """
+    global _server
+    if _server is not None or not port:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        logger.error("Metrics endpoint not started on %s:%d: %s", host, port, e)
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Metrics at http://%s:%d/metrics", host, _server.server_address[1])
+    return _server
+
+
+def stop_server() -> None:
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
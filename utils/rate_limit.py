@@ -0,0 +1,217 @@
+"""
+Process-wide rate limiting for LLM calls.
+Each model gets one limiter combining a requests-per-second bucket, a
+tokens-per-minute bucket and an AIMD adaptive in-flight limit driven by
+observed 429s and latency.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from config import settings
+from utils.scheduler import LIVE, PriorityScheduler
+from utils.log_config import get_logger
+
+logger = get_logger("rate_limit")
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Tokens may go negative to record debt."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take `amount` tokens, waiting for refill if needed.
+
+        Returns:
+            False (without taking tokens) if they cannot be available within `timeout`
+        """
+        amount = min(amount, self.capacity)  # Oversized requests take the whole bucket
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate
+            if give_up_at is not None and time.monotonic() + wait > give_up_at:
+                return False
+            time.sleep(wait)
+
+    def adjust(self, delta: float) -> None:
+        """Credit (positive) or debit (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+    def drain(self) -> None:
+        """Empty the bucket, pausing all callers until it refills."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD in-flight limit: +1/limit per good response, multiplicative decrease
+    on 429s or responses slower than the latency target. Signals from requests
+    started before the last decrease are ignored so one burst of 429s only
+    halves the limit once. Free slots are handed out by a PriorityScheduler.
+    """
+
+    def __init__(self, max_limit: int, latency_target: float, min_limit: int = 1, backoff: float = 0.5):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.epoch = 0
+        self.scheduler = PriorityScheduler()
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None, priority: str = LIVE) -> Optional[int]:
+        """
+        Wait for a free slot, queued by priority class.
+
+        Returns:
+            The epoch the slot was taken in, or None on timeout
+        """
+        with self._cond:
+            waiter = self.scheduler.enqueue(priority)
+
+            def admissible() -> bool:
+                capacity = int(self.limit)
+                return self.scheduler.can_start(waiter, capacity - self.in_flight, capacity)
+
+            if not self._cond.wait_for(admissible, timeout=timeout):
+                self.scheduler.remove(waiter)
+                self._cond.notify_all()
+                return None
+            self.scheduler.start(waiter)
+            self.in_flight += 1
+            # Another waiter of a different class may now be admissible
+            self._cond.notify_all()
+            return self.epoch
+
+    def cancel(self, priority: str = LIVE) -> None:
+        """Return a slot that was never used, without adapting the limit."""
+        with self._cond:
+            self.in_flight -= 1
+            self.scheduler.finish(priority)
+            self._cond.notify_all()
+
+    def release(self, epoch: int, latency: float, throttled: bool = False, priority: str = LIVE) -> None:
+        """Free a slot and adapt the limit from the observed outcome."""
+        with self._cond:
+            self.in_flight -= 1
+            self.scheduler.finish(priority)
+            congested = throttled or latency > self.latency_target
+            if congested:
+                if epoch == self.epoch:
+                    factor = self.backoff if throttled else 0.9
+                    self.limit = max(float(self.min_limit), self.limit * factor)
+                    self.epoch += 1
+                    logger.info("Concurrency limit lowered to %.1f (%s)",
+                                self.limit, "429" if throttled else f"latency {latency:.1f}s")
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class Permit:
+    """A granted request slot; release it exactly once with the call outcome."""
+
+    __slots__ = ("_limiter", "_epoch", "_tokens", "_priority")
+
+    def __init__(self, limiter: "ModelLimiter", epoch: int, tokens: float, priority: str):
+        self._limiter = limiter
+        self._epoch = epoch
+        self._tokens = tokens
+        self._priority = priority
+
+    def release(self, latency: float, throttled: bool = False, tokens: Optional[float] = None) -> None:
+        """
+        Args:
+            latency: Call duration in seconds
+            throttled: True if the provider answered 429
+            tokens: Actual tokens used, to correct the estimate taken up front
+        """
+        limiter = self._limiter
+        limiter.concurrency.release(self._epoch, latency, throttled, self._priority)
+        if throttled:
+            limiter.requests.drain()
+        if tokens is not None:
+            limiter.tokens.adjust(self._tokens - tokens)
+
+
+class ModelLimiter:
+    """Combined RPS, TPM and adaptive concurrency limits for one model."""
+
+    def __init__(self, model: str, rps: float, tpm: float, max_in_flight: int, latency_target: float):
+        self.model = model
+        self.requests = TokenBucket(rate=rps, capacity=max(1.0, rps))
+        self.tokens = TokenBucket(rate=tpm / 60.0, capacity=tpm)
+        self.concurrency = AdaptiveConcurrency(max_in_flight, latency_target)
+
+    def acquire(self, tokens: float, timeout: Optional[float] = None, priority: str = LIVE) -> Optional[Permit]:
+        """
+        Wait until a request of ~`tokens` tokens may be sent.
+        The in-flight slot is taken first so queue order follows priority.
+
+        Returns:
+            A Permit, or None if it could not be granted within `timeout`
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+
+        def left() -> Optional[float]:
+            return None if give_up_at is None else max(0.0, give_up_at - time.monotonic())
+
+        epoch = self.concurrency.acquire(left(), priority)
+        if epoch is None:
+            return None
+        if not self.requests.acquire(1, left()):
+            self.concurrency.cancel(priority)
+            return None
+        if not self.tokens.acquire(tokens, left()):
+            self.requests.adjust(1)
+            self.concurrency.cancel(priority)
+            return None
+        return Permit(self, epoch, tokens, priority)
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> ModelLimiter:
+    """Get the shared limiter for a model, configured from settings."""
+    with _registry_lock:
+        if model not in _limiters:
+            overrides = settings.LLM_MODEL_LIMITS.get(model, {})
+            _limiters[model] = ModelLimiter(
+                model,
+                rps=overrides.get("rps", settings.LLM_DEFAULT_RPS),
+                tpm=overrides.get("tpm", settings.LLM_DEFAULT_TPM),
+                max_in_flight=int(overrides.get("max_in_flight", settings.LLM_MAX_IN_FLIGHT)),
+                latency_target=overrides.get("latency_target", settings.LLM_LATENCY_TARGET)
+            )
+        return _limiters[model]
+
+
+def estimate_tokens(inputs: Dict) -> int:
+    """Rough token estimate for a call: ~4 chars per token plus template/completion overhead."""
+    chars = sum(len(str(v)) for v in inputs.values())
+    return chars // 4 + settings.LLM_TOKENS_OVERHEAD_ESTIMATE
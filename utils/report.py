@@ -4,9 +4,12 @@ Generates technical assessments and development roadmaps.
 """
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
-from state import AgentState
+from state import AgentState, ObserverThought
 from utils.log_config import get_logger
-import os
+from utils.llm_utils import get_chat_model, invoke_llm, LLMUnavailable
+from utils.deadline import DeadlineExceeded, open_turn
+from agents.templates import fallback_roadmap, fallback_technical_report
+from config import settings
 
 logger = get_logger("report")
 
@@ -22,12 +25,13 @@ def generate_final_report(state: AgentState) -> str:
     - Report generator compiles everything
     """
     candidate_info = state.get("candidate_info", {})
+    # The three calls share one report budget instead of the turn's leftovers
+    state = {**state, **open_turn(settings.REPORT_DEADLINE_SECONDS)}
     
     logger.info("Generating final report for %s", candidate_info.get('Name', 'N/A'))
     
-    # Initialize LLMs
-    api_base = os.getenv("OPENAI_API_BASE")
-    llm = ChatOpenAI(model="openai/gpt-4o", temperature=0, base_url=api_base)
+    # Shared LLM client
+    llm = get_chat_model(settings.MODEL_INTERVIEWER, temperature=0)
     
     # Import and use ManagerAgent for the hiring decision
     from agents.manager import ManagerAgent
@@ -112,11 +116,14 @@ Interview Q&A with Analysis:
 Generate the technical assessment section.""")
     ])
     
-    chain = prompt | llm
-    response = chain.invoke({
-        "candidate_info": str(candidate_info),
-        "transcript": transcript
-    })
+    try:
+        response = invoke_llm(llm, lambda m: prompt | m, {
+            "candidate_info": str(candidate_info),
+            "transcript": transcript
+        }, node="report", state=state)
+    except (DeadlineExceeded, LLMUnavailable):
+        logger.warning("Report model unavailable within the report budget, using templated assessment")
+        return f"## Техническая оценка\n\n{fallback_technical_report(state)}"
     
     return f"## Техническая оценка\n\n{response.content}"
 
@@ -147,7 +154,7 @@ Be specific and actionable. Reference actual gaps identified in the interview.
     # Collect gaps from observer thoughts
     gaps = []
     for thought in internal_thoughts:
-        if isinstance(thought, dict):
+        if isinstance(thought, (dict, ObserverThought)):
             decision = thought.get("decision", "")
             if decision in ["DECREASE_DIFFICULTY", "MAINTAIN"]:
                 analysis = thought.get("analysis", "")
@@ -166,11 +173,14 @@ Number of questions answered: {num_questions}
 Generate the development roadmap section.""")
     ])
     
-    chain = prompt | llm
-    response = chain.invoke({
-        "candidate_info": str(candidate_info),
-        "gaps": "\n".join([f"- {g}" for g in gaps]) if gaps else "No specific gaps identified.",
-        "num_questions": len(interview_log)
-    })
+    try:
+        response = invoke_llm(llm, lambda m: prompt | m, {
+            "candidate_info": str(candidate_info),
+            "gaps": "\n".join([f"- {g}" for g in gaps]) if gaps else "No specific gaps identified.",
+            "num_questions": len(interview_log)
+        }, node="roadmap", state=state)
+    except (DeadlineExceeded, LLMUnavailable):
+        logger.warning("Roadmap model unavailable within the report budget, using templated roadmap")
+        return f"## План развития\n\n{fallback_roadmap(state, gaps)}"
     
     return f"## План развития\n\n{response.content}"
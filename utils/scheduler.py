@@ -0,0 +1,105 @@
+"""
+Priority scheduling for LLM requests.
+Live-turn calls (router, observer, interviewer, critic) are admitted before
+queued background calls (planner, manager, reports). Background work is
+capped at a share of capacity and aged to live priority so it never starves.
+"""
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from config import settings
+
+# Priority classes
+LIVE = "live"
+BACKGROUND = "background"
+
+LIVE_NODES = {"router", "observer", "interviewer", "critic"}
+
+
+def priority_for(node: str) -> str:
+    """Map a calling node to its priority class."""
+    return LIVE if node in LIVE_NODES else BACKGROUND
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "seq")
+
+    def __init__(self, priority: str, seq: int):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.seq = seq
+
+
+class PriorityScheduler:
+    """
+    Admission policy for a capacity-limited resource.
+    Not thread-safe on its own: callers hold the resource's lock/condition.
+    """
+
+    def __init__(self, background_share: Optional[float] = None, starvation_seconds: Optional[float] = None):
+        self.quotas = {
+            LIVE: 1.0,
+            BACKGROUND: settings.LLM_BACKGROUND_SHARE if background_share is None else background_share
+        }
+        self.starvation_seconds = (settings.LLM_STARVATION_SECONDS
+                                   if starvation_seconds is None else starvation_seconds)
+        self.running: Dict[str, int] = {LIVE: 0, BACKGROUND: 0}
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wait_totals: Dict[str, List[float]] = {LIVE: [0, 0.0], BACKGROUND: [0, 0.0]}
+
+    def enqueue(self, priority: str) -> _Waiter:
+        """Register a request waiting for capacity."""
+        waiter = _Waiter(priority, next(self._seq))
+        self._waiting.append(waiter)
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        """Drop a waiter that gave up."""
+        if waiter in self._waiting:
+            self._waiting.remove(waiter)
+
+    def _quota_slots(self, priority: str, capacity: int) -> int:
+        return max(1, int(capacity * self.quotas[priority]))
+
+    def _rank(self, waiter: _Waiter, now: float) -> tuple:
+        aged = now - waiter.enqueued_at >= self.starvation_seconds
+        live = waiter.priority == LIVE or aged
+        return (0 if live else 1, waiter.enqueued_at, waiter.seq)
+
+    def can_start(self, waiter: _Waiter, free_slots: int, capacity: int) -> bool:
+        """True if `waiter` is the best eligible request and a slot is free."""
+        if free_slots <= 0:
+            return False
+        now = time.monotonic()
+        eligible = [w for w in self._waiting
+                    if self.running[w.priority] < self._quota_slots(w.priority, capacity)]
+        if not eligible:
+            return False
+        return min(eligible, key=lambda w: self._rank(w, now)) is waiter
+
+    def start(self, waiter: _Waiter) -> None:
+        """Move an admitted waiter to running and record its queueing delay."""
+        self.remove(waiter)
+        self.running[waiter.priority] += 1
+        totals = self._wait_totals[waiter.priority]
+        totals[0] += 1
+        totals[1] += time.monotonic() - waiter.enqueued_at
+
+    def finish(self, priority: str) -> None:
+        """Mark a running request of `priority` as done."""
+        self.running[priority] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, running count and mean queueing delay per class."""
+        result = {}
+        for priority in (LIVE, BACKGROUND):
+            count, total = self._wait_totals[priority]
+            result[priority] = {
+                "waiting": sum(1 for w in self._waiting if w.priority == priority),
+                "running": self.running[priority],
+                "admitted": count,
+                "mean_wait_seconds": total / count if count else 0.0
+            }
+        return result
@@ -0,0 +1,356 @@
+"""
+Span tracing of interview turns.
+
+    python -m utils.tracing logs/traces/<thread_id>.jsonl trace.json --slowest
+    python -m utils.tracing logs/traces/<thread_id>.jsonl trace.otlp.json --format otlp --turn 3
+
+Each graph node, LLM call, retry attempt, rate-limiter wait, backoff
+sleep, chain step (prompt formatting, provider request, output parsing)
+and web search is a span. Spans nest through a context variable, so work
+done in deadline/hedging worker threads stays under the attempt that
+started it. All nodes of one graph invocation share a trace id; finished
+spans are appended as JSONL per thread when a node ends.
+
+The exporter turns one trace (a turn) into Chrome/Perfetto trace-event
+JSON (chrome://tracing, ui.perfetto.dev) or OTLP/JSON (resourceSpans),
+which an OpenTelemetry collector's file receiver or Jaeger can import.
+"""
+import argparse
+import atexit
+import contextvars
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from utils.log_config import get_logger
+
+logger = get_logger("tracing")
+
+_UNSAFE = re.compile(r"[^\w.-]")
+SERVICE_NAME = "interview-coach"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+_current_trace: contextvars.ContextVar[Optional[Tuple[str, Dict[str, Any]]]] = contextvars.ContextVar(
+    "trace", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    """One timed operation. Times are UNIX microseconds (start) and microseconds (duration)."""
+
+    __slots__ = ("name", "category", "trace_id", "span_id", "parent_id", "start_us", "dur_us",
+                 "tid", "attributes", "error", "_t0")
+
+    def __init__(self, name: str, category: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.start_us = time.time_ns() // 1000
+        self.dur_us = 0
+        self.tid = threading.get_ident()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._t0 = time.perf_counter_ns()
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes known only once the operation has run (tokens, outcome)."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"name": self.name, "cat": self.category, "trace_id": self.trace_id,
+                "span_id": self.span_id, "parent_id": self.parent_id,
+                "start_us": self.start_us, "dur_us": self.dur_us, "tid": self.tid,
+                "attrs": self.attributes}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class Tracer:
+    """
+    Records spans and appends them per thread as JSONL.
+
+    Args:
+        directory: Where span files are written; "" disables tracing
+        max_pending: Finished spans buffered between flushes; older ones are dropped beyond it
+    """
+
+    def __init__(self, directory: str, max_pending: int = 10000):
+        self.directory = directory
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._turns: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, thread_id: Any) -> str:
+        return os.path.join(self.directory, f"{_UNSAFE.sub('_', str(thread_id))}.jsonl")
+
+    @contextmanager
+    def turn(self, thread_id: Any, new: bool = False, **attributes: Any) -> Iterator[None]:
+        """
+        Bind the trace of a thread's current graph invocation.
+
+        Args:
+            thread_id: Graph thread
+            new: Start a new trace (the entry node of an invocation) instead of joining the current one
+            attributes: Trace-level fields copied onto every span (e.g. turn)
+        """
+        if not self.enabled:
+            yield
+            return
+        key = str(thread_id)
+        with self._lock:
+            trace = None if new else self._turns.get(key)
+            if trace is None:
+                trace = (_new_id(128), {"thread_id": thread_id, **attributes})
+                self._turns[key] = trace
+                while len(self._turns) > 1024:
+                    self._turns.popitem(last=False)
+            self._turns.move_to_end(key)
+        token = _current_trace.set(trace)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+
+    def start(self, name: str, category: str = "", parent: Optional[Span] = None,
+              **attributes: Any) -> Optional[Span]:
+        """
+        Open a span without binding it to the context, for start/end hooks
+        such as LangChain callbacks. Defaults to a child of the current span.
+        Returns None when tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        parent = parent or _current_span.get()
+        if parent is not None:
+            trace_id = parent.trace_id
+        else:
+            trace = _current_trace.get()
+            trace_id = trace[0] if trace else _new_id(128)
+            if trace:
+                attributes = {**trace[1], **attributes}
+        return Span(name, category, trace_id, parent.span_id if parent else None, attributes)
+
+    def end(self, current: Optional[Span], error: Optional[str] = None) -> None:
+        """Close a span opened with start; closing a root span flushes the buffer."""
+        if current is None:
+            return
+        current.dur_us = (time.perf_counter_ns() - current._t0) // 1000
+        if error:
+            current.error = error
+        self._finish(current, flush=current.parent_id is None)
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Time the enclosed block as a child of the current span.
+        Yields None when tracing is disabled. An exception marks the span
+        as failed and propagates.
+        """
+        current = self.start(name, category, **attributes)
+        if current is None:
+            yield None
+            return
+        token = _current_span.set(current)
+        error = None
+        try:
+            yield current
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(current, error)
+
+    def _finish(self, current: Span, flush: bool) -> None:
+        record = current.to_dict()
+        trace = _current_trace.get()
+        record["thread_id"] = trace[1]["thread_id"] if trace else None
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) > self.max_pending:
+                self._dropped += len(self._pending) - self.max_pending
+                del self._pending[:-self.max_pending]
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered spans to their thread files; failures are logged, never raised."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            logger.warning("Dropped %d trace spans (buffer full)", dropped)
+        if not pending:
+            return
+        by_thread: Dict[Any, List[str]] = {}
+        for record in pending:
+            thread_id = record.pop("thread_id")
+            by_thread.setdefault(thread_id or "untraced", []).append(
+                json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for thread_id, lines in by_thread.items():
+                with open(self.path(thread_id), "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+        except OSError as e:
+            logger.error("Failed to write trace spans: %s", e)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of this context, if any."""
+    return _current_span.get()
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Spans from a JSONL span file; torn lines are skipped."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    return spans
+
+
+def group_traces(spans: List[Dict[str, Any]]) -> "OrderedDict[str, List[Dict[str, Any]]]":
+    """Spans grouped by trace id, in order of each trace's first span."""
+    traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    for record in sorted(spans, key=lambda s: s["start_us"]):
+        traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+def trace_duration_us(spans: List[Dict[str, Any]]) -> int:
+    """Wall time covered by a trace's spans."""
+    if not spans:
+        return 0
+    return max(s["start_us"] + s["dur_us"] for s in spans) - min(s["start_us"] for s in spans)
+
+
+def to_chrome(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chrome/Perfetto trace-event JSON: one complete ("X") event per span, one process per trace."""
+    events: List[Dict[str, Any]] = []
+    pids: Dict[str, int] = {}
+    tids: Dict[Tuple[int, int], int] = {}
+    for record in sorted(spans, key=lambda s: (s["start_us"], -s["dur_us"])):
+        if record["trace_id"] not in pids:
+            pid = pids[record["trace_id"]] = len(pids) + 1
+            attrs = record.get("attrs", {})
+            label = f"thread {attrs.get('thread_id', '?')} turn {attrs.get('turn', '?')}"
+            events.append({"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": label}})
+        pid = pids[record["trace_id"]]
+        if (pid, record["tid"]) not in tids:
+            tid = tids[(pid, record["tid"])] = len(tids) + 1
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid,
+                           "args": {"name": f"os-thread {record['tid']}"}})
+        args = dict(record.get("attrs", {}))
+        if record.get("error"):
+            args["error"] = record["error"]
+        events.append({"ph": "X", "name": record["name"], "cat": record.get("cat") or "span",
+                       "ts": record["start_us"], "dur": record["dur_us"], "pid": pid,
+                       "tid": tids[(pid, record["tid"])], "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """OTLP/JSON export request (resourceSpans) for the given spans."""
+    otlp_spans = []
+    for record in spans:
+        start_ns = record["start_us"] * 1000
+        item = {
+            "traceId": record["trace_id"],
+            "spanId": record["span_id"],
+            "name": record["name"],
+            "kind": 3 if record.get("cat") == "provider" else 1,  # CLIENT for the remote call, else INTERNAL
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + record["dur_us"] * 1000),
+            "attributes": [{"key": k, "value": _otlp_value(v)}
+                           for k, v in {"category": record.get("cat", ""), **record.get("attrs", {})}.items()
+                           if v is not None],
+            "status": {"code": 2, "message": record["error"]} if record.get("error") else {"code": 1},
+        }
+        if record.get("parent_id"):
+            item["parentSpanId"] = record["parent_id"]
+        otlp_spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "utils.tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+def select_trace(spans: List[Dict[str, Any]], turn: Optional[int] = None,
+                 slowest: bool = False) -> List[Dict[str, Any]]:
+    """Spans of one trace: the given turn, the slowest, or (default) all spans."""
+    traces = group_traces(spans)
+    if turn is not None:
+        # Trace-level fields (thread_id, turn) are stored on root spans
+        return [s for trace in traces.values()
+                if any(not t.get("parent_id") and t.get("attrs", {}).get("turn") == turn for t in trace)
+                for s in trace]
+    if slowest and traces:
+        return max(traces.values(), key=trace_duration_us)
+    return spans
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.tracing",
+                                     description="Export recorded spans as a trace file.")
+    parser.add_argument("spans", help="Span file written by the tracer (logs/traces/<thread_id>.jsonl)")
+    parser.add_argument("out", help="Target trace file")
+    parser.add_argument("--format", choices=("chrome", "otlp"), default="chrome",
+                        help="chrome: trace-event JSON for chrome://tracing / Perfetto; otlp: OTLP/JSON")
+    which = parser.add_mutually_exclusive_group()
+    which.add_argument("--turn", type=int, help="Only the invocation that started at this turn")
+    which.add_argument("--slowest", action="store_true", help="Only the slowest invocation")
+    args = parser.parse_args(argv)
+
+    spans = select_trace(load_spans(args.spans), turn=args.turn, slowest=args.slowest)
+    if not spans:
+        print("No matching spans", file=sys.stderr)
+        return 1
+    data = to_chrome(spans) if args.format == "chrome" else to_otlp(spans)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    print(f"{len(spans)} spans, {trace_duration_us(spans) / 1000:.1f} ms -> {args.out}", file=sys.stderr)
+    return 0
+
+
+tracer = Tracer(settings.TRACE_DIR if settings.TRACE_ENABLED else "")
+span = tracer.span
+atexit.register(tracer.flush)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
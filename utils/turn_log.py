@@ -0,0 +1,120 @@
+"""
+Append-only turn journal: one JSONL line per turn, written when the turn
+is produced, so a crash loses at most the turn in flight.
+Lines are flushed to the OS at once (survive a process crash) and fsynced
+in batches (survive power loss). LoggerUtils.compact_journal turns the
+journal into the final session log (see utils.log_store).
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, IO, Union
+
+from config import settings
+from state import TurnRecord
+from utils.log_config import get_logger
+
+logger = get_logger("turn_log")
+
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+class TurnJournal:
+    """
+    Per-thread JSONL journals sharing one fsync batch.
+
+    Args:
+        directory: Where journals are written; "" disables journaling
+        fsync_every: Appended lines between fsyncs
+        fsync_interval: Seconds after which the next append fsyncs regardless
+        max_open: Journals kept open; the least recently used are closed
+    """
+
+    def __init__(self, directory: str, fsync_every: int = 16, fsync_interval: float = 1.0,
+                 max_open: int = 128):
+        self.directory = directory
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.max_open = max_open
+        self._files: "OrderedDict[str, IO[str]]" = OrderedDict()
+        self._dirty: set = set()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, thread_id: str) -> str:
+        return os.path.join(self.directory, f"{_UNSAFE.sub('_', str(thread_id))}.jsonl")
+
+    def append(self, thread_id: str, turn: Union[TurnRecord, Dict[str, Any]]) -> None:
+        """Append one turn; failures are logged, never raised into the graph."""
+        if not self.enabled or not thread_id:
+            return
+        line = turn.to_json() if isinstance(turn, TurnRecord) else json.dumps(turn, ensure_ascii=False)
+        try:
+            with self._lock:
+                f = self._open(thread_id)
+                f.write(line + "\n")
+                f.flush()
+                self._dirty.add(thread_id)
+                self._pending += 1
+                if (self._pending >= self.fsync_every
+                        or time.monotonic() - self._last_sync >= self.fsync_interval):
+                    self._sync()
+        except OSError as e:
+            logger.error("Failed to append turn to journal %s: %s", self.path(thread_id), e)
+
+    def sync(self) -> None:
+        """fsync every journal with unsynced lines."""
+        with self._lock:
+            self._sync()
+
+    def close(self, thread_id: str) -> None:
+        """fsync and close one journal (before compaction or deletion)."""
+        with self._lock:
+            f = self._files.pop(thread_id, None)
+            if f is not None:
+                if thread_id in self._dirty:
+                    os.fsync(f.fileno())
+                    self._dirty.discard(thread_id)
+                f.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._sync()
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+    def _open(self, thread_id: str) -> IO[str]:
+        f = self._files.get(thread_id)
+        if f is not None:
+            self._files.move_to_end(thread_id)
+            return f
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self.path(thread_id), "a", encoding="utf-8")
+        self._files[thread_id] = f
+        while len(self._files) > self.max_open:
+            old_id, old = self._files.popitem(last=False)
+            if old_id in self._dirty:
+                os.fsync(old.fileno())
+                self._dirty.discard(old_id)
+            old.close()
+        return f
+
+    def _sync(self) -> None:
+        for thread_id in self._dirty:
+            os.fsync(self._files[thread_id].fileno())
+        self._dirty.clear()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+
+turn_journal = TurnJournal(settings.TURN_LOG_DIR, settings.TURN_LOG_FSYNC_EVERY,
+                           settings.TURN_LOG_FSYNC_INTERVAL_SECONDS)
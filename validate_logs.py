@@ -1,48 +1,243 @@
+"""
+Interview log validator.
+
+    python validate_logs.py interview_log_1.json
+    python validate_logs.py logs/sessions "archive/**/*.json" --jobs 8 --jsonl results.jsonl
+
+A single file gets a human-readable report. Several targets, directories
+or globs switch to bulk mode: files are validated in a process pool, each
+streamed turn by turn (memory stays bounded by one turn), and one JSON
+result per file is written as JSONL (stdout by default).
+"""
+import argparse
+import concurrent.futures
+import glob
 import json
 import os
 import sys
 
-def validate_log(file_path):
-    if not os.path.exists(file_path):
-        print(f"❌ Error: {file_path} not found.")
-        return False
+REQUIRED_KEYS = ["participant_name", "turns", "final_feedback"]
+TURN_REQUIRED_KEYS = ["turn_id", "agent_visible_message", "user_message", "internal_thoughts"]
+AGENT_MARKERS = ["[Observer]:", "[Interviewer]:", "[Critic]:"]
+MAX_ISSUES = 20  # Per file, so one broken archive does not flood the results
+
+_decoder = json.JSONDecoder()
+
+
+class _JSONStream:
+    """Incremental reader for one JSON document: decodes values one at a time from a chunked buffer."""
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> None:
+        # Read at least as much as is buffered so a large value is retried O(log n) times
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos] if self.pos < len(self.buf) else ""
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:  # A number may continue in the next chunk
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def check_log(file_path: str, chunk_size: int = 1 << 16) -> dict:
+    """
+    Validate one log file, streaming its turns in chunk_size reads.
+
+    Errors: unparseable JSON, missing keys, 'turns' not a list, turns missing
+    keys, non-increasing turn_id, empty final_feedback.
+    Warnings: turns without any standard agent marker in internal_thoughts.
+
+    Returns:
+        {"path", "ok", "participant_name", "turns", "errors", "warnings"}
+    """
+    result = {"path": file_path, "ok": False, "participant_name": None, "turns": 0,
+              "errors": [], "warnings": []}
+    errors, warnings = result["errors"], result["warnings"]
 
+    def issue(target: list, message: str) -> None:
+        if len(target) < MAX_ISSUES:
+            target.append(message)
+
+    seen = set()
+    last_turn_id = None
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            log = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Failed to parse JSON: {e}")
-        return False
+            stream = _JSONStream(f, chunk_size)
+            stream.expect("{")
+            while stream.peek() != "}":
+                key = stream.value()
+                stream.expect(":")
+                seen.add(key)
+                if key == "turns" and stream.peek() == "[":
+                    stream.expect("[")
+                    while stream.peek() != "]":
+                        turn = stream.value()
+                        result["turns"] += 1
+                        index = result["turns"]
+                        if not isinstance(turn, dict):
+                            issue(errors, f"Turn {index} is not an object.")
+                        else:
+                            for k in TURN_REQUIRED_KEYS:
+                                if k not in turn:
+                                    issue(errors, f"Turn {index} (ID: {turn.get('turn_id', 'N/A')}) is missing key '{k}'.")
+                            turn_id = turn.get("turn_id")
+                            if isinstance(turn_id, int) and not isinstance(turn_id, bool):
+                                if last_turn_id is not None and turn_id <= last_turn_id:
+                                    issue(errors, f"Turn {index}: turn_id {turn_id} does not increase (previous {last_turn_id}).")
+                                last_turn_id = turn_id
+                            elif "turn_id" in turn:
+                                issue(errors, f"Turn {index}: turn_id must be an integer.")
+                            thoughts = turn.get("internal_thoughts", "")
+                            if not isinstance(thoughts, str) or not any(m in thoughts for m in AGENT_MARKERS):
+                                issue(warnings, f"Turn {index} internal_thoughts might be missing standard agent markers.")
+                        if stream.peek() == ",":
+                            stream.pos += 1
+                        elif stream.peek() != "]":
+                            stream.expect("]")
+                    stream.expect("]")
+                else:
+                    value = stream.value()
+                    if key == "turns":
+                        issue(errors, "'turns' must be a list.")
+                    elif key == "participant_name":
+                        result["participant_name"] = value
+                    elif key == "final_feedback" and not (isinstance(value, str) and value.strip()):
+                        issue(errors, "'final_feedback' is empty.")
+                if stream.peek() == ",":
+                    stream.pos += 1
+                elif stream.peek() != "}":
+                    stream.expect("}")
+            stream.expect("}")
+            if stream.peek():
+                raise ValueError("Extra data after the log object")
+    except FileNotFoundError:
+        errors.append(f"{file_path} not found.")
+        return result
+    except (ValueError, UnicodeDecodeError) as e:
+        errors.append(f"Failed to parse JSON: {e}")
+        return result
 
-    required_keys = ["participant_name", "turns", "final_feedback"]
-    for key in required_keys:
-        if key not in log:
-            print(f"❌ Error: Missing required key '{key}' in log.")
-            return False
+    for key in REQUIRED_KEYS:
+        if key not in seen:
+            errors.insert(0, f"Missing required key '{key}' in log.")
+    result["ok"] = not errors
+    return result
 
-    print(f"✅ Found log for participant: {log['participant_name']}")
-    
-    if not isinstance(log["turns"], list):
-        print("❌ Error: 'turns' must be a list.")
+
+def validate_log(file_path):
+    """Validate one file with a human-readable report; True if it is valid."""
+    result = check_log(file_path)
+    if result["participant_name"] is not None:
+        print(f"✅ Found log for participant: {result['participant_name']}")
+    for warning in result["warnings"]:
+        print(f"⚠️ Warning: {warning}")
+    if not result["ok"]:
+        for error in result["errors"]:
+            print(f"❌ Error: {error}")
         return False
 
-    turn_required_keys = ["turn_id", "agent_visible_message", "user_message", "internal_thoughts"]
-    for i, turn in enumerate(log["turns"]):
-        for key in turn_required_keys:
-            if key not in turn:
-                print(f"❌ Error: Turn {i+1} (ID: {turn.get('turn_id', 'N/A')}) is missing key '{key}'.")
-                return False
-        
-        # Check internal_thoughts format
-        thoughts = turn.get("internal_thoughts", "")
-        if not any(marker in thoughts for marker in ["[Observer]:", "[Interviewer]:", "[Critic]:"]):
-             print(f"⚠️ Warning: Turn {i+1} internal_thoughts might be missing standard agent markers.")
-
-    print(f"✅ Successfully validated {len(log['turns'])} turns.")
+    print(f"✅ Successfully validated {result['turns']} turns.")
     print(f"🚀 {file_path} is correct and complies with project requirements.")
     return True
 
+
+def expand_targets(targets):
+    """Files from paths, directories (recursive *.json) and globs, de-duplicated in order."""
+    seen = set()
+    for target in targets:
+        if os.path.isdir(target):
+            matches = sorted(glob.glob(os.path.join(target, "**", "*.json"), recursive=True))
+        elif glob.has_magic(target):
+            matches = sorted(glob.glob(target, recursive=True))
+        else:
+            matches = [target]
+        for path in matches:
+            if path not in seen and not os.path.basename(path).startswith(".tmp-"):
+                seen.add(path)
+                yield path
+
+
+def validate_bulk(targets, jobs=None, out=sys.stdout, strict=False):
+    """
+    Validate many logs in a process pool, writing one JSONL result per file.
+
+    Args:
+        targets: Files, directories or globs
+        jobs: Worker processes (default: CPU count)
+        out: Text stream receiving the JSONL results
+        strict: Treat warnings as failures
+
+    Returns:
+        (files checked, files failed)
+    """
+    checked = failed = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        for result in pool.map(check_log, expand_targets(targets), chunksize=32):
+            if strict and result["warnings"]:
+                result["ok"] = False
+            checked += 1
+            failed += not result["ok"]
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return checked, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate interview logs.")
+    parser.add_argument("targets", nargs="*", default=["interview_log_1.json"],
+                        help="Log files, directories or globs")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for bulk mode")
+    parser.add_argument("--jsonl", metavar="PATH", help="Write bulk results to PATH instead of stdout")
+    parser.add_argument("--strict", action="store_true", help="Fail files that only have warnings")
+    args = parser.parse_args(argv)
+
+    single = (len(args.targets) == 1 and not os.path.isdir(args.targets[0])
+              and not glob.has_magic(args.targets[0]) and not args.jsonl)
+    if single:
+        result = validate_log(args.targets[0])
+        return 0 if result else 1
+
+    out = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else sys.stdout
+    try:
+        checked, failed = validate_bulk(args.targets, jobs=args.jobs, out=out, strict=args.strict)
+    finally:
+        if args.jsonl:
+            out.close()
+    print(f"{checked - failed}/{checked} logs valid", file=sys.stderr)
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    target = sys.argv[1] if len(sys.argv) > 1 else "interview_log_1.json"
-    success = validate_log(target)
-    sys.exit(0 if success else 1)
+    sys.exit(main())